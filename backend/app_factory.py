@@ -5,8 +5,8 @@ from fastapi.templating import Jinja2Templates
 from backend.config import ASSETS_DIR, STATIC_DIR, TEMPLATES_DIR
 
 
-def create_app() -> tuple[FastAPI, Jinja2Templates]:
-    app = FastAPI()
+def create_app(lifespan=None) -> tuple[FastAPI, Jinja2Templates]:
+    app = FastAPI(lifespan=lifespan)
     app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
     if ASSETS_DIR.exists() and ASSETS_DIR.is_dir():
@@ -1,13 +1,81 @@
+import os
 from pathlib import Path
 
 
-SCRYFALL_BASE = "https://api.scryfall.com"
+# Overridable, e.g. to point at the local stand-in (backend/scryfall_standin.py)
+SCRYFALL_BASE = os.environ.get("SCRYFALL_BASE", "https://api.scryfall.com").rstrip("/")
 SUGGEST_MIN_CHARS = 3
 SUGGEST_LIMIT = 15
+# Second-commander suggestions for commanders without "Partner" (kinds: card_rules.partner_suggest_kind)
+PAIRING_SUGGEST_QUERIES = {
+    "background": "game:paper t:background name:{q}",
+    "choose_a_background": 'game:paper is:commander o:"choose a background" name:{q}',
+    "friends_forever": 'game:paper keyword:"friends forever" name:{q}',
+    "doctors_companion": "game:paper keyword:\"doctor's companion\" name:{q}",
+    "time_lord_doctor": 'game:paper t:legendary t:"time lord doctor" name:{q}',
+}
 SCRYFALL_TIMEOUT = 2.0
+SCRYFALL_CONNECT_TIMEOUT = 2.0
+SCRYFALL_HTTP2 = True  # only used if the optional "h2" package is installed
+SCRYFALL_MAX_CONNECTIONS = 20
+SCRYFALL_MAX_KEEPALIVE_CONNECTIONS = 10
+SCRYFALL_KEEPALIVE_EXPIRY = 60.0
+# Scryfall asks clients to stay around 10 requests per second
+SCRYFALL_RATE_PER_SECOND = 10.0
+SCRYFALL_RATE_BURST = 10
+# Open the circuit after this many consecutive failures, probe again after the reset period
+SCRYFALL_BREAKER_FAILURES = 5
+SCRYFALL_BREAKER_RESET_SECONDS = 30.0
+# Search responses: served fresh, then stale-while-revalidate until the stale limit
+SCRYFALL_RESPONSE_FRESH_SECONDS = 10 * 60
+SCRYFALL_RESPONSE_STALE_SECONDS = 24 * 3600
+SCRYFALL_RESPONSE_CACHE_MAX_ENTRIES = 500
+SCRYFALL_RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
 
+# Defaults for the in-memory cache namespaces (backend/services/cache_service.py)
 CACHE_TTL_SECONDS = 24 * 3600
 CACHE_MAX_ENTRIES = 1000
+CACHE_MAX_BYTES = 4 * 1024 * 1024
+CACHE_PURGE_INTERVAL_SECONDS = 300
+AVATAR_RESOLVE_CONCURRENCY = 6
+PREVIEW_NEGATIVE_TTL_SECONDS = 10 * 60  # "no image found" is remembered for a shorter time
+DEBUG_CANDIDATE_CONCURRENCY = 8  # parallel random-commander requests in /debug registration
+
+CARD_CACHE_FILE_PATH = Path("scryfall_cards.sqlite3")
+CARD_CACHE_TTL_SECONDS = 7 * 24 * 3600
+CARD_CACHE_FLUSH_SECONDS = 5.0  # new cards are committed in one batch per interval
+
+# Local card-image proxy (/img/{card_id}/{variant}); LRU-evicted beyond the size cap
+IMAGE_CACHE_DIR = Path("image_cache")
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+IMAGE_PROXY_WIDTHS = (320, 640, 960)  # downscaled variants, only if Pillow is installed
+IMAGE_PROXY_MAX_AGE_SECONDS = 24 * 3600  # browser cache lifetime; /img URLs carry no content hash
+AVATAR_IMAGE_WIDTH = 320
+
+# Pre-resolved art URLs for the Scryfall default background
+BACKGROUND_ART_POOL_SIZE = 12
+BACKGROUND_ART_POOL_LOW_WATER = 4
+
+# WebSocket fan-out: one bounded send queue + writer task per connection
+WS_SEND_QUEUE_SIZE = 64  # a client this far behind is disconnected and resyncs on reconnect
+WS_SEND_TIMEOUT_SECONDS = 5.0
+WS_HEARTBEAT_INTERVAL_SECONDS = 20.0  # quiet sockets get a "ping" after this long
+WS_IDLE_TIMEOUT_SECONDS = 75.0  # sockets silent this long (no pong/ping/message) are reaped
+WS_NOTIFY_WINDOW_SECONDS = 0.05  # state changes within this window are pushed as one delta
+# Reconnect storms: concurrent /ws handshakes are capped; clients turned away (or
+# closed by the server) get a reconnect delay of base + random jitter
+WS_HANDSHAKE_CONCURRENCY = 32
+WS_HANDSHAKE_WAIT_SECONDS = 2.0
+WS_RECONNECT_BASE_MS = 1000
+WS_RECONNECT_JITTER_MS = 4000
+# Cross-worker state-change bus: "" (single worker), "unix:///run/kizzm-bus" (one host)
+# or "redis://host:6379/0" (several hosts); see backend/services/broadcast_bus.py
+WS_BUS_URL = os.environ.get("WS_BUS_URL", "")
+WS_BUS_QUEUE_SIZE = 256  # pending events per worker; beyond that they are dropped
+WS_BUS_TIMEOUT_SECONDS = 2.0  # connect/send/reply timeout of the bus transport
+
+# Optional local copy of Scryfall's "Oracle Cards" bulk-data file (https://scryfall.com/docs/api/bulk-data)
+SCRYFALL_BULK_DATA_FILE_PATH = Path("oracle-cards.json")
 
 DEFAULT_BG_QUERY = "t:basic t:snow e:SLD"
 DEFAULT_BG_ZOOM = 1.12
@@ -20,6 +88,7 @@ SCRYFALL_HEADERS = {
 
 RAFFLE_FILE_PATH = Path("raffle.json")
 PAIRINGS_FILE_PATH = Path("pairings.json")
+STATE_LOCK_FILE_PATH = Path("state.lock")  # flock target shared by all workers
 START_FILE_PATH = Path("start.txt")
 PARTICIPANTS_FILE_PATH = Path("teilnehmer.txt")
 EVENT_CONFIG_FILE_PATH = Path("event_config.json")
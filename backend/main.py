@@ -1,20 +1,23 @@
 import uvicorn
 import html
+import logging
 from fastapi import Body, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, JSONResponse, Response, StreamingResponse
 from backend.schemas import DeckSchema
 from backend.app_factory import create_app
-from backend.repositories.json_store import atomic_write_json
+from backend.repositories.card_cache_repository import CardCache
+from backend.repositories.json_store import StateLock, atomic_write_json
 from backend.repositories.pairings_repository import load_pairings, write_pairings
 from backend.repositories.raffle_repository import load_raffle_list
 from backend.services.card_rules import (
+    CAP_PARTNER,
+    card_capabilities,
     get_image_url,
-    has_choose_a_background,
-    has_friends_forever,
-    is_background,
-    partner_with_target_name,
+    partner_suggest_kind,
+    validate_commander_pair,
 )
 from backend.services.pairings_service import (
+    RoundsPrecomputer,
     apply_round_to_raffle,
     build_rounds,
     first_round_with_hosts,
@@ -28,18 +31,45 @@ from backend.services.raffle_service import (
 )
 from backend.routes_debug import register_debug_routes
 from backend.routes_ws import register_ws_routes
+from backend.services.broadcast_bus import create_bus
 from backend.services.ws_state_service import (
+    HandshakeGate,
+    NotificationScheduler,
+    StateRevisions,
+    StateSnapshot,
     WSManager,
-    deck_signature,
-    global_signature,
+    view_changes,
 )
 from backend.services.scryfall_service import (
+    close_client as close_scryfall_client,
     get_card_by_id,
+    get_card_cache as get_scryfall_card_cache,
+    get_client as get_scryfall_client,
+    get_response_cache as get_scryfall_response_cache,
     is_partner_exact_name,
     named_exact,
+    PRIORITY_BACKGROUND,
+    PRIORITY_BULK,
     random_commander,
+    scryfall_metrics,
+    scryfall_priority,
+    search_cards,
+    set_card_cache as set_scryfall_card_cache,
+    set_card_index as set_scryfall_card_index,
 )
+from backend.services.background_art_service import BackgroundArtPool
+from backend.services.cache_service import CacheRegistry, TTLCache
+from backend.services.card_index_service import CardIndex, normalize_name
+from backend.services.image_proxy_service import (
+    IMAGE_VARIANTS,
+    load_image,
+    media_type as image_media_type,
+    proxied_url as _proxied_image_url,
+    set_image_cache,
+)
+from backend.repositories.image_cache_repository import ImageCache
 from backend.services.event_config_service import (
+    ScryfallSettings,
     detect_event_state,
     load_event_settings,
     settings_as_dict,
@@ -50,8 +80,24 @@ from backend.services.event_config_service import (
     reset_settings_with_locks,
 )
 from backend.config import (
+    AVATAR_IMAGE_WIDTH,
+    AVATAR_RESOLVE_CONCURRENCY,
+    DEBUG_CANDIDATE_CONCURRENCY,
+    BACKGROUND_ART_POOL_LOW_WATER,
+    BACKGROUND_ART_POOL_SIZE,
+    CACHE_MAX_BYTES,
     CACHE_MAX_ENTRIES,
+    CACHE_PURGE_INTERVAL_SECONDS,
     CACHE_TTL_SECONDS,
+    CARD_CACHE_FILE_PATH,
+    CARD_CACHE_TTL_SECONDS,
+    CARD_CACHE_FLUSH_SECONDS,
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+    IMAGE_PROXY_MAX_AGE_SECONDS,
+    PAIRING_SUGGEST_QUERIES,
+    PREVIEW_NEGATIVE_TTL_SECONDS,
+    SCRYFALL_BULK_DATA_FILE_PATH,
     COMMANDER_BG_ZOOM,
     DEFAULT_BG_QUERY,
     DEFAULT_BG_ZOOM,
@@ -59,49 +105,37 @@ from backend.config import (
     PAIRINGS_FILE_PATH,
     PARTICIPANTS_FILE_PATH,
     RAFFLE_FILE_PATH,
-    SCRYFALL_BASE,
-    SCRYFALL_HEADERS,
-    SCRYFALL_TIMEOUT,
+    STATE_LOCK_FILE_PATH,
     START_FILE_PATH,
+    WS_BUS_URL,
+    WS_NOTIFY_WINDOW_SECONDS,
     SUGGEST_LIMIT,
     SUGGEST_MIN_CHARS,
 )
 import json
 import asyncio
+import re
 from pathlib import Path
 from datetime import datetime, timezone
 import pandas as pd
-from random import shuffle, randint, choice
-import time 
+from random import shuffle, choice
 import io
-from collections import OrderedDict
+from contextlib import asynccontextmanager
 from urllib.parse import quote_plus, unquote_plus
-import httpx
+from typing import Callable, Iterable
 #python -m uvicorn backend.main:app --reload --host 0.0.0.0 --port 8000
 
-_suggest_cache = OrderedDict()  # key -> (timestamp, result_list)
+logger = logging.getLogger(__name__)
 
-def _cache_get(key: str):
-    now = time.time()
-    item = _suggest_cache.get(key)
-    if not item:
-        return None
-    ts, value = item
-    if now - ts > CACHE_TTL_SECONDS:
-        # expired
-        _suggest_cache.pop(key, None)
-        return None
-    # LRU refresh
-    _suggest_cache.move_to_end(key)
-    return value
-
-def _cache_set(key: str, value):
-    now = time.time()
-    _suggest_cache[key] = (now, value)
-    _suggest_cache.move_to_end(key)
-    # enforce size
-    while len(_suggest_cache) > CACHE_MAX_ENTRIES:
-        _suggest_cache.popitem(last=False)
+# In-memory caches, one namespace per lookup type (kein gegenseitiges Verdrängen)
+caches = CacheRegistry()
+_suggest_commander_cache = caches.namespace("suggest:commander", CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_MAX_BYTES)
+_suggest_partner_cache = caches.namespace("suggest:partner", CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_MAX_BYTES)
+_avatar_cache = caches.namespace("avatar", CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_MAX_BYTES)
+_preview_cache = caches.namespace("preview", CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_MAX_BYTES)
+caches.register(get_scryfall_response_cache().entries)
+
+_CACHE_MISS = object()
 
 def _get_image_url(card: dict, key: str) -> str | None:
     return get_image_url(card, key)
@@ -111,8 +145,8 @@ def _get_image_url(card: dict, key: str) -> str | None:
 FILE_PATH = RAFFLE_FILE_PATH
 PAIRINGS_PATH = PAIRINGS_FILE_PATH
 
-# Serialisiert alle Zugriffe auf raffle.json innerhalb dieses Prozesses
-RAFFLE_LOCK = asyncio.Lock()
+# Serialisiert alle Zugriffe auf raffle.json/pairings.json – auch über mehrere Worker-Prozesse
+RAFFLE_LOCK = StateLock(STATE_LOCK_FILE_PATH)
 
 def _atomic_write_json(path: Path, data) -> None:
     """
@@ -122,17 +156,80 @@ def _atomic_write_json(path: Path, data) -> None:
     """
     atomic_write_json(path, data)
 
+# Offline-Index aus der Scryfall-Bulk-Datei (falls vorhanden) für Suggest + Lookups
+card_index = CardIndex()
+background_art_pool = BackgroundArtPool(BACKGROUND_ART_POOL_SIZE, BACKGROUND_ART_POOL_LOW_WATER)
+
+
+async def _load_card_index() -> None:
+    if not SCRYFALL_BULK_DATA_FILE_PATH.exists():
+        return
+    try:
+        count = await asyncio.to_thread(card_index.load, SCRYFALL_BULK_DATA_FILE_PATH)
+    except Exception as exc:
+        logger.error("Scryfall bulk data could not be loaded from %s: %s", SCRYFALL_BULK_DATA_FILE_PATH, exc)
+        return
+    set_scryfall_card_index(card_index)
+    logger.info("Scryfall bulk data loaded: %d cards from %s", count, SCRYFALL_BULK_DATA_FILE_PATH)
+
+
+@asynccontextmanager
+async def _lifespan(app):
+    # Ein gepoolter Scryfall-Client für die gesamte Laufzeit (Keep-Alive, optional HTTP/2)
+    get_scryfall_client()
+    # Karten-Cache überlebt Neustarts/Redeploys (commander_id -> Kartendaten)
+    card_cache = CardCache(CARD_CACHE_FILE_PATH, CARD_CACHE_TTL_SECONDS)
+    await asyncio.to_thread(card_cache.purge_expired)
+    set_scryfall_card_cache(card_cache)
+    # neue Karten werden gesammelt und gebündelt geschrieben (nicht pro Lookup)
+    card_flush_task = asyncio.create_task(card_cache.run_flusher(CARD_CACHE_FLUSH_SECONDS))
+    # Kartenbilder werden einmal geladen und lokal ausgeliefert (/img/...)
+    set_image_cache(ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES))
+    index_task = asyncio.create_task(_load_card_index())
+    purge_task = asyncio.create_task(caches.run_purger(CACHE_PURGE_INTERVAL_SECONDS))
+    # Server-Pings an stille Clients, halboffene Sockets werden abgeräumt
+    heartbeat_task = asyncio.create_task(ws_manager.run_heartbeat())
+    # Ausgangsstand für die WS-Deltas (state_delta)
+    _current_state_snapshot()
+    # Zustandsänderungen anderer Worker empfangen (uvicorn --workers N)
+    await broadcast_bus.start(_on_bus_message)
+    if not _local_background_files():
+        background_art_pool.schedule(_current_settings().scryfall.default_background_query)
+    try:
+        yield
+    finally:
+        index_task.cancel()
+        purge_task.cancel()
+        card_flush_task.cancel()
+        heartbeat_task.cancel()
+        await broadcast_bus.close()
+        await notification_scheduler.close()
+        await background_art_pool.close()
+        set_image_cache(None)
+        set_scryfall_card_index(None)
+        await close_scryfall_client()
+        if get_scryfall_card_cache() is card_cache:
+            set_scryfall_card_cache(None)
+        await asyncio.to_thread(card_cache.close)
+
+
 # FastAPI-App erstellen
-app, templates = create_app()
+app, templates = create_app(lifespan=_lifespan)
 
 # =========================================================
 # WebSocket live updates (no polling)
 # =========================================================
 
 ws_manager = WSManager()
+ws_handshake_gate = HandshakeGate()
+state_revisions = StateRevisions()
+# Verteilt Zustandsänderungen an die übrigen Worker-Prozesse (WS_BUS_URL)
+broadcast_bus = create_bus(WS_BUS_URL)
 
-_last_global_sig: str | None = None
-_last_deck_sig: dict[int, str] = {}
+# Global sequence value of the last notification; scopes above it have changed since.
+_last_notified_revision = 0
+# State as of the last notification; deltas are computed against it.
+_last_snapshot: StateSnapshot | None = None
 
 def _load_raffle_list() -> list[dict]:
     return load_raffle_list(FILE_PATH)
@@ -180,6 +277,41 @@ def _apply_round_to_raffle(raffle_list: list[dict], state: dict, round_no: int):
     apply_round_to_raffle(raffle_list, state, round_no)
 
 
+# Pairings werden spekulativ ab Raffle-Start vorberechnet (Spieler stehen dann fest)
+rounds_precomputer = RoundsPrecomputer()
+
+
+def _schedule_rounds_precompute(
+    raffle_list: list[dict] | None = None,
+    pick_num_pods: Callable[[int], int] | None = None,
+) -> None:
+    """
+    Starts (or keeps) the background build_rounds() run for the current player set
+    and max_rounds. Keyed on the pod count the pairings start will request:
+    pick_num_pods(n_players) for the /debug flow, otherwise default_num_pods
+    (the value /CCP pre-fills). No-op once pairings exist.
+    """
+    if not START_FILE_PATH.exists() or _load_pairings():
+        rounds_precomputer.invalidate()
+        return
+
+    players = _deckowners(raffle_list if raffle_list is not None else _load_raffle_list())
+    if len(players) < 3:
+        rounds_precomputer.invalidate()
+        return
+
+    settings = _current_settings()
+    num_pods = pick_num_pods(len(players)) if pick_num_pods else settings.default_num_pods
+    rounds_precomputer.schedule(players, int(num_pods), int(settings.max_rounds))
+
+
+async def _take_or_build_rounds(players: list[str], num_pods: int, max_rounds: int) -> list[list[list[str]]]:
+    rounds = await rounds_precomputer.take(players, num_pods, max_rounds)
+    if rounds is None:
+        rounds = _build_rounds(players, num_pods, max_rounds)
+    return rounds
+
+
 def _resolve_round_places(raw_places: dict[str, list[str]]) -> dict[str, int]:
     """
     Normalisiert Platzierungen mit Gleichständen.
@@ -257,24 +389,6 @@ def _sync_round_completion_marker(state: dict, round_no: int) -> dict:
     state["round_completion"] = completion
     return completion[round_key]
 
-def _global_signature(start_file_exists: bool, raffle_list: list[dict]) -> str:
-    return global_signature(
-        start_file_exists,
-        raffle_list,
-        pairings_loader=_load_pairings,
-        settings_loader=lambda: settings_as_dict(_current_settings()),
-    )
-
-def _deck_signature(deck_id: int, start_file_exists: bool, raffle_list: list[dict]) -> str:
-    return deck_signature(
-        deck_id,
-        start_file_exists,
-        raffle_list,
-        pairings_loader=_load_pairings,
-        settings_loader=lambda: settings_as_dict(_current_settings()),
-    )
-
-
 def _current_settings():
     settings, _meta = load_event_settings()
     return settings
@@ -286,43 +400,134 @@ def _current_event_state():
     state = detect_event_state(START_FILE_PATH.exists(), raffle_list, pairings)
     return state, raffle_list, pairings
 
-async def notify_state_change():
+def _state_snapshot() -> StateSnapshot:
+    return StateSnapshot(
+        START_FILE_PATH.exists(),
+        _load_raffle_list(),
+        _load_pairings(),
+        settings_as_dict(_current_settings()),
+    )
+
+
+def _current_state_snapshot() -> StateSnapshot:
+    global _last_snapshot
+    if _last_snapshot is None:
+        _last_snapshot = _state_snapshot()
+    return _last_snapshot
+
+
+def _hello_state(deck_id: int | None = None, since: tuple[str, int] | None = None) -> dict:
     """
-    Called after any write to raffle.json or start.txt.
-    Sends WS events only to groups whose signature changed.
+    Revision and view as of the last flushed notification; changes still waiting
+    in the notification window reach the client as state_delta right after.
+    Views come from the cached snapshot, so a reconnect storm reads no files.
+    A client whose `since` (epoch, revision) is still current gets "resumed"
+    instead of the view.
     """
-    global _last_global_sig, _last_deck_sig
+    snapshot = _current_state_snapshot()
+    if deck_id is None:
+        hello = {
+            "scope": "global",
+            "epoch": state_revisions.epoch,
+            "revision": _last_notified_revision,
+        }
+    else:
+        hello = {
+            "scope": "deck",
+            "deck_id": deck_id,
+            "epoch": state_revisions.epoch,
+            "revision": min(state_revisions.deck_revision(deck_id), _last_notified_revision),
+        }
+    if since is not None and since[0] == hello["epoch"] and since[1] >= hello["revision"]:
+        hello["resumed"] = True
+    else:
+        hello["view"] = snapshot.global_view() if deck_id is None else snapshot.deck_view(deck_id)
+    return hello
 
-    start_file_exists = START_FILE_PATH.exists()
-    raffle_list = _load_raffle_list()
+
+async def notify_state_change(deck_ids: Iterable[int] | None = None, immediate: bool = False):
+    """
+    Called after any write to raffle.json, pairings.json, settings or start.txt.
+    Bumps the revision of the global scope and of the affected decks
+    (deck_ids=None: every deck). The push itself is coalesced over
+    WS_NOTIFY_WINDOW_SECONDS; organizer actions pass immediate=True.
+    The event is also queued on the broadcast bus for the other workers.
+    """
+    deck_ids = None if deck_ids is None else [int(d) for d in deck_ids]
+    state_revisions.bump(deck_ids)
+    await notification_scheduler.request(immediate=immediate)
+    broadcast_bus.publish({"type": "state_changed", "deck_ids": deck_ids, "immediate": immediate})
+
+
+async def _on_bus_message(message: dict):
+    """
+    A state change written by another worker: the files are shared, so this
+    worker only has to bump its own revisions and push the delta to its sockets.
+    """
+    if message.get("type") != "state_changed":
+        return
+    # resync: the sender lost an earlier message, so refresh every deck
+    deck_ids = None if message.get("resync") else message.get("deck_ids")
+    state_revisions.bump(None if deck_ids is None else [int(d) for d in deck_ids])
+    await notification_scheduler.request(immediate=bool(message.get("immediate")))
+
+
+async def _flush_state_change():
+    """
+    Pushes the changed view fields (state_delta) to every group whose revision
+    moved since the last flush, so clients can patch instead of reloading.
+    """
+    global _last_notified_revision, _last_snapshot
+
+    since = _last_notified_revision
+    _last_notified_revision = state_revisions.global_revision
+    previous = _last_snapshot
+    snapshot = _last_snapshot = _state_snapshot()
 
     # global (CCP + home)
-    gsig = _global_signature(start_file_exists, raffle_list)
-    if _last_global_sig is None:
-        _last_global_sig = gsig
-        payload = {"type": "state_changed", "scope": "global", "signature": gsig}
-        await ws_manager.broadcast_group("ccp", payload)
-        await ws_manager.broadcast_group("home", payload)
-    elif gsig != _last_global_sig:
-        _last_global_sig = gsig
-        payload = {"type": "state_changed", "scope": "global", "signature": gsig}
-        await ws_manager.broadcast_group("ccp", payload)
-        await ws_manager.broadcast_group("home", payload)
+    if state_revisions.global_revision > since:
+        changes = view_changes(previous.global_view() if previous else None, snapshot.global_view())
+        if changes:
+            payload = {
+                "type": "state_delta",
+                "scope": "global",
+                "epoch": state_revisions.epoch,
+                "revision": state_revisions.global_revision,
+                "changes": changes,
+            }
+            await ws_manager.broadcast_group("ccp", payload)
+            await ws_manager.broadcast_group("home", payload)
 
     # per connected deck_id
     for did in ws_manager.active_deck_ids():
-        dsig = _deck_signature(did, start_file_exists, raffle_list)
-        prev = _last_deck_sig.get(did)
-        if prev is None:
-            _last_deck_sig[did] = dsig
-            payload = {"type": "state_changed", "scope": "deck", "deck_id": did, "signature": dsig}
-            await ws_manager.broadcast_group(f"deck:{did}", payload)
+        revision = state_revisions.deck_revision(did)
+        if revision <= since:
             continue
-        if dsig != prev:
-            _last_deck_sig[did] = dsig
-            payload = {"type": "state_changed", "scope": "deck", "deck_id": did, "signature": dsig}
+        changes = view_changes(previous.deck_view(did) if previous else None, snapshot.deck_view(did))
+        if changes:
+            payload = {
+                "type": "state_delta",
+                "scope": "deck",
+                "deck_id": did,
+                "epoch": state_revisions.epoch,
+                "revision": revision,
+                "changes": changes,
+            }
             await ws_manager.broadcast_group(f"deck:{did}", payload)
 
+
+notification_scheduler = NotificationScheduler(_flush_state_change, WS_NOTIFY_WINDOW_SECONDS)
+
+
+def _table_deck_ids(raffle_list: list[dict], round_no: int, table_no: int) -> list[int]:
+    return [
+        e["deck_id"]
+        for e in raffle_list
+        if e.get("deck_id") is not None
+        and e.get("pairing_round") == round_no
+        and e.get("pairing_table") == table_no
+    ]
+
 @app.get("/", response_class=HTMLResponse)
 async def get_form(
     request: Request,
@@ -467,16 +672,6 @@ async def get_form(
 async def _scryfall_get_card_by_id(card_id: str) -> dict | None:
     return await get_card_by_id(card_id)
 
-async def _scryfall_random_commander(exclude_card_ids: set[str] | None = None, max_tries: int = 25) -> dict | None:
-    """
-    Picks a random commander card from Scryfall.
-    Returns the full card JSON or None.
-
-    exclude_card_ids: avoids duplicates by Scryfall card id
-    """
-    return await random_commander(exclude_card_ids=exclude_card_ids, max_tries=max_tries, query_template=_current_settings().scryfall.random_commander_query)
-
-
 async def _scryfall_random_commander_with_query(
     query_template: str,
     exclude_card_ids: set[str] | None = None,
@@ -488,116 +683,88 @@ async def _scryfall_random_commander_with_query(
         query_template=query_template,
     )
 
-def _is_background(card: dict) -> bool:
-    return is_background(card)
-
-
-def _has_choose_a_background(card: dict) -> bool:
-    return has_choose_a_background(card)
-
-
-def _has_friends_forever(card: dict) -> bool:
-    return has_friends_forever(card)
-
-
-def _partner_with_target_name(card: dict) -> str | None:
-    return partner_with_target_name(card)
-
-
 async def _scryfall_is_partner_exact_name(name: str) -> bool:
     return await is_partner_exact_name(name, query_template=_current_settings().scryfall.partner_capable_query_template)
 
 
-async def _validate_commander_combo(c1: dict, c2: dict | None) -> str | None:
+def _validate_commander_combo(c1: dict, c2: dict | None) -> str | None:
     """
     Returns None if ok, else a German error message.
+    Pure local check (card_rules), no Scryfall round trips.
     """
-    if c2 is None:
-        if _is_background(c1):
-            return "Ein Background kann nicht alleine Commander sein. Wähle zuerst eine Kreatur mit 'Choose a Background'."
-        return None
-
-    c1_bg = _is_background(c1)
-    c2_bg = _is_background(c2)
+    return validate_commander_pair(c1, c2)
 
-    # Background pairing
-    if c1_bg or c2_bg:
-        if c1_bg and c2_bg:
-            return "Zwei Backgrounds zusammen sind nicht erlaubt. Wähle eine Kreatur mit 'Choose a Background' + genau einen Background."
-        non_bg = c2 if c1_bg else c1
-        if not _has_choose_a_background(non_bg):
-            return "Backgrounds funktionieren nur zusammen mit einem Commander, der 'Choose a Background' hat."
-        return None
 
-    # Partner with pairing (must match exactly)
-    p1 = _partner_with_target_name(c1)
-    p2 = _partner_with_target_name(c2)
-    if p1 or p2:
-        if not (p1 and p2):
-            return "Diese Kombination ist nicht gültig: 'Partner with' funktioniert nur mit der jeweils angegebenen Partnerkarte."
-        if p1.lower() != (c2.get("name") or "").lower() or p2.lower() != (c1.get("name") or "").lower():
-            return "Diese Kombination ist nicht gültig: 'Partner with' erlaubt nur das spezifisch genannte Paar."
-        return None
+_DEBUG_PARTNER_QUERY = "game:paper is:commander t:creature is:partner -t:background"
 
-    # Friends forever (must be both)
-    ff1 = _has_friends_forever(c1)
-    ff2 = _has_friends_forever(c2)
-    if ff1 != ff2:
-        return "Diese Kombination ist nicht gültig: 'Friends forever' kann nur mit einer anderen 'Friends forever'-Karte kombiniert werden."
-    if ff1 and ff2:
-        return None
 
-    # Generic partner-like (both must be is:partner)
-    c1_partner = await _scryfall_is_partner_exact_name(c1.get("name") or "")
-    c2_partner = await _scryfall_is_partner_exact_name(c2.get("name") or "")
-    if not (c1_partner and c2_partner):
-        return "Diese Kombination ist nicht Commander-legal: Beide Karten müssen kompatible Partner-Commander sein (oder 'Choose a Background' + Background)."
-
-    return None
-
-
-async def _debug_pick_legal_partner_combo(exclude_card_ids: set[str]) -> tuple[dict, dict] | None:
-    partner_creature_query = "game:paper is:commander t:creature is:partner -t:background"
+async def _debug_fetch_candidates(query_template: str, count: int, exclude_card_ids: set[str]) -> list[dict]:
+    """
+    Holt bis zu `count` verschiedene Zufalls-Commander parallel (begrenzt durch Semaphore
+    und den Scryfall-Rate-Limiter) statt nacheinander.
+    """
+    sem = asyncio.Semaphore(DEBUG_CANDIDATE_CONCURRENCY)
+
+    async def one() -> dict | None:
+        async with sem:
+            return await _scryfall_random_commander_with_query(
+                query_template=query_template,
+                exclude_card_ids=exclude_card_ids,
+                max_tries=1,
+            )
 
-    for _ in range(16):
-        commander1 = await _scryfall_random_commander_with_query(
-            query_template=partner_creature_query,
-            exclude_card_ids=exclude_card_ids,
-            max_tries=35,
+    seen: set[str] = set()
+    pool: list[dict] = []
+    for card in await asyncio.gather(*(one() for _ in range(max(0, count)))):
+        cid = str((card or {}).get("id") or "").strip()
+        name = str((card or {}).get("name") or "").strip()
+        if cid and name and cid not in seen:
+            seen.add(cid)
+            pool.append(card)
+    return pool
+
+
+async def _debug_pick_commanders(count: int, exclude_card_ids: set[str]) -> list[dict]:
+    picked: list[dict] = []
+    for _ in range(4):
+        missing = count - len(picked)
+        if missing <= 0:
+            break
+        exclude = exclude_card_ids | {c["id"] for c in picked}
+        pool = await _debug_fetch_candidates(
+            _current_settings().scryfall.random_commander_query, missing + 2, exclude
         )
-        if not commander1:
-            continue
+        picked.extend(pool[:missing])
+    return picked
 
-        commander1_id = str(commander1.get("id") or "").strip()
-        commander1_name = str(commander1.get("name") or "").strip()
-        if not commander1_id or not commander1_name:
-            continue
 
-        if not await _scryfall_is_partner_exact_name(commander1_name):
-            continue
-
-        local_exclude = set(exclude_card_ids)
-        local_exclude.add(commander1_id)
-
-        for _ in range(40):
-            commander2 = await _scryfall_random_commander_with_query(
-                query_template=partner_creature_query,
-                exclude_card_ids=local_exclude,
-                max_tries=35,
+async def _debug_pick_legal_partner_combos(count: int, exclude_card_ids: set[str]) -> list[tuple[dict, dict]]:
+    """
+    Füllt einen Kandidaten-Pool mit Partner-Kreaturen und bildet daraus lokal validierte Paare.
+    """
+    pool: list[dict] = []
+    pairs: list[tuple[dict, dict]] = []
+    for _ in range(4):
+        missing = count - len(pairs)
+        if missing <= 0:
+            break
+        exclude = exclude_card_ids | {c["id"] for c in pool} | {c["id"] for pair in pairs for c in pair}
+        fresh = await _debug_fetch_candidates(_DEBUG_PARTNER_QUERY, 2 * missing + 4, exclude)
+        pool.extend(c for c in fresh if card_capabilities(c) & CAP_PARTNER)
+
+        remaining: list[dict] = []
+        for card in pool:
+            mate = next(
+                (c for c in remaining if _validate_commander_combo(c, card) is None),
+                None,
             )
-            if not commander2:
-                continue
-
-            commander2_id = str(commander2.get("id") or "").strip()
-            commander2_name = str(commander2.get("name") or "").strip()
-            if not commander2_id or not commander2_name:
-                continue
-
-            combo_err = await _validate_commander_combo(commander1, commander2)
-            if combo_err is None:
-                return commander1, commander2
-
-    return None
+            if mate is not None and len(pairs) < count:
+                remaining.remove(mate)
+                pairs.append((mate, card))
+            else:
+                remaining.append(card)
+        pool = remaining
+    return pairs
 
 @app.post("/submit", response_class=HTMLResponse)
 async def submit_form(
@@ -680,19 +847,20 @@ async def submit_form(
 
         # Wenn wir valide IDs haben: Scryfall laden und Kombi-Regeln prüfen
         if commander_id and (not commander2 or commander2_id):
-            c1 = await _scryfall_get_card_by_id(commander_id)
+            # beide Karten parallel laden (meist aus Index/Cache)
+            c1, c2 = await asyncio.gather(
+                _scryfall_get_card_by_id(commander_id),
+                _scryfall_get_card_by_id(commander2_id) if commander2_id else asyncio.sleep(0),
+            )
             if not c1:
                 field_errors["commander"] = "Commander 1 konnte bei Scryfall nicht geladen werden. Bitte erneut auswählen."
 
-            c2 = None
-            if commander2_id:
-                c2 = await _scryfall_get_card_by_id(commander2_id)
-                if not c2:
-                    field_errors["commander2"] = "Commander 2 konnte bei Scryfall nicht geladen werden. Bitte erneut auswählen."
+            if commander2_id and not c2:
+                field_errors["commander2"] = "Commander 2 konnte bei Scryfall nicht geladen werden. Bitte erneut auswählen."
 
             # Nur wenn beide (falls benötigt) geladen wurden, Kombi prüfen
             if c1 and (c2 is not None or not commander2_id):
-                combo_err = await _validate_commander_combo(c1, c2)
+                combo_err = _validate_commander_combo(c1, c2)
                 if combo_err:
                     # In der Praxis ist es fast immer commander2, aber zur Sicherheit:
                     field_errors["commander2"] = combo_err
@@ -746,7 +914,9 @@ async def submit_form(
             # Atomisch schreiben
             _atomic_write_json(FILE_PATH, data_list)
 
-        await notify_state_change()
+        await notify_state_change(deck_ids=[deck_id])
+        # Avatar wird im Hintergrund nachgetragen – die Registrierung wartet nicht auf Scryfall
+        _schedule_entry_avatar(deck_id, commander or "", commander_id)
 
         # Erfolgsseite anzeigen
         return RedirectResponse(url="/success", status_code=303)
@@ -762,6 +932,7 @@ async def success_page(request: Request):
     return templates.TemplateResponse("success.html", {"request": request})
 
 async def _clear_event_data_in_memory() -> None:
+    rounds_precomputer.invalidate()
     # Löschen von raffle.json, falls sie existiert
     if FILE_PATH.exists():
         FILE_PATH.unlink()
@@ -786,7 +957,7 @@ async def clear_data():
         async with RAFFLE_LOCK:
             await _clear_event_data_in_memory()
 
-        await notify_state_change()
+        await notify_state_change(immediate=True)
 
         # Weiterleitung zurück zum Customer Control Panel
         return RedirectResponse(url="/CCP", status_code=303)
@@ -1029,6 +1200,8 @@ def _debug_start_raffle_in_memory(raffle_list: list[dict]) -> dict:
         raise HTTPException(status_code=400, detail=str(e))
 
     _atomic_write_json(FILE_PATH, raffle_list)
+    _schedule_rounds_precompute(raffle_list, pick_num_pods=_debug_pick_num_pods)
+    _schedule_preview_prewarm(raffle_list)
 
     return {
         "ok": True,
@@ -1037,7 +1210,7 @@ def _debug_start_raffle_in_memory(raffle_list: list[dict]) -> dict:
     }
 
 
-def _debug_start_pairings_in_memory(raffle_list: list[dict]) -> dict:
+async def _debug_start_pairings_in_memory(raffle_list: list[dict]) -> dict:
     """
     Equivalent of /startPairings, but chooses num_pods automatically.
     Assumes RAFFLE_LOCK is held by caller.
@@ -1052,7 +1225,7 @@ def _debug_start_pairings_in_memory(raffle_list: list[dict]) -> dict:
         raise HTTPException(status_code=400, detail="Zu wenige Spieler.")
 
     num_pods = _debug_pick_num_pods(len(players))
-    rounds = _build_rounds(players, int(num_pods), _current_settings().max_rounds)
+    rounds = await _take_or_build_rounds(players, int(num_pods), _current_settings().max_rounds)
 
     state = {
         "pods": int(num_pods),
@@ -1235,6 +1408,12 @@ def _debug_report_missing_round_results_in_memory(state: dict) -> dict:
 
 
 async def _debug_apply_step() -> dict:
+    # Debug-Schritte laufen in der Bulk-Lane, echte Nutzer-Requests haben Vorrang
+    with scryfall_priority(PRIORITY_BULK):
+        return await _debug_run_step()
+
+
+async def _debug_run_step() -> dict:
     """
     Executes exactly one reasonable next step depending on current event state.
     Returns a result dict for JSON/HTML output.
@@ -1274,6 +1453,25 @@ async def _debug_apply_step() -> dict:
             created_entries: list[dict] = []
             seen_card_ids: set[str] = set()
 
+            # Kandidaten für alle Decks vorab parallel laden (statt Deck für Deck)
+            single_count = len(deck_ids) - len(partner_deck_ids)
+            combos, singles = await asyncio.gather(
+                _debug_pick_legal_partner_combos(len(partner_deck_ids), seen_card_ids),
+                _debug_pick_commanders(single_count, seen_card_ids),
+            )
+            if len(combos) < len(partner_deck_ids):
+                raise HTTPException(status_code=502, detail="Konnte keine gültige Partner-Kombo von Scryfall laden.")
+
+            # beide Pools liefen parallel -> Überschneidungen mit den Partner-Karten nachfüllen
+            combo_ids = {c["id"] for pair in combos for c in pair}
+            singles = [c for c in singles if c["id"] not in combo_ids]
+            if len(singles) < single_count:
+                singles += await _debug_pick_commanders(
+                    single_count - len(singles), combo_ids | {c["id"] for c in singles}
+                )
+            if len(singles) < single_count:
+                raise HTTPException(status_code=502, detail="Konnte keinen zufälligen Commander von Scryfall laden.")
+
             for deck_id, deckersteller in zip(deck_ids, selected_names):
                 commander_name = None
                 commander_id = None
@@ -1281,11 +1479,7 @@ async def _debug_apply_step() -> dict:
                 commander2_id = None
 
                 if deck_id in partner_deck_ids:
-                    combo = await _debug_pick_legal_partner_combo(seen_card_ids)
-                    if not combo:
-                        raise HTTPException(status_code=502, detail="Konnte keine gültige Partner-Kombo von Scryfall laden.")
-
-                    card1, card2 = combo
+                    card1, card2 = combos.pop()
                     commander_name = (card1.get("name") or "").strip()
                     commander_id = (card1.get("id") or "").strip()
                     commander2_name = (card2.get("name") or "").strip()
@@ -1297,10 +1491,7 @@ async def _debug_apply_step() -> dict:
                     seen_card_ids.add(commander_id)
                     seen_card_ids.add(commander2_id)
                 else:
-                    card = await _scryfall_random_commander(exclude_card_ids=seen_card_ids)
-                    if not card:
-                        raise HTTPException(status_code=502, detail="Konnte keinen zufälligen Commander von Scryfall laden.")
-
+                    card = singles.pop()
                     commander_name = (card.get("name") or "").strip()
                     commander_id = (card.get("id") or "").strip()
                     if not commander_name or not commander_id:
@@ -1320,6 +1511,8 @@ async def _debug_apply_step() -> dict:
                     "received_confirmed": False
                 })
 
+            await _attach_avatar_urls(created_entries)
+
             # überschreibt nur deck_ids 1..8
             raffle_list = [e for e in raffle_list if e.get("deck_id") not in deck_ids]
             raffle_list.extend(created_entries)
@@ -1371,7 +1564,7 @@ async def _debug_apply_step() -> dict:
         # Phase 3: Start pairings / round 1
         # -------------------------
         if phase == "pairings_start_needed":
-            result = _debug_start_pairings_in_memory(raffle_list)
+            result = await _debug_start_pairings_in_memory(raffle_list)
             result["phase"] = phase
             return result
 
@@ -1762,7 +1955,9 @@ async def start_raffle():
     """
     try:
         start_raffle_service(FILE_PATH, START_FILE_PATH, min_decks=_current_settings().min_decks_to_start)
-        await notify_state_change()
+        _schedule_rounds_precompute()
+        _schedule_preview_prewarm()
+        await notify_state_change(immediate=True)
         return RedirectResponse(url="/CCP", status_code=303)
     except RaffleStartError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1809,117 +2004,185 @@ async def confirm_received(deck_id: int = Form(...)):
 
         _atomic_write_json(FILE_PATH, data_list)
 
-    await notify_state_change()
+    await notify_state_change(deck_ids=[deck_id])
     return RedirectResponse(url=f"/?deck_id={deck_id}", status_code=303)
 
-@app.get("/api/commander_suggest")
-async def commander_suggest(q: str = ""):
+def _suggest_items_from_cards(cards: list[dict], limit: int) -> list[dict]:
+    items = []
+    for card in cards:
+        name = card.get("name")
+        cid = card.get("id")
+        if name and cid:
+            items.append({
+                "name": name,
+                "id": cid,
+                "oracle_id": card.get("oracle_id"),
+                "type_line": card.get("type_line"),
+            })
+        if len(items) >= limit:
+            break
+    return items
+
+
+_DEFAULT_SCRYFALL_SETTINGS = ScryfallSettings()
+
+
+def _local_suggest_items(q: str, flag: str, limit: int) -> list[dict]:
     """
-    Returns up to SUGGEST_LIMIT objects for commander suggestions.
-    Each item: {name, id, oracle_id, type_line}
+    Answers suggest requests from the offline bulk-data index.
+    Only used for the built-in query templates (custom templates may filter differently);
+    an empty result means "ask Scryfall".
     """
-    q = (q or "").strip()
-    settings = _current_settings()
-    if len(q) < settings.api.suggest_min_chars:
-        return JSONResponse([])
+    if not card_index.loaded:
+        return []
+    return _suggest_items_from_cards(card_index.search_name(q, flag=flag, limit=limit), limit)
 
-    key = f"cmd::{q.lower()}"
-    cached = _cache_get(key)
-    if cached is not None:
-        return JSONResponse(cached)
 
-    scry_q = settings.scryfall.commander_suggest_query_template.replace("{q}", q)
-    url = f"{SCRYFALL_BASE}/cards/search?q={quote_plus(scry_q)}&unique=cards&order=name"
+def _suggest_cache_key(template: str, q: str) -> str:
+    return f"{template}\x00{q.lower()}"
 
-    headers = {
-        "Accept": "application/json",
-        "User-Agent": "CommanderRaffle/1.0 (contact: kizzm-commanderraffle@tri-b-oon.de)",
-    }
 
+# reine Namensfragmente: Wörter ohne Scryfall-Operatoren (t:, c>=, "…", -x, or, …)
+_PLAIN_NAME_WORD_RE = re.compile(r"\w[\w',.-]*")
+_SCRYFALL_KEYWORDS = {"or", "and"}
+
+
+def _is_plain_name_query(q: str) -> bool:
+    words = q.split()
+    return bool(words) and all(
+        _PLAIN_NAME_WORD_RE.fullmatch(word) and word.lower() not in _SCRYFALL_KEYWORDS
+        for word in words
+    )
+
+
+def _cached_suggest_items(cache: TTLCache, template: str, q: str, min_chars: int) -> list[dict] | None:
+    """
+    Exakter Cache-Treffer oder – bei name:{q}-Templates – Filterung eines vollständigen
+    Ergebnisses für einen kürzeren Prefix (jede längere Eingabe ist eine Teilmenge davon).
+    Letzteres nur für reine Namensfragmente: mit Operatoren in q ist die längere
+    Anfrage keine Teilmenge mehr und geht an Scryfall.
+    """
+    entry = cache.get(_suggest_cache_key(template, q))
+    if entry is not None:
+        return entry["items"]
+    if "name:{q}" not in template or not _is_plain_name_query(q):
+        return None
+
+    for end in range(len(q) - 1, min_chars - 1, -1):
+        if not _is_plain_name_query(q[:end]):
+            continue
+        shorter = cache.peek(_suggest_cache_key(template, q[:end]))
+        if shorter is None or not shorter["complete"]:
+            continue
+        words = normalize_name(q).split()
+        items = [
+            item for item in shorter["items"]
+            if all(word in normalize_name(item.get("name") or "") for word in words)
+        ]
+        cache.set(_suggest_cache_key(template, q), {"items": items, "complete": True})
+        return items
+    return None
+
+
+def _store_suggest_items(cache: TTLCache, template: str, q: str, payload: dict, limit: int) -> list[dict]:
+    items = _suggest_items_from_cards(payload.get("data") or [], limit)
     try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=headers) as client:
-            r = await client.get(url)
-            if r.status_code != 200:
-                return JSONResponse([])
-
-            payload = r.json()
-            data = payload.get("data") or []
-
-            items = []
-            for card in data:
-                name = card.get("name")
-                cid = card.get("id")
-                if name and cid:
-                    items.append({
-                        "name": name,
-                        "id": cid,
-                        "oracle_id": card.get("oracle_id"),
-                        "type_line": card.get("type_line"),
-                    })
-                if len(items) >= settings.api.suggest_limit:
-                    break
+        total = int(payload.get("total_cards"))
+    except (TypeError, ValueError):
+        total = None
+    # vollständig = Scryfall kennt nicht mehr Treffer, als wir ausliefern
+    complete = total is not None and total <= len(items) and not payload.get("has_more")
+    cache.set(_suggest_cache_key(template, q), {"items": items, "complete": complete})
+    return items
 
-            _cache_set(key, items)
-            return JSONResponse(items)
 
-    except Exception:
-        return JSONResponse([])
-    
-@app.get("/api/partner_suggest")
-async def partner_suggest(q: str = ""):
+async def _suggest_items(kind: str, q: str) -> list[dict]:
     """
-    Returns up to SUGGEST_LIMIT objects matching q that are is:partner.
-    Each item: {name, id, oracle_id, type_line}
+    Suggest lookup shared by the HTTP endpoints and the WebSocket suggest channel.
+    kind: "commander" | "partner" | a PAIRING_SUGGEST_QUERIES key (second commander
+    for Backgrounds, Friends forever, Doctors, …). Each item: {name, id, oracle_id, type_line}
     """
     q = (q or "").strip()
     settings = _current_settings()
     if len(q) < settings.api.suggest_min_chars:
-        return JSONResponse([])
+        return []
+
+    if kind in PAIRING_SUGGEST_QUERIES:
+        # feste Vorlagen: immer lokal beantwortbar, Cache-Key enthält die Vorlage
+        template = default_template = PAIRING_SUGGEST_QUERIES[kind]
+        cache = _suggest_partner_cache
+        headers = None
+    elif kind == "partner":
+        template = settings.scryfall.partner_suggest_query_template
+        default_template = _DEFAULT_SCRYFALL_SETTINGS.partner_suggest_query_template
+        cache = _suggest_partner_cache
+        headers = None
+    else:
+        template = settings.scryfall.commander_suggest_query_template
+        default_template = _DEFAULT_SCRYFALL_SETTINGS.commander_suggest_query_template
+        cache = _suggest_commander_cache
+        headers = {
+            "Accept": "application/json",
+            "User-Agent": "CommanderRaffle/1.0 (contact: kizzm-commanderraffle@tri-b-oon.de)",
+        }
 
-    key = f"partner::{q.lower()}"
-    cached = _cache_get(key)
+    if template == default_template:
+        local = _local_suggest_items(q, kind, settings.api.suggest_limit)
+        if local:
+            return local
+
+    cached = _cached_suggest_items(cache, template, q, settings.api.suggest_min_chars)
     if cached is not None:
-        return JSONResponse(cached)
+        return cached
 
-    scry_q = settings.scryfall.partner_suggest_query_template.replace("{q}", q)
-    url = f"{SCRYFALL_BASE}/cards/search?q={quote_plus(scry_q)}&unique=cards&order=name"
+    scry_q = template.replace("{q}", q)
 
-    try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-            r = await client.get(url)
-            if r.status_code != 200:
-                return JSONResponse([])
-
-            payload = r.json()
-            data = payload.get("data") or []
-
-            items = []
-            for card in data:
-                name = card.get("name")
-                cid = card.get("id")
-                if name and cid:
-                    items.append({
-                        "name": name,
-                        "id": cid,
-                        "oracle_id": card.get("oracle_id"),
-                        "type_line": card.get("type_line"),
-                    })
-                if len(items) >= settings.api.suggest_limit:
-                    break
+    payload = await search_cards(scry_q, unique="cards", order="name", headers=headers)
+    if payload is None:
+        return []
 
-            _cache_set(key, items)
-            return JSONResponse(items)
+    return _store_suggest_items(cache, template, q, payload, settings.api.suggest_limit)
+
+
+@app.get("/api/commander_suggest")
+async def commander_suggest(q: str = ""):
+    """
+    Returns up to SUGGEST_LIMIT objects for commander suggestions.
+    Each item: {name, id, oracle_id, type_line}
+    """
+    return JSONResponse(await _suggest_items("commander", q))
 
-    except Exception:
-        return JSONResponse([])
+
+@app.get("/api/partner_suggest")
+async def partner_suggest(q: str = "", kind: str = "partner"):
+    """
+    Returns up to SUGGEST_LIMIT second-commander candidates matching q.
+    kind (from /api/commander_partner_capable): "partner" (is:partner) or a
+    PAIRING_SUGGEST_QUERIES key, e.g. "background" after a Choose-a-Background commander.
+    Each item: {name, id, oracle_id, type_line}
+    """
+    if kind not in PAIRING_SUGGEST_QUERIES:
+        kind = "partner"
+    return JSONResponse(await _suggest_items(kind, q))
 
 @app.get("/api/commander_partner_capable")
 async def commander_partner_capable(name: str = ""):
     """
-    Returns {"partner_capable": bool}
-    Checks via Scryfall search: !"<exact name>" is:partner
+    Returns {"partner_capable": bool, "partner_kind": str | None}
+    partner_kind is the /api/partner_suggest kind that lists valid second commanders.
+    With the built-in query template the card's pairing abilities are checked locally
+    (index/cache, one named lookup at most), so Choose a Background, Friends forever
+    and Doctor cards qualify too; custom templates still ask Scryfall:
+    !"<exact name>" is:partner
     """
-    return JSONResponse({"partner_capable": await _scryfall_is_partner_exact_name(name)})
+    settings = _current_settings()
+    if settings.scryfall.partner_capable_query_template == _DEFAULT_SCRYFALL_SETTINGS.partner_capable_query_template:
+        card = await _scryfall_named_exact(name)
+        if card:
+            kind = partner_suggest_kind(card_capabilities(card))
+            return JSONResponse({"partner_capable": kind is not None, "partner_kind": kind})
+    capable = await _scryfall_is_partner_exact_name(name)
+    return JSONResponse({"partner_capable": capable, "partner_kind": "partner" if capable else None})
 
 
 @app.get("/api/validate_commander_combo")
@@ -1937,21 +2200,23 @@ async def validate_commander_combo(commander_id: str = "", commander2_id: str =
             status_code=400,
         )
 
-    c1 = await _scryfall_get_card_by_id(commander_id)
+    c1, c2 = await asyncio.gather(
+        _scryfall_get_card_by_id(commander_id),
+        _scryfall_get_card_by_id(commander2_id),
+    )
     if not c1:
         return JSONResponse(
             {"legal": False, "error": "Commander 1 konnte bei Scryfall nicht geladen werden. Bitte erneut auswählen."},
             status_code=404,
         )
 
-    c2 = await _scryfall_get_card_by_id(commander2_id)
     if not c2:
         return JSONResponse(
             {"legal": False, "error": "Commander 2 konnte bei Scryfall nicht geladen werden. Bitte erneut auswählen."},
             status_code=404,
         )
 
-    combo_err = await _validate_commander_combo(c1, c2)
+    combo_err = _validate_commander_combo(c1, c2)
     return JSONResponse({"legal": combo_err is None, "error": combo_err})
 
 async def _scryfall_named_exact(name: str) -> dict | None:
@@ -1962,27 +2227,38 @@ async def _scryfall_named_exact(name: str) -> dict | None:
     return await named_exact(name)
 
 
+def _avatar_template() -> str:
+    return _current_settings().scryfall.round_report_avatar_query_template
+
+
 async def _round_report_avatar_art_url(commander_name: str, commander_id: str | None = None) -> str | None:
     commander_id = (commander_id or "").strip() or None
+    commander_name = (commander_name or "").strip()
+    template = _avatar_template()
+
+    # Memo pro (Template, Name, ID) – Fehlschläge (None) werden nicht gemerkt
+    key = f"{template}::{commander_name.lower()}::{commander_id or ''}"
+    cached = _avatar_cache.get(key)
+    if cached:
+        return cached
+
+    with scryfall_priority(PRIORITY_BACKGROUND):
+        url = await _resolve_avatar_art_url(template, commander_name, commander_id)
+    if url:
+        _avatar_cache.set(key, url)
+    return url
+
+
+async def _resolve_avatar_art_url(template: str, commander_name: str, commander_id: str | None) -> str | None:
     card = None
 
     if commander_name:
-        settings = _current_settings()
         safe_name = commander_name.replace('"', '\\"')
-        query = settings.scryfall.round_report_avatar_query_template.replace('{name}', safe_name)
-        url = (
-            f"{SCRYFALL_BASE}/cards/search?"
-            f"q={quote_plus(query)}&unique=art&order=released&dir=desc"
-        )
-        try:
-            async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-                r = await client.get(url)
-                if r.status_code == 200:
-                    data = (r.json().get('data') or [])
-                    if data:
-                        card = data[0]
-        except Exception:
-            card = None
+        query = template.replace('{name}', safe_name)
+        payload = await search_cards(query, unique="art", order="released", direction="desc")
+        data = ((payload or {}).get('data') or [])
+        if data:
+            card = data[0]
 
     if not card and commander_id:
         card = await _scryfall_get_card_by_id(commander_id)
@@ -1990,12 +2266,127 @@ async def _round_report_avatar_art_url(commander_name: str, commander_id: str |
     if not card:
         return None
 
-    img = _get_image_url(card, 'art_crop')
+    img = _proxied_image_url(card, 'art_crop', AVATAR_IMAGE_WIDTH)
     if not img:
-        img = _get_image_url(card, 'normal')
+        img = _proxied_image_url(card, 'normal', AVATAR_IMAGE_WIDTH)
     return img
 
 
+async def _entry_avatar_url(entry: dict | None) -> str | None:
+    """
+    Avatar für einen Raffle-Eintrag: bevorzugt den bei der Registrierung gespeicherten Wert,
+    solange das Avatar-Template unverändert ist.
+    """
+    entry = entry or {}
+    stored = entry.get("avatar_url")
+    if stored and entry.get("avatar_template") == _avatar_template():
+        return stored
+    return await _round_report_avatar_art_url(str(entry.get("commander") or ""), entry.get("commander_id"))
+
+
+async def _entries_avatar_urls(entries: list[dict | None]) -> list[str | None]:
+    # parallel, aber begrenzt – schont das Scryfall-Rate-Limit
+    sem = asyncio.Semaphore(AVATAR_RESOLVE_CONCURRENCY)
+
+    async def one(entry):
+        async with sem:
+            return await _entry_avatar_url(entry)
+
+    return list(await asyncio.gather(*(one(e) for e in entries)))
+
+
+async def _attach_avatar_urls(entries: list[dict]) -> None:
+    """
+    Speichert avatar_url (+ verwendetes Template) direkt am Deck-Eintrag, damit Round-Report
+    und Voting im Normalfall nicht auf Scryfall warten müssen.
+    """
+    template = _avatar_template()
+    urls = await _entries_avatar_urls(entries)
+    for entry, url in zip(entries, urls):
+        if url:
+            entry["avatar_url"] = url
+            entry["avatar_template"] = template
+
+
+# laufende Avatar-Nachträge (Referenz hält die Tasks am Leben)
+_avatar_tasks: set[asyncio.Task] = set()
+
+
+def _schedule_entry_avatar(deck_id: int, commander_name: str, commander_id: str | None) -> None:
+    task = asyncio.create_task(_store_entry_avatar(deck_id, commander_name, commander_id))
+    _avatar_tasks.add(task)
+    task.add_done_callback(_avatar_tasks.discard)
+
+
+async def _store_entry_avatar(deck_id: int, commander_name: str, commander_id: str | None) -> None:
+    """
+    Löst den Avatar eines frisch registrierten Decks auf und speichert ihn am Eintrag.
+    Schlägt das fehl, wird er beim ersten Round-Report/Voting lazy aufgelöst (_entry_avatar_url).
+    """
+    try:
+        template = _avatar_template()
+        url = await _round_report_avatar_art_url(commander_name, commander_id)
+        if not url:
+            return
+        async with RAFFLE_LOCK:
+            raffle_list = _load_raffle_list()
+            entry = next((e for e in raffle_list if e.get("deck_id") == deck_id), None)
+            # Eintrag inzwischen gelöscht oder mit anderem Commander neu registriert
+            if entry is None or entry.get("commander_id") != commander_id:
+                return
+            entry["avatar_url"] = url
+            entry["avatar_template"] = template
+            _atomic_write_json(FILE_PATH, raffle_list)
+    except Exception as e:
+        logger.warning("avatar for deck %s failed: %s", deck_id, e)
+
+
+_CARD_ID_RE = re.compile(r"[0-9a-fA-F-]{36}")
+
+
+@app.get("/img/{card_id}/{variant}")
+async def card_image(request: Request, card_id: str, variant: str, w: int | None = None):
+    """
+    Lokaler Bild-Proxy: jedes Kartenbild wird nur einmal von Scryfall geladen,
+    danach direkt von Platte (FileResponse) mit starkem ETag ausgeliefert.
+    Die URL enthält keinen Inhalts-Hash, daher begrenztes max-age statt immutable.
+    """
+    if variant not in IMAGE_VARIANTS or not _CARD_ID_RE.fullmatch(card_id):
+        raise HTTPException(status_code=404, detail="Bild nicht gefunden.")
+
+    result = await load_image(card_id.lower(), variant, w)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Bild nicht gefunden.")
+
+    path, etag = result
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={IMAGE_PROXY_MAX_AGE_SECONDS}"}
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=image_media_type(variant), headers=headers)
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return JSONResponse(caches.stats())
+
+
+@app.get("/api/ws/stats")
+async def ws_stats():
+    return JSONResponse({
+        **ws_manager.stats(),
+        "handshakes": ws_handshake_gate.stats(),
+        "notifications": notification_scheduler.stats(),
+        "revisions": state_revisions.stats(),
+        "bus": broadcast_bus.stats(),
+        "connection_list": ws_manager.connection_stats(),
+    })
+
+
+@app.get("/api/scryfall/metrics")
+async def scryfall_metrics_endpoint():
+    return JSONResponse({**scryfall_metrics(), "background_art_pool": background_art_pool.stats()})
+
+
 @app.get("/api/settings/effective")
 async def settings_effective():
     settings, meta = load_event_settings()
@@ -2020,7 +2411,9 @@ async def settings_patch(payload: dict = Body(...)):
         raise HTTPException(status_code=400, detail=str(exc))
 
     save_event_settings(updated)
-    await notify_state_change()
+    if {"default_num_pods", "max_rounds"} & set(changed_keys):
+        _schedule_rounds_precompute()
+    await notify_state_change(immediate=True)
 
     return JSONResponse({
         "ok": True,
@@ -2042,7 +2435,9 @@ async def settings_reset():
         raise HTTPException(status_code=400, detail=str(exc))
 
     save_event_settings(updated)
-    await notify_state_change()
+    if {"default_num_pods", "max_rounds"} & set(changed_keys):
+        _schedule_rounds_precompute()
+    await notify_state_change(immediate=True)
 
     return JSONResponse({
         "ok": True,
@@ -2064,84 +2459,46 @@ async def background_default():
     settings = _current_settings()
 
     # 1) Local PNG backgrounds (preferred)
+    pngs = _local_background_files()
+    if pngs:
+        picked = choice(pngs)
+        # served via app.mount("/assets", StaticFiles(directory="assets"))
+        return JSONResponse(
+            {"url": f"/assets/backgrounds/{picked.name}", "zoom": settings.ui.default_bg_zoom}
+        )
+
+    # 2) Fallback: Scryfall default – aus dem vorab gefüllten Pool, nur bei leerem Pool live
+    img = await background_art_pool.resolve(settings.scryfall.default_background_query)
+    return JSONResponse({"url": img, "zoom": settings.ui.default_bg_zoom})
+
+
+def _local_background_files() -> list[Path]:
     bg_dir = Path("assets") / "backgrounds"
     try:
         if bg_dir.exists() and bg_dir.is_dir():
             # case-insensitive *.png
             allowed_ext = {".png", ".webp", ".jpg", ".jpeg"}
-            pngs = [p for p in bg_dir.iterdir() if p.is_file() and p.suffix.lower() in allowed_ext]
-            if pngs:
-                picked = choice(pngs)
-                # served via app.mount("/assets", StaticFiles(directory="assets"))
-                return JSONResponse(
-                    {"url": f"/assets/backgrounds/{picked.name}", "zoom": settings.ui.default_bg_zoom}
-                )
+            return [p for p in bg_dir.iterdir() if p.is_file() and p.suffix.lower() in allowed_ext]
     except Exception:
         # any filesystem weirdness -> fall back to Scryfall
         pass
+    return []
 
-    # 2) Fallback: Scryfall default (existing logic)
-    q = settings.scryfall.default_background_query
-    url = f"{SCRYFALL_BASE}/cards/search?q={quote_plus(q)}&unique=cards&order=name"
-
-    try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-            first = await client.get(url)
-            if first.status_code != 200:
-                return JSONResponse({"url": None, "zoom": settings.ui.default_bg_zoom})
-
-            payload = first.json()
-            total = int(payload.get("total_cards") or 0)
-            if total <= 0:
-                return JSONResponse({"url": None, "zoom": settings.ui.default_bg_zoom})
-
-            per_page = len(payload.get("data") or [])
-            if per_page <= 0:
-                return JSONResponse({"url": None, "zoom": settings.ui.default_bg_zoom})
-
-            max_page = max(1, (total + per_page - 1) // per_page)
-            page = randint(1, max_page)
-
-            page_url = url + f"&page={page}"
-            resp = await client.get(page_url)
-            if resp.status_code != 200:
-                return JSONResponse({"url": None, "zoom": settings.ui.default_bg_zoom})
-
-            data = (resp.json().get("data") or [])
-            if not data:
-                return JSONResponse({"url": None, "zoom": settings.ui.default_bg_zoom})
-
-            card = data[randint(0, len(data) - 1)]
-            img = _get_image_url(card, "art_crop")
-            return JSONResponse({"url": img, "zoom": settings.ui.default_bg_zoom})
-
-    except Exception:
-        return JSONResponse({"url": None, "zoom": settings.ui.default_bg_zoom})
-
-async def _scryfall_query_preview_image(client: httpx.AsyncClient, query: str) -> str | None:
-    query = (query or "").strip()
-    if not query:
-        return None
-
-    url = (
-        f"{SCRYFALL_BASE}/cards/search?"
-        f"q={quote_plus(query)}&unique=prints&order=released&dir=desc"
-    )
-
-    r = await client.get(url)
-    if r.status_code != 200:
-        return None
-
-    data = (r.json().get("data") or [])
-    if not data:
-        return None
+async def _scryfall_query_preview_image(query: str) -> tuple[str | None, bool]:
+    """
+    (Bild-URL, beantwortet). beantwortet=False heißt: Scryfall nicht erreichbar
+    (Breaker offen, Timeout, 429/5xx) – das ist kein echter Fehltreffer.
+    """
+    payload = await search_cards(query, unique="prints", order="released", direction="desc")
+    if payload is None:
+        return None, False
 
-    for card in data:
-        img = _get_image_url(card, "border_crop") or _get_image_url(card, "large")
+    for card in payload.get("data") or []:
+        img = _proxied_image_url(card, "border_crop") or _proxied_image_url(card, "large")
         if img:
-            return img
+            return img, True
 
-    return None
+    return None, True
 
 
 @app.get("/api/background/commander")
@@ -2151,25 +2508,74 @@ async def background_commander(name: str = ""):
     if not name:
         return JSONResponse({"url": None, "zoom": settings.ui.commander_bg_zoom})
 
-    safe = name.replace('"', '\\"')
+    img = await _commander_preview_url(name)
+    return JSONResponse({"url": img, "zoom": settings.ui.commander_bg_zoom})
+
+
+_preview_prewarm_task: asyncio.Task | None = None
+
+
+async def _commander_preview_url(name: str) -> str | None:
+    name = (name or "").strip()
+    if not name:
+        return None
+
+    settings = _current_settings()
     default_q_template = (
         settings.scryfall.card_preview_query_template
         or 'game:paper is:commander is:normal !"{name}"'
     )
     fallback_q_template = settings.scryfall.card_preview_fallback_query_template or ""
 
-    default_q = default_q_template.replace('{name}', safe)
-    fallback_q = fallback_q_template.replace('{name}', safe)
+    # Templates im Key = automatische Invalidierung bei Settings-Änderung
+    key = f"{default_q_template}\x00{fallback_q_template}\x00{name.lower()}"
+    cached = _preview_cache.get(key, _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return cached
 
-    try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-            img = await _scryfall_query_preview_image(client, default_q)
-            if not img and fallback_q:
-                img = await _scryfall_query_preview_image(client, fallback_q)
-            return JSONResponse({"url": img, "zoom": settings.ui.commander_bg_zoom})
+    safe = name.replace('"', '\\"')
+    img, answered = await _scryfall_query_preview_image(default_q_template.replace('{name}', safe))
+    if not img and fallback_q_template:
+        img, fallback_answered = await _scryfall_query_preview_image(fallback_q_template.replace('{name}', safe))
+        answered = answered and fallback_answered
+
+    if img:
+        _preview_cache.set(key, img)
+    elif answered:
+        # echte Fehltreffer werden kürzer gemerkt; fehlgeschlagene Abfragen gar nicht
+        _preview_cache.set(key, None, ttl_seconds=PREVIEW_NEGATIVE_TTL_SECONDS)
+    return img
+
+
+def _schedule_preview_prewarm(raffle_list: list[dict] | None = None) -> None:
+    """
+    Lädt beim Raffle-Start die Kartenvorschau aller registrierten Commander vor
+    (Hintergrund-Lane, begrenzt parallel).
+    """
+    global _preview_prewarm_task
+    entries = raffle_list if raffle_list is not None else _load_raffle_list()
+    names = list(dict.fromkeys(
+        str(e.get(field) or "").strip()
+        for e in entries
+        for field in ("commander", "commander2")
+        if str(e.get(field) or "").strip()
+    ))
+    if not names:
+        return
+    if _preview_prewarm_task is not None and not _preview_prewarm_task.done():
+        _preview_prewarm_task.cancel()
+    _preview_prewarm_task = asyncio.create_task(_prewarm_previews(names))
 
-    except Exception:
-        return JSONResponse({"url": None, "zoom": settings.ui.commander_bg_zoom})
+
+async def _prewarm_previews(names: list[str]) -> None:
+    sem = asyncio.Semaphore(AVATAR_RESOLVE_CONCURRENCY)
+
+    async def one(name: str) -> None:
+        async with sem:
+            await _commander_preview_url(name)
+
+    with scryfall_priority(PRIORITY_BACKGROUND):
+        await asyncio.gather(*(one(n) for n in names), return_exceptions=True)
 
 
 def _best_deck_votes_bucket(state: dict) -> dict:
@@ -2803,12 +3209,12 @@ async def current_best_deck_voting(deck_id: int):
         for e in raffle_list
         if int(e.get("deck_id") or 0) > 0
     }
-    for candidate in candidates:
-        candidate_deck_id = int(candidate.get("deck_id") or 0)
-        owner_entry = raffle_by_deck_id.get(candidate_deck_id) or {}
-        commander_name = (owner_entry.get("commander") or "").strip()
-        commander_id = owner_entry.get("commander_id")
-        candidate["avatar_url"] = await _round_report_avatar_art_url(commander_name, commander_id)
+    avatar_urls = await _entries_avatar_urls([
+        raffle_by_deck_id.get(int(candidate.get("deck_id") or 0))
+        for candidate in candidates
+    ])
+    for candidate, avatar_url in zip(candidates, avatar_urls):
+        candidate["avatar_url"] = avatar_url
 
     vote_key = str(deck_id)
     top3_votes = (state.get("best_deck_votes") or {}).get(vote_key) or {}
@@ -2967,7 +3373,7 @@ async def submit_best_deck_vote(payload: dict = Body(...)):
             }
             _atomic_write_pairings(state)
 
-    await notify_state_change()
+    await notify_state_change(deck_ids=())
     return {"ok": True}
 
 
@@ -2995,12 +3401,14 @@ async def current_round_report(deck_id: int):
     reports_for_round = (state.get("round_reports") or {}).get(str(active_round), {})
     existing = reports_for_round.get(str(table))
 
+    owner_entries = [
+        next((e for e in raffle_list if (e.get("deckOwner") or "").strip() == player), None)
+        for player in players
+    ]
+    avatar_urls = await _entries_avatar_urls(owner_entries)
+
     player_meta: dict[str, dict] = {}
-    for player in players:
-        owner_entry = next((e for e in raffle_list if (e.get("deckOwner") or "").strip() == player), None)
-        commander_name = (owner_entry or {}).get("commander") or ""
-        commander_id = (owner_entry or {}).get("commander_id")
-        avatar_url = await _round_report_avatar_art_url(commander_name, commander_id)
+    for player, owner_entry, avatar_url in zip(players, owner_entries, avatar_urls):
         player_meta[player] = {
             "avatar_url": avatar_url,
             "commander": str((owner_entry or {}).get("commander") or "").strip(),
@@ -3079,8 +3487,9 @@ async def submit_round_report(payload: dict = Body(...)):
         }
         _sync_round_completion_marker(state, active_round)
         _atomic_write_pairings(state)
+        table_deck_ids = _table_deck_ids(raffle_list, active_round, table)
 
-    await notify_state_change()
+    await notify_state_change(deck_ids=table_deck_ids)
     return {"ok": True}
 
 
@@ -3101,8 +3510,9 @@ async def reset_round_report(round_no: int = Form(...), table_no: int = Form(...
         state["round_reports"] = reports
         _sync_round_completion_marker(state, int(round_no))
         _atomic_write_pairings(state)
+        table_deck_ids = _table_deck_ids(_load_raffle_list(), int(round_no), int(table_no))
 
-    await notify_state_change()
+    await notify_state_change(deck_ids=table_deck_ids, immediate=True)
     return RedirectResponse(url="/CCP", status_code=303)
 
 @app.post("/publishVotingResults")
@@ -3131,17 +3541,20 @@ async def publish_voting_results():
         bucket["data"] = results
         _atomic_write_pairings(state)
 
-    await notify_state_change()
+    await notify_state_change(immediate=True)
     return RedirectResponse(url="/CCP", status_code=303)
 
 
 register_ws_routes(
     app,
     ws_manager=ws_manager,
-    start_file_exists_loader=lambda: START_FILE_PATH.exists(),
-    raffle_loader=_load_raffle_list,
-    global_signature_fn=_global_signature,
-    deck_signature_fn=_deck_signature,
+    hello_loader=_hello_state,
+    suggest_handlers={
+        "commander": lambda q: _suggest_items("commander", q),
+        "partner": lambda q: _suggest_items("partner", q),
+        **{kind: (lambda q, kind=kind: _suggest_items(kind, q)) for kind in PAIRING_SUGGEST_QUERIES},
+    },
+    handshake_gate=ws_handshake_gate,
 )
 
 @app.post("/startPairings")
@@ -3174,9 +3587,13 @@ async def start_pairings(num_pods: int = Form(...), hosts: list[str] = Form(defa
         if len(host_clean) > int(num_pods):
             raise HTTPException(status_code=400, detail="Es können höchstens so viele Hosts gewählt werden wie Tische vorhanden sind.")
 
-        fixed_first = _first_round_with_hosts(players, int(num_pods), host_clean) if host_clean else None
-
-        rounds = _build_rounds(players, int(num_pods), _current_settings().max_rounds, fixed_first_round=fixed_first)
+        max_rounds = _current_settings().max_rounds
+        if host_clean:
+            # Host-Tische fixieren Runde 1 zufällig -> nicht vorberechenbar
+            fixed_first = _first_round_with_hosts(players, int(num_pods), host_clean)
+            rounds = _build_rounds(players, int(num_pods), max_rounds, fixed_first_round=fixed_first)
+        else:
+            rounds = await _take_or_build_rounds(players, int(num_pods), max_rounds)
 
         state = {
             "pods": int(num_pods),
@@ -3192,7 +3609,7 @@ async def start_pairings(num_pods: int = Form(...), hosts: list[str] = Form(defa
         _apply_round_to_raffle(raffle_list, state, round_no=1)
         _atomic_write_json(FILE_PATH, raffle_list)
 
-    await notify_state_change()
+    await notify_state_change(immediate=True)
     return RedirectResponse(url="/CCP", status_code=303)
 
 @app.post("/nextRound")
@@ -3225,7 +3642,7 @@ async def next_round():
         _apply_round_to_raffle(raffle_list, state, round_no=active)
         _atomic_write_json(FILE_PATH, raffle_list)
 
-    await notify_state_change()
+    await notify_state_change(immediate=True)
     return RedirectResponse(url="/CCP", status_code=303)
 
 @app.post("/endPlayPhase")
@@ -3248,7 +3665,7 @@ async def end_play_phase():
                 e["pairing_phase"] = "pre_voting"
         _atomic_write_json(FILE_PATH, raffle_list)
 
-    await notify_state_change()
+    await notify_state_change(immediate=True)
     return RedirectResponse(url="/CCP", status_code=303)
 
 
@@ -3272,7 +3689,7 @@ async def start_voting_phase():
                 e["pairing_phase"] = "voting"
         _atomic_write_json(FILE_PATH, raffle_list)
 
-    await notify_state_change()
+    await notify_state_change(immediate=True)
     return RedirectResponse(url="/CCP", status_code=303)
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""
+Local Redis pub/sub stand-in for multi-worker tests without a Redis server.
+
+Speaks just enough RESP2 for the broadcast bus (PING, AUTH, SELECT, PUBLISH,
+SUBSCRIBE, UNSUBSCRIBE, QUIT). Run it and point the workers at it via WS_BUS_URL:
+
+    python -m backend.redis_standin --port 6390
+    WS_BUS_URL=redis://127.0.0.1:6390 python -m uvicorn backend.main:app --workers 4
+"""
+import argparse
+import asyncio
+import logging
+
+from backend.services.broadcast_bus import _resp_read
+
+
+logger = logging.getLogger(__name__)
+
+
+def _bulk(value: bytes | str) -> bytes:
+    raw = value if isinstance(value, bytes) else value.encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(raw), raw)
+
+
+class RedisStandin:
+    """In-memory pub/sub server; port=0 picks a free port (see .port after start())."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer | None = None
+        self._channels: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.published = 0
+        self.clients = 0
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            self._channels.clear()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        logger.info("Redis stand-in listening on %s:%s", self.host, self.port)
+        await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients += 1
+        self._writers.add(writer)
+        subscribed: set[bytes] = set()
+        try:
+            while True:
+                try:
+                    command = await _resp_read(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR protocol error\r\n")
+                    continue
+                name = bytes(command[0]).upper()
+                args = [bytes(a) for a in command[1:]]
+                if name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif name in (b"AUTH", b"SELECT"):
+                    writer.write(b"+OK\r\n")
+                elif name == b"QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                elif name == b"PUBLISH" and len(args) == 2:
+                    writer.write(b":%d\r\n" % self._publish(args[0], args[1]))
+                elif name == b"SUBSCRIBE" and args:
+                    for channel in args:
+                        subscribed.add(channel)
+                        self._channels.setdefault(channel, set()).add(writer)
+                        writer.write(b"*3\r\n" + _bulk("subscribe") + _bulk(channel) + b":%d\r\n" % len(subscribed))
+                elif name == b"UNSUBSCRIBE":
+                    for channel in args or list(subscribed):
+                        subscribed.discard(channel)
+                        self._channels.get(channel, set()).discard(writer)
+                        writer.write(b"*3\r\n" + _bulk("unsubscribe") + _bulk(channel) + b":%d\r\n" % len(subscribed))
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % name)
+                await writer.drain()
+        finally:
+            for channel in subscribed:
+                self._channels.get(channel, set()).discard(writer)
+            self._writers.discard(writer)
+            writer.close()
+
+    def _publish(self, channel: bytes, data: bytes) -> int:
+        self.published += 1
+        receivers = list(self._channels.get(channel, ()))
+        message = b"*3\r\n" + _bulk("message") + _bulk(channel) + _bulk(data)
+        for receiver in receivers:
+            receiver.write(message)
+        return len(receivers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        asyncio.run(RedisStandin(args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
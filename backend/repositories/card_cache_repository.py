@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+# Only the card fields the app actually reads are persisted.
+CARD_CACHE_FIELDS = ("name", "id", "oracle_id", "type_line", "oracle_text", "keywords", "image_uris", "card_faces")
+
+
+def trim_card(card: dict) -> dict:
+    return {key: card.get(key) for key in CARD_CACHE_FIELDS if card.get(key) is not None}
+
+
+def _name_key(name: str) -> str:
+    return (name or "").strip().lower()
+
+
+class CardCache:
+    """
+    SQLite-backed Scryfall card cache, keyed by card id and by exact (case-insensitive) name.
+    Entries older than ttl_seconds are treated as missing.
+    put() only buffers the card in memory (reads see it right away); flush()
+    commits the buffer in one transaction, driven by run_flusher() and close();
+    a failed commit keeps the batch buffered for the next flush.
+    The connection is guarded by a lock, so reads and flushes can run in worker
+    threads (asyncio.to_thread) instead of on the event loop.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = float(ttl_seconds)
+        self._conn: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: dict[str, tuple[str, str, float, dict]] = {}  # id -> (name_key, payload, fetched_at, record)
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cards ("
+                " id TEXT PRIMARY KEY,"
+                " name_key TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cards_name_key ON cards(name_key)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _fresh_row(self, row) -> dict | None:
+        if not row:
+            return None
+        payload, fetched_at = row
+        if time.time() - float(fetched_at) > self.ttl_seconds:
+            return None
+        try:
+            data = json.loads(payload)
+        except (json.JSONDecodeError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _pending_record(self, card_id: str | None = None, name_key: str | None = None) -> dict | None:
+        with self._pending_lock:
+            if card_id is not None:
+                items = [self._pending[card_id]] if card_id in self._pending else []
+            else:
+                items = [item for item in reversed(self._pending.values()) if item[0] == name_key][:1]
+        for _key, _payload, fetched_at, record in items:
+            if time.time() - fetched_at <= self.ttl_seconds:
+                return record
+        return None
+
+    def _query_one(self, sql: str, params: tuple) -> dict | None:
+        try:
+            with self._db_lock:
+                row = self._connection().execute(sql, params).fetchone()
+        except sqlite3.Error:
+            return None
+        return self._fresh_row(row)
+
+    def get_by_id(self, card_id: str) -> dict | None:
+        card_id = (card_id or "").strip()
+        if not card_id:
+            return None
+        pending = self._pending_record(card_id=card_id)
+        if pending is not None:
+            return pending
+        return self._query_one("SELECT payload, fetched_at FROM cards WHERE id = ?", (card_id,))
+
+    def get_by_name(self, name: str) -> dict | None:
+        key = _name_key(name)
+        if not key:
+            return None
+        pending = self._pending_record(name_key=key)
+        if pending is not None:
+            return pending
+        return self._query_one(
+            "SELECT payload, fetched_at FROM cards WHERE name_key = ? ORDER BY fetched_at DESC LIMIT 1", (key,)
+        )
+
+    def put(self, card: dict) -> dict:
+        record = trim_card(card or {})
+        card_id = (record.get("id") or "").strip()
+        if not card_id or not record.get("name"):
+            return record
+        payload = json.dumps(record, ensure_ascii=False)
+        with self._pending_lock:
+            self._pending.pop(card_id, None)
+            self._pending[card_id] = (_name_key(record["name"]), payload, time.time(), record)
+        return record
+
+    def pending(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Commits all buffered cards in one transaction; returns how many were written."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        rows = [(card_id, name_key, payload, fetched_at) for card_id, (name_key, payload, fetched_at, _r) in batch.items()]
+        try:
+            with self._db_lock:
+                conn = self._connection()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cards (id, name_key, payload, fetched_at) VALUES (?, ?, ?, ?)", rows
+                )
+                conn.commit()
+        except sqlite3.Error as exc:
+            with self._pending_lock:
+                # cards put() during the failed write are newer than the batch and win
+                newer, self._pending = self._pending, {k: v for k, v in batch.items() if k not in self._pending}
+                self._pending.update(newer)
+                self.flush_errors += 1
+            logger.warning("card cache flush failed, %d cards stay buffered: %s", len(batch), exc)
+            return 0
+        self.flushed += len(rows)
+        return len(rows)
+
+    def stats(self) -> dict:
+        return {"pending": self.pending(), "flushed": self.flushed, "flush_errors": self.flush_errors}
+
+    async def run_flusher(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            if self.pending():
+                await asyncio.to_thread(self.flush)
+
+    def purge_expired(self) -> int:
+        self.flush()
+        try:
+            with self._db_lock:
+                conn = self._connection()
+                cur = conn.execute("DELETE FROM cards WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+                conn.commit()
+                return int(cur.rowcount or 0)
+        except sqlite3.Error:
+            return 0
+
+    def close(self) -> None:
+        self.flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
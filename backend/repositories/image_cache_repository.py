@@ -0,0 +1,130 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+_SAFE_KEY = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ImageCache:
+    """
+    Card images on local disk, evicted least-recently-used once the directory
+    grows beyond max_bytes. The directory is scanned once (mtime order); after
+    that an in-memory index tracks LRU order and the total size, so put() never
+    rescans. Reads refresh a file's mtime, which carries LRU order across restarts.
+    Methods do blocking file I/O; async callers run them via asyncio.to_thread.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self._index: OrderedDict[str, int] | None = None  # file name -> size, least recent first
+        self._total = 0
+        self._etags: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / _SAFE_KEY.sub("_", key)
+
+    def lookup(self, key: str) -> tuple[Path, str] | None:
+        """Returns (path, etag) of a cached image without keeping its bytes in memory."""
+        path = self.path_for(key)
+        with self._lock:
+            index = self._ensure_index()
+            if path.name not in index:
+                return None
+            index.move_to_end(path.name)
+            etag = self._etags.get(path.name)
+        try:
+            if etag is None:
+                etag = _etag(path.read_bytes())
+            os.utime(path)
+        except OSError:
+            self._forget(path.name)
+            return None
+        self._etags[path.name] = etag
+        return path, etag
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        """Returns (data, etag) or None."""
+        hit = self.lookup(key)
+        if hit is None:
+            return None
+        try:
+            return hit[0].read_bytes(), hit[1]
+        except OSError:
+            self._forget(hit[0].name)
+            return None
+
+    def put(self, key: str, data: bytes) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        etag = _etag(data)
+        with self._lock:
+            index = self._ensure_index()
+            self._total += len(data) - index.pop(path.name, 0)
+            index[path.name] = len(data)
+            self._etags[path.name] = etag
+            victims = self._evict(keep=path.name)
+        for victim in victims:
+            try:
+                (self.directory / victim).unlink()
+            except OSError:
+                pass
+        return etag
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            self._ensure_index()
+            return self._total
+
+    def _ensure_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            files = sorted(self._files(), key=lambda item: item[2])
+            self._index = OrderedDict((path.name, size) for path, size, _mtime in files)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def _forget(self, name: str) -> None:
+        with self._lock:
+            if self._index is not None and name in self._index:
+                self._total -= self._index.pop(name)
+            self._etags.pop(name, None)
+
+    def _files(self) -> list[tuple[Path, int, float]]:
+        if not self.directory.is_dir():
+            return []
+        files = []
+        for path in self.directory.iterdir():
+            if not path.is_file() or path.name.endswith(".tmp"):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((path, st.st_size, st.st_mtime))
+        return files
+
+    def _evict(self, keep: str) -> list[str]:
+        """Drops least-recently-used entries from the index; returns the file names to delete."""
+        victims = []
+        for name in list(self._index):
+            if self._total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self._total -= self._index.pop(name)
+            self._etags.pop(name, None)
+            victims.append(name)
+        return victims
+
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
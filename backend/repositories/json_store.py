@@ -1,11 +1,78 @@
+import asyncio
 import json
 import os
+import stat
+import tempfile
 from pathlib import Path
 from typing import Any
 
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# read once at import: os.umask() can only be queried by setting it, which is process-wide
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _target_mode(path: Path) -> int:
+    """Mode of the file being replaced, or the umask default for a new file."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
 
 def atomic_write_json(path: Path, data: Any) -> None:
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with tmp_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-    os.replace(tmp_path, path)
+    # unique temp name: concurrent writers (other workers) never share a temp file
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        # mkstemp creates 0600 and os.replace keeps it; keep the state files' usual mode
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, _target_mode(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class StateLock:
+    """
+    Serializes read-check-write sections on the state files: an asyncio.Lock
+    within the process plus an exclusive flock on `path` across processes
+    (uvicorn --workers N). The flock is polled without blocking, so waiting
+    never blocks the event loop and stays cancellable.
+    """
+
+    def __init__(self, path: Path, poll_seconds: float = 0.01):
+        self.path = Path(path)
+        self.poll_seconds = float(poll_seconds)
+        self._lock = asyncio.Lock()
+        self._fd: int | None = None
+
+    async def __aenter__(self) -> "StateLock":
+        await self._lock.acquire()
+        try:
+            if fcntl is not None:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                while True:
+                    try:
+                        fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(self.poll_seconds)
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        try:
+            if fcntl is not None and self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
@@ -1,14 +1,26 @@
+import json
+
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 
+from backend.services.ws_state_service import HandshakeGate, SuggestSession, reconnect_hint
+
+
+def _parse_since(raw: str | None) -> tuple[str, int] | None:
+    epoch, sep, revision = (raw or "").strip().rpartition(":")
+    if not sep or not epoch or not revision.isdigit():
+        return None
+    return epoch, int(revision)
+
 
 def register_ws_routes(
     app: FastAPI,
     ws_manager,
-    start_file_exists_loader,
-    raffle_loader,
-    global_signature_fn,
-    deck_signature_fn,
+    hello_loader,
+    suggest_handlers=None,
+    handshake_gate: HandshakeGate | None = None,
 ):
+    gate = handshake_gate or HandshakeGate()
+
     @app.websocket("/ws")
     async def ws_endpoint(websocket: WebSocket):
         """
@@ -16,6 +28,12 @@ def register_ws_routes(
           - /ws?channel=ccp
           - /ws?channel=home
           - /ws?deck_id=<int>
+        plus, on reconnect, since=<epoch>:<revision> of the last state it applied;
+        if that is still current, hello carries "resumed": true instead of the view.
+        The server sends "ping" to quiet clients, which answer "pong"; a socket
+        silent for WS_IDLE_TIMEOUT_SECONDS is reaped.
+        Besides "ping", clients may send {"type": "suggest", "kind", "q", "seq"};
+        answers come back as {"type": "suggest_result", "kind", "seq", "q", "items"}.
         IMPORTANT: accept() MUST happen before any other logic, otherwise Starlette returns 403.
         """
         await websocket.accept()
@@ -38,27 +56,47 @@ def register_ws_routes(
             except ValueError:
                 group = "home"
 
+        # admission control: a reconnect storm is spread out via the retry hint
+        if not await gate.acquire():
+            await websocket.close(code=1013, reason=reconnect_hint())
+            return
+
         ws_manager.connect_existing(websocket, group)
 
-        try:
-            start_file_exists = start_file_exists_loader()
-            raffle_list = raffle_loader()
+        # all outgoing frames go through the connection's send queue (one writer per socket)
+        async def send(payload: dict) -> None:
+            ws_manager.send(websocket, payload)
 
-            if group in ("ccp", "home"):
-                sig = global_signature_fn(start_file_exists, raffle_list)
-                await websocket.send_json({"type": "hello", "scope": "global", "signature": sig})
-            else:
-                sig = deck_signature_fn(deck_id, start_file_exists, raffle_list)
-                await websocket.send_json({"type": "hello", "scope": "deck", "deck_id": deck_id, "signature": sig})
+        suggest = SuggestSession(send, suggest_handlers or {})
+
+        admitted = True
+        try:
+            hello = hello_loader(None if group in ("ccp", "home") else deck_id, _parse_since(q.get("since")))
+            ws_manager.send(websocket, {"type": "hello", **hello})
+            await ws_manager.drain(websocket)
+            gate.release()
+            admitted = False
 
             while True:
                 msg = await websocket.receive_text()
+                ws_manager.touch(websocket)
+                if msg == "pong":
+                    continue
                 if msg == "ping":
-                    await websocket.send_text("pong")
+                    ws_manager.send(websocket, "pong")
+                elif msg.startswith("{"):
+                    try:
+                        data = json.loads(msg)
+                    except ValueError:
+                        continue
+                    suggest.handle_message(data)
 
         except WebSocketDisconnect:
             pass
         except Exception:
             pass
         finally:
+            if admitted:
+                gate.release()
             ws_manager.disconnect(websocket, group)
+            await suggest.close()
@@ -0,0 +1,272 @@
+"""
+Local Scryfall stand-in for load tests and offline debugging.
+
+Serves /cards/search, /cards/named, /cards/random and /cards/{id} from a JSON
+fixture file (a list of card objects, e.g. backend/fixtures/scryfall_cards.json
+or a Scryfall bulk-data download). Point the app at it via SCRYFALL_BASE:
+
+    python -m uvicorn backend.scryfall_standin:app --port 9100
+    SCRYFALL_BASE=http://127.0.0.1:9100 python -m uvicorn backend.main:app
+
+Environment: SCRYFALL_STANDIN_FIXTURES, SCRYFALL_STANDIN_LATENCY_MS,
+SCRYFALL_STANDIN_JITTER_MS, SCRYFALL_STANDIN_ERROR_RATE, SCRYFALL_STANDIN_SEED.
+"""
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+DEFAULT_FIXTURES_PATH = Path(__file__).resolve().parent / "fixtures" / "scryfall_cards.json"
+PAGE_SIZE = 175
+IMAGE_VARIANTS = ("small", "normal", "large", "png", "art_crop", "border_crop")
+
+# 1x1 transparent GIF as placeholder art
+_PLACEHOLDER_IMAGE = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+_TOKEN = re.compile(r'-?(?:!|[A-Za-z]+[:=<>]+)?"[^"]*"|\S+')
+_TERM = re.compile(r'^(-?)(?:(!)(.*)|([a-z]+)([:=<>]+)(.*)|(.*))$', re.IGNORECASE)
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _type_line(card: dict) -> str:
+    return (card.get("type_line") or "").lower()
+
+
+def _oracle(card: dict) -> str:
+    texts = [card.get("oracle_text") or ""]
+    texts += [(f or {}).get("oracle_text") or "" for f in card.get("card_faces") or []]
+    return "\n".join(texts).lower()
+
+
+def _keywords(card: dict) -> set[str]:
+    return {str(k).lower() for k in card.get("keywords") or []}
+
+
+def _is_commander(card: dict) -> bool:
+    tl = _type_line(card)
+    if "legendary" in tl and ("creature" in tl or "background" in tl):
+        return True
+    return "can be your commander" in _oracle(card)
+
+
+def _is_partner(card: dict) -> bool:
+    if {"partner", "partner with"} & _keywords(card):
+        return True
+    return any(line.strip().startswith("partner") for line in _oracle(card).splitlines())
+
+
+_IS_CHECKS = {
+    "commander": _is_commander,
+    "partner": _is_partner,
+    "normal": lambda card: (card.get("layout") or "normal") == "normal",
+}
+
+
+def _matches_term(card: dict, key: str, value: str) -> bool:
+    name = (card.get("name") or "").lower()
+    value = value.lower()
+    if key in ("", "name"):
+        return value in name
+    if key in ("t", "type"):
+        return value in _type_line(card)
+    if key in ("o", "oracle"):
+        return value in _oracle(card)
+    if key in ("kw", "keyword"):
+        return value in _keywords(card)
+    if key in ("e", "s", "set"):
+        return (card.get("set") or "").lower() == value
+    if key == "game":
+        return value in [str(g).lower() for g in card.get("games") or ["paper"]]
+    if key == "is":
+        check = _IS_CHECKS.get(value)
+        return check(card) if check else True
+    # unknown keys are ignored, like Scryfall does with a warning
+    return True
+
+
+def parse_query(query: str):
+    """
+    Parses the subset of Scryfall search syntax the app uses (key:value, -negation,
+    !"exact name", quoted values, bare words) into a predicate over card dicts.
+    """
+    checks = []
+    for token in _TOKEN.findall(query or ""):
+        m = _TERM.match(token)
+        if not m:
+            continue
+        negate, bang, exact, key, _op, value, bare = m.groups()
+        if bang:
+            wanted = _unquote(exact).lower()
+            check = (lambda w: lambda card: (card.get("name") or "").lower() == w)(wanted)
+        elif key is not None:
+            check = (lambda k, v: lambda card: _matches_term(card, k, v))(key.lower(), _unquote(value))
+        else:
+            check = (lambda v: lambda card: _matches_term(card, "", v))(_unquote(bare))
+        checks.append((bool(negate), check))
+
+    def predicate(card: dict) -> bool:
+        return all(check(card) != negate for negate, check in checks)
+
+    return predicate
+
+
+def load_fixtures(path: Path) -> list[dict]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("data") or []
+    return [c for c in data if isinstance(c, dict) and c.get("id") and c.get("name")]
+
+
+def create_standin_app(
+    fixtures: list[dict] | None = None,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int | None = None,
+) -> FastAPI:
+    """
+    Builds the stand-in app. latency_ms (+ uniform jitter_ms) is added to every
+    API response; error_rate is the share of API requests answered with 503.
+    """
+    cards = list(fixtures if fixtures is not None else load_fixtures(DEFAULT_FIXTURES_PATH))
+    by_id = {c["id"]: c for c in cards}
+    by_name = {c["name"].lower(): c for c in cards}
+    rng = random.Random(seed)
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.injected_errors = 0
+
+    def with_images(card: dict, base: str) -> dict:
+        if card.get("image_uris") or card.get("card_faces"):
+            return card
+        uris = {v: f"{base}/images/{card['id']}/{v}.gif" for v in IMAGE_VARIANTS}
+        return {**card, "image_uris": uris}
+
+    def not_found(details: str) -> JSONResponse:
+        return JSONResponse(
+            {"object": "error", "code": "not_found", "status": 404, "details": details},
+            status_code=404,
+        )
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        if request.url.path.startswith("/cards"):
+            app.state.requests += 1
+            delay = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms else 0.0)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000.0)
+            if error_rate and rng.random() < error_rate:
+                app.state.injected_errors += 1
+                return JSONResponse(
+                    {"object": "error", "code": "service_unavailable", "status": 503, "details": "Injected error."},
+                    status_code=503,
+                )
+        return await call_next(request)
+
+    def base_url(request: Request) -> str:
+        return str(request.base_url).rstrip("/")
+
+    @app.get("/cards/search")
+    async def search(
+        request: Request,
+        q: str = "",
+        unique: str = "cards",
+        order: str = "name",
+        dir: str = "auto",
+        page: int = 1,
+    ):
+        predicate = parse_query(q)
+        matches = [c for c in cards if predicate(c)]
+        if not matches:
+            return not_found("Your query didn't match any cards.")
+
+        if order == "released":
+            matches.sort(key=lambda c: c.get("released_at") or "", reverse=(dir != "asc"))
+        else:
+            matches.sort(key=lambda c: (c.get("name") or "").lower(), reverse=(dir == "desc"))
+
+        start = (max(1, page) - 1) * PAGE_SIZE
+        chunk = matches[start:start + PAGE_SIZE]
+        if not chunk:
+            return not_found("This page does not exist.")
+        base = base_url(request)
+        has_more = start + PAGE_SIZE < len(matches)
+        payload = {
+            "object": "list",
+            "total_cards": len(matches),
+            "has_more": has_more,
+            "data": [with_images(c, base) for c in chunk],
+        }
+        if has_more:
+            payload["next_page"] = str(request.url.include_query_params(page=page + 1))
+        return payload
+
+    @app.get("/cards/named")
+    async def named(request: Request, exact: str = "", fuzzy: str = ""):
+        card = by_name.get(exact.strip().lower()) if exact else None
+        if card is None and fuzzy:
+            needle = fuzzy.strip().lower()
+            card = next((c for c in cards if needle in c["name"].lower()), None)
+        if card is None:
+            return not_found("No card found with the given name.")
+        return with_images(card, base_url(request))
+
+    @app.get("/cards/random")
+    async def random_card(request: Request, q: str = ""):
+        predicate = parse_query(q)
+        matches = [c for c in cards if predicate(c)]
+        if not matches:
+            return not_found("Your query didn't match any cards.")
+        return with_images(rng.choice(matches), base_url(request))
+
+    @app.get("/cards/{card_id}")
+    async def card_by_id(request: Request, card_id: str):
+        card = by_id.get(card_id)
+        if card is None:
+            return not_found("No card found with the given ID.")
+        return with_images(card, base_url(request))
+
+    @app.get("/images/{card_id}/{variant}.gif")
+    async def image(card_id: str, variant: str):
+        if card_id not in by_id or variant not in IMAGE_VARIANTS:
+            return Response(status_code=404)
+        return Response(content=_PLACEHOLDER_IMAGE, media_type="image/gif")
+
+    @app.get("/_standin/stats")
+    async def stats():
+        return {
+            "cards": len(cards),
+            "requests": app.state.requests,
+            "injected_errors": app.state.injected_errors,
+        }
+
+    return app
+
+
+def _app_from_env() -> FastAPI:
+    path = os.environ.get("SCRYFALL_STANDIN_FIXTURES")
+    seed = os.environ.get("SCRYFALL_STANDIN_SEED")
+    return create_standin_app(
+        fixtures=load_fixtures(Path(path)) if path else None,
+        latency_ms=float(os.environ.get("SCRYFALL_STANDIN_LATENCY_MS") or 0),
+        jitter_ms=float(os.environ.get("SCRYFALL_STANDIN_JITTER_MS") or 0),
+        error_rate=float(os.environ.get("SCRYFALL_STANDIN_ERROR_RATE") or 0),
+        seed=int(seed) if seed else None,
+    )
+
+
+app = _app_from_env()
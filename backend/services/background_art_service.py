@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import random
+
+from backend.services.image_proxy_service import proxied_url
+from backend.services.scryfall_service import PRIORITY_BACKGROUND, scryfall_priority, search_cards
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundArtPool:
+    """
+    Keeps a pool of pre-resolved art URLs for the default background query.
+    Page loads take from the pool in constant time; a background task refills it
+    once it drops to `low_water`. A changed query discards the pool.
+    """
+
+    def __init__(self, size: int, low_water: int, pages_per_refill: int = 3, picks_per_page: int = 4):
+        self.size = max(1, int(size))
+        self.low_water = max(0, min(int(low_water), self.size - 1))
+        self.pages_per_refill = max(1, int(pages_per_refill))
+        self.picks_per_page = max(1, int(picks_per_page))
+        self.query: str | None = None
+        self._urls: list[str] = []
+        self._refill_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+
+    def _reset(self, query: str) -> None:
+        if self.query != query:
+            self.query = query
+            self._urls = []
+            if self._refill_task is not None:
+                self._refill_task.cancel()
+                self._refill_task = None
+
+    def take(self, query: str) -> str | None:
+        query = (query or "").strip()
+        self._reset(query)
+        url = self._urls.pop(random.randrange(len(self._urls))) if self._urls else None
+        if url:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if len(self._urls) <= self.low_water:
+            self.schedule(query)
+        return url
+
+    def schedule(self, query: str) -> None:
+        query = (query or "").strip()
+        self._reset(query)
+        if not query or (self._refill_task is not None and not self._refill_task.done()):
+            return
+        with scryfall_priority(PRIORITY_BACKGROUND):
+            self._refill_task = asyncio.ensure_future(self._refill(query))
+
+    async def resolve(self, query: str) -> str | None:
+        """Pool hit, or one live lookup (whose other results seed the pool)."""
+        url = self.take(query)
+        if url:
+            return url
+        with scryfall_priority(PRIORITY_BACKGROUND):
+            urls = await self._fetch_batch(query, pages=1)
+        if not urls:
+            return None
+        url = urls.pop(random.randrange(len(urls)))
+        self._add(query, urls)
+        return url
+
+    async def close(self) -> None:
+        task, self._refill_task = self._refill_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "query": self.query,
+            "pooled": len(self._urls),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refills": self.refills,
+        }
+
+    def _add(self, query: str, urls: list[str]) -> None:
+        if query != self.query:
+            return
+        for url in urls:
+            if len(self._urls) >= self.size:
+                break
+            if url not in self._urls:
+                self._urls.append(url)
+
+    async def _refill(self, query: str) -> None:
+        try:
+            urls = await self._fetch_batch(query, pages=self.pages_per_refill)
+            self._add(query, urls)
+            self.refills += 1
+        except Exception as e:
+            logger.warning("background art refill failed: %s", e)
+
+    async def _fetch_batch(self, query: str, pages: int) -> list[str]:
+        payload = await search_cards(query, unique="cards", order="name")
+        if payload is None:
+            return []
+        try:
+            total = int(payload.get("total_cards") or 0)
+        except (TypeError, ValueError):
+            total = 0
+        per_page = len(payload.get("data") or [])
+        if total <= 0 or per_page <= 0:
+            return []
+
+        max_page = max(1, (total + per_page - 1) // per_page)
+        picked_pages = random.sample(range(1, max_page + 1), min(pages, max_page))
+
+        urls: list[str] = []
+        for page in picked_pages:
+            resp = payload if page == 1 else await search_cards(query, unique="cards", order="name", page=page)
+            data = (resp or {}).get("data") or []
+            for card in random.sample(data, min(self.picks_per_page, len(data))):
+                url = proxied_url(card, "art_crop")
+                if url and url not in urls:
+                    urls.append(url)
+        return urls
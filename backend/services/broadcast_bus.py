@@ -0,0 +1,408 @@
+import asyncio
+import json
+import logging
+import os
+import secrets
+import socket
+from pathlib import Path
+from typing import Awaitable, Callable
+from urllib.parse import unquote, urlsplit
+
+from backend.config import WS_BUS_QUEUE_SIZE, WS_BUS_TIMEOUT_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+BusHandler = Callable[[dict], Awaitable[None]]
+
+
+class BroadcastBus:
+    """
+    Carries state-change events between the worker processes of one deployment.
+    This base class is the single-process bus: publish() reaches nobody else.
+    Every message is stamped with the publishing node, and a node never hands
+    its own messages to its handler, so transports may loop them back.
+    publish() only queues: one sender task per bus does the I/O, each send
+    bounded by send_timeout, so a stalled transport never delays a write
+    request. Messages beyond queue_size are dropped and counted. When a message
+    is lost (dropped or failed to send), the next one goes out with "resync": true
+    so receivers refresh everything instead of just the named decks.
+    """
+
+    kind = "local"
+    remote = False
+
+    def __init__(self, queue_size: int = WS_BUS_QUEUE_SIZE, send_timeout: float = WS_BUS_TIMEOUT_SECONDS):
+        self.node_id = f"{socket.gethostname()}-{os.getpid()}-{secrets.token_hex(3)}"
+        self.queue_size = max(1, int(queue_size))
+        self.send_timeout = float(send_timeout)
+        self._handler: BusHandler | None = None
+        self._outbox: asyncio.Queue | None = None
+        self._outbox_task: asyncio.Task | None = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+        self.dropped = 0
+        self._resync = False
+
+    async def start(self, handler: BusHandler) -> None:
+        self._handler = handler
+        if self.remote:
+            self._outbox = asyncio.Queue(maxsize=self.queue_size)
+            self._outbox_task = asyncio.create_task(self._send_loop())
+
+    def publish(self, message: dict) -> bool:
+        if self._outbox is None:
+            return False
+        try:
+            self._outbox.put_nowait({**message, "origin": self.node_id})
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._resync = True
+            return False
+        return True
+
+    async def close(self) -> None:
+        self._handler = None
+        task, self._outbox_task = self._outbox_task, None
+        self._outbox = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "node_id": self.node_id,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "queued": self._outbox.qsize() if self._outbox is not None else 0,
+        }
+
+    async def _send_loop(self) -> None:
+        outbox = self._outbox
+        while True:
+            message = await outbox.get()
+            if self._resync:
+                message = {**message, "resync": True}
+                self._resync = False
+            data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+            try:
+                await asyncio.wait_for(self._send(data), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self._resync = True
+                logger.warning("bus publish failed (%s): %r", self.kind, e)
+                continue
+            self.published += 1
+
+    async def _send(self, data: bytes) -> None:
+        pass
+
+    async def _deliver(self, data: bytes) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            self.errors += 1
+            return
+        if not isinstance(message, dict) or message.get("origin") == self.node_id:
+            return
+        handler = self._handler
+        if handler is None:
+            return
+        self.received += 1
+        try:
+            await handler(message)
+        except Exception:
+            self.errors += 1
+            logger.exception("bus handler failed")
+
+
+class _DatagramReceiver(asyncio.DatagramProtocol):
+    def __init__(self, bus: "UnixSocketBus"):
+        self.bus = bus
+
+    def datagram_received(self, data, addr):
+        asyncio.ensure_future(self.bus._deliver(data))
+
+
+class UnixSocketBus(BroadcastBus):
+    """
+    Bus for workers on one host: every worker binds a Unix datagram socket in a
+    shared directory and publishes by sending to all other sockets there.
+    Sockets left behind by dead workers are removed on the first failed send.
+    A peer whose receive buffer is full is retried with a short backoff until
+    the send timeout; the base class then marks the next message as a resync.
+    """
+
+    kind = "unix"
+    remote = True
+
+    def __init__(self, directory: Path, retry_seconds: float = 0.005, **kwargs):
+        super().__init__(**kwargs)
+        self.retry_seconds = float(retry_seconds)
+        self.directory = Path(directory)
+        self.path = self.directory / f"{self.node_id}.sock"
+        self._transport: asyncio.DatagramTransport | None = None
+        self._sender: socket.socket | None = None
+        self.stale_peers = 0
+        self.peer_full = 0
+
+    async def start(self, handler: BusHandler) -> None:
+        await super().start(handler)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(str(self.path))
+        receiver.setblocking(False)
+        loop = asyncio.get_running_loop()
+        self._transport, _protocol = await loop.create_datagram_endpoint(lambda: _DatagramReceiver(self), sock=receiver)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+
+    async def close(self) -> None:
+        await super().close()
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._sender is not None:
+            self._sender.close()
+            self._sender = None
+        self.path.unlink(missing_ok=True)
+
+    def peers(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [p for p in self.directory.glob("*.sock") if p != self.path]
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "directory": str(self.directory),
+            "peers": len(self.peers()),
+            "stale_peers": self.stale_peers,
+            "peer_full": self.peer_full,
+        }
+
+    async def _send(self, data: bytes) -> None:
+        if self._sender is None:
+            raise RuntimeError("bus not started")
+        pending = self.peers()
+        delay = self.retry_seconds
+        while pending:
+            full = []
+            for peer in pending:
+                try:
+                    self._sender.sendto(data, str(peer))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    peer.unlink(missing_ok=True)
+                    self.stale_peers += 1
+                except BlockingIOError:
+                    full.append(peer)
+            if full:
+                # receiver's buffer is full: retry only those peers (bounded by the send timeout)
+                self.peer_full += len(full)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.1)
+            pending = full
+
+
+def _resp_command(*args: str | bytes) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        raw = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(raw), raw))
+    return b"".join(out)
+
+
+async def _resp_read(reader: asyncio.StreamReader):
+    """Reads one RESP2 reply; errors come back as RedisError instances."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    prefix, body = line[:1], line[1:].rstrip(b"\r\n")
+    if prefix == b"+":
+        return body.decode("utf-8", "replace")
+    if prefix == b"-":
+        return RedisError(body.decode("utf-8", "replace"))
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        size = int(body)
+        if size < 0:
+            return None
+        data = await reader.readexactly(size + 2)
+        return data[:-2]
+    if prefix == b"*":
+        size = int(body)
+        if size < 0:
+            return None
+        return [await _resp_read(reader) for _ in range(size)]
+    raise ConnectionError(f"unexpected reply: {line!r}")
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBus(BroadcastBus):
+    """
+    Bus over Redis pub/sub (or anything speaking its protocol), for workers on
+    several hosts. One connection publishes, one stays subscribed to the channel
+    and reconnects with backoff when the server goes away.
+    """
+
+    kind = "redis"
+    remote = True
+
+    def __init__(self, host: str, port: int = 6379, channel: str = "kizzm:state", password: str | None = None,
+                 db: int = 0, reconnect_seconds: float = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.host = host
+        self.port = int(port)
+        self.channel = channel
+        self.password = password
+        self.db = int(db)
+        self.reconnect_seconds = float(reconnect_seconds)
+        self._pub: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None = None
+        self._pub_lock = asyncio.Lock()
+        self._sub_task: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+        self.reconnects = 0
+
+    async def start(self, handler: BusHandler) -> None:
+        await super().start(handler)
+        self._sub_task = asyncio.create_task(self._subscribe_loop())
+
+    async def wait_subscribed(self, timeout: float | None = None) -> bool:
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def close(self) -> None:
+        await super().close()
+        task, self._sub_task = self._sub_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        async with self._pub_lock:
+            await self._close_pub()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "server": f"{self.host}:{self.port}",
+            "channel": self.channel,
+            "subscribed": self._subscribed.is_set(),
+            "reconnects": self.reconnects,
+        }
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.send_timeout)
+        try:
+            if self.password:
+                await self._call(reader, writer, "AUTH", self.password)
+            if self.db:
+                await self._call(reader, writer, "SELECT", str(self.db))
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def _call(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *args: str | bytes):
+        writer.write(_resp_command(*args))
+        await asyncio.wait_for(writer.drain(), self.send_timeout)
+        reply = await asyncio.wait_for(_resp_read(reader), self.send_timeout)
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    async def _close_pub(self) -> None:
+        pub, self._pub = self._pub, None
+        if pub is not None:
+            pub[1].close()
+
+    async def _send(self, data: bytes) -> None:
+        async with self._pub_lock:
+            for attempt in (1, 2):
+                if self._pub is None:
+                    self._pub = await self._connect()
+                try:
+                    await self._call(*self._pub, "PUBLISH", self.channel, data)
+                    return
+                except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                    # stale keep-alive connection: reconnect once
+                    await self._close_pub()
+                    if attempt == 2:
+                        raise
+                except BaseException:
+                    # timeout/cancel mid-reply: the connection is out of sync, never reuse it
+                    await self._close_pub()
+                    raise
+
+    async def _subscribe_loop(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                writer.write(_resp_command("SUBSCRIBE", self.channel))
+                await writer.drain()
+                while True:
+                    reply = await _resp_read(reader)
+                    if not isinstance(reply, list) or len(reply) < 3:
+                        continue
+                    kind = reply[0].decode() if isinstance(reply[0], bytes) else reply[0]
+                    if kind == "subscribe":
+                        self._subscribed.set()
+                    elif kind == "message":
+                        await self._deliver(reply[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("redis bus subscription lost: %s", e)
+            finally:
+                self._subscribed.clear()
+                if writer is not None:
+                    writer.close()
+            self.reconnects += 1
+            await asyncio.sleep(self.reconnect_seconds)
+
+
+def create_bus(url: str | None) -> BroadcastBus:
+    """
+    Bus from a URL: empty or "local" (single worker), "unix:///run/kizzm-bus"
+    (socket directory shared by the workers of one host) or
+    "redis://[:password@]host[:port][/db][?channel=name]".
+    """
+    url = (url or "").strip()
+    if not url or url == "local":
+        return BroadcastBus()
+    parts = urlsplit(url)
+    if parts.scheme == "unix":
+        directory = unquote(parts.netloc + parts.path)
+        if not directory:
+            raise ValueError(f"unix bus needs a directory: {url}")
+        return UnixSocketBus(Path(directory))
+    if parts.scheme == "redis":
+        params = dict(p.split("=", 1) for p in parts.query.split("&") if "=" in p)
+        db = parts.path.strip("/")
+        return RedisBus(
+            parts.hostname or "127.0.0.1",
+            parts.port or 6379,
+            channel=unquote(params.get("channel") or "kizzm:state"),
+            password=unquote(parts.password) if parts.password else None,
+            db=int(db) if db else 0,
+        )
+    raise ValueError(f"unknown bus URL: {url}")
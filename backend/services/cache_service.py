@@ -0,0 +1,151 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+def estimate_size(value: Any) -> int:
+    """Rough payload size in bytes (JSON-encoded length); good enough for budgeting."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 64
+
+
+class TTLCache:
+    """
+    One cache namespace: LRU order, per-entry expiry, and both an entry-count and
+    a byte budget. Expired entries are dropped lazily on access and by purge_expired().
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, max_bytes: int | None = None):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self._items: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        item = self._items.get(key)
+        return item is not None and item[0] > time.monotonic()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        expires_at, _size, value = item
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Like get(), but without touching LRU order or hit/miss counters."""
+        item = self._items.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return default
+        return item[2]
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.pop(key)
+            return
+        self._drop(key)
+        self._items[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while len(self._items) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            oldest = next(iter(self._items))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def pop(self, key: str) -> Any:
+        item = self._items.get(key)
+        self._drop(key)
+        return item[2] if item else None
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._bytes = 0
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _size, _value) in self._items.items() if expires_at <= now]
+        for key in expired:
+            self._drop(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def _drop(self, key: str) -> None:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheRegistry:
+    """
+    Named TTLCache namespaces, so unrelated lookups cannot evict each other,
+    with one place for periodic expiry and stats.
+    """
+
+    def __init__(self):
+        self._namespaces: dict[str, TTLCache] = {}
+
+    def namespace(self, name: str, max_entries: int, ttl_seconds: float, max_bytes: int | None = None) -> TTLCache:
+        cache = self._namespaces.get(name)
+        if cache is None:
+            cache = self._namespaces[name] = TTLCache(name, max_entries, ttl_seconds, max_bytes)
+        return cache
+
+    def register(self, cache: TTLCache) -> TTLCache:
+        self._namespaces[cache.name] = cache
+        return cache
+
+    def purge_expired(self) -> int:
+        return sum(cache.purge_expired() for cache in self._namespaces.values())
+
+    def clear(self) -> None:
+        for cache in self._namespaces.values():
+            cache.clear()
+
+    def stats(self) -> dict:
+        return {name: cache.stats() for name, cache in sorted(self._namespaces.items())}
+
+    async def run_purger(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            self.purge_expired()
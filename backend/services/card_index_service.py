@@ -0,0 +1,162 @@
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from backend.repositories.card_cache_repository import trim_card
+from backend.services.card_rules import (
+    CAP_BACKGROUND,
+    CAP_CHOOSE_A_BACKGROUND,
+    CAP_DOCTORS_COMPANION,
+    CAP_FRIENDS_FOREVER,
+    CAP_TIME_LORD_DOCTOR,
+    PARTNER_KEYWORD_CAPS,
+    card_capabilities,
+    type_line,
+)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lowercase, accents stripped, punctuation dropped, whitespace collapsed.
+    "Atraxa, Praetors' Voice" -> "atraxa praetors voice"
+    """
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"[^\w\s]", "", text)
+    return " ".join(text.split())
+
+
+def _oracle_texts(card: dict) -> list[str]:
+    texts = [card.get("oracle_text") or ""]
+    for face in card.get("card_faces") or []:
+        if isinstance(face, dict):
+            texts.append(face.get("oracle_text") or "")
+    return [t for t in texts if t]
+
+
+def _is_commander(card: dict, caps: int) -> bool:
+    tl = type_line(card)
+    if "legendary" in tl and "creature" in tl:
+        return True
+    if caps & CAP_BACKGROUND:
+        return True
+    return any("can be your commander" in t.lower() for t in _oracle_texts(card))
+
+
+def _is_paper(card: dict) -> bool:
+    games = card.get("games")
+    return not isinstance(games, list) or "paper" in games
+
+
+class CardIndex:
+    """
+    In-memory index over a Scryfall bulk-data file ("Oracle Cards" JSON array).
+
+    Name search matches like Scryfall's name: filter: every word of the query is a
+    substring of the normalized name. The card_rules capability bitset and the
+    is:commander / is:partner flags plus one flag per second-commander kind (see
+    card_rules.partner_suggest_kind) are precomputed per card at import time, and
+    each flag keeps its own member list, so a filtered search only scans the cards
+    carrying that flag.
+    """
+
+    def __init__(self):
+        self._records: list[dict] = []
+        self._flags: list[dict[str, bool]] = []
+        self._names: list[str] = []
+        self._members: dict[str, list[int]] = {}
+        self._by_id: dict[str, int] = {}
+        self._by_name: dict[str, int] = {}
+        self.source: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._records)
+
+    def load(self, path: Path) -> int:
+        path = Path(path)
+        with path.open("r", encoding="utf-8") as f:
+            cards = json.load(f)
+        if not isinstance(cards, list):
+            raise ValueError(f"{path} is not a Scryfall bulk-data card list")
+        count = self.load_cards(cards)
+        self.source = str(path)
+        return count
+
+    def load_cards(self, cards: list[dict]) -> int:
+        records: list[dict] = []
+        flags: list[dict[str, bool]] = []
+        names: list[str] = []
+        members: dict[str, list[int]] = {}
+        by_id: dict[str, int] = {}
+        by_name: dict[str, int] = {}
+
+        for card in cards:
+            if not isinstance(card, dict) or not _is_paper(card):
+                continue
+            record = trim_card(card)
+            if not record.get("id") or not record.get("name"):
+                continue
+
+            caps = card_capabilities(card)
+            record["capabilities"] = caps
+
+            idx = len(records)
+            records.append(record)
+            card_flags = {
+                "commander": _is_commander(card, caps),
+                "partner": bool(caps & PARTNER_KEYWORD_CAPS),
+                "background": bool(caps & CAP_BACKGROUND),
+                "choose_a_background": bool(caps & CAP_CHOOSE_A_BACKGROUND),
+                "friends_forever": bool(caps & CAP_FRIENDS_FOREVER),
+                "doctors_companion": bool(caps & CAP_DOCTORS_COMPANION),
+                "time_lord_doctor": bool(caps & CAP_TIME_LORD_DOCTOR),
+            }
+            flags.append(card_flags)
+            names.append(normalize_name(record["name"]))
+            by_id[record["id"]] = idx
+            by_name.setdefault(record["name"].lower(), idx)
+
+        # candidate lists in name order, so a limited search can stop at the limit
+        members["all"] = sorted(range(len(records)), key=lambda i: records[i]["name"].lower())
+        for flag in (flags[0] if flags else ()):
+            members[flag] = [idx for idx in members["all"] if flags[idx][flag]]
+
+        # swap in one go so concurrent readers never see a half-built index
+        self._records, self._flags, self._names, self._members, self._by_id, self._by_name = (
+            records, flags, names, members, by_id, by_name,
+        )
+        return len(records)
+
+    def get_by_id(self, card_id: str) -> dict | None:
+        idx = self._by_id.get((card_id or "").strip())
+        return None if idx is None else self._records[idx]
+
+    def get_by_name(self, name: str) -> dict | None:
+        idx = self._by_name.get((name or "").strip().lower())
+        return None if idx is None else self._records[idx]
+
+    def flags(self, card_id: str) -> dict[str, bool] | None:
+        idx = self._by_id.get((card_id or "").strip())
+        return None if idx is None else self._flags[idx]
+
+    def search_name(self, q: str, flag: str | None = None, limit: int | None = None) -> list[dict]:
+        """Cards whose normalized name contains every word of q, sorted by name."""
+        words = normalize_name(q).split()
+        if not words:
+            return []
+
+        first, rest = words[0], words[1:]
+        names = self._names
+        matches: list[dict] = []
+        for idx in self._members.get(flag or "all", []):
+            name = names[idx]
+            if first in name and all(word in name for word in rest):
+                matches.append(self._records[idx])
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
@@ -38,3 +38,180 @@ def get_image_url(card: dict, key: str) -> str | None:
             return fu[key]
 
     return None
+
+
+# ---------------------------------------------------------
+# Commander pairing rules (local, no network)
+# ---------------------------------------------------------
+
+CAP_PARTNER = 1 << 0
+CAP_PARTNER_WITH = 1 << 1
+CAP_PARTNER_VARIANT = 1 << 2  # "Partner—Survivors" etc.: only with the same variant
+CAP_FRIENDS_FOREVER = 1 << 3
+CAP_CHOOSE_A_BACKGROUND = 1 << 4
+CAP_BACKGROUND = 1 << 5
+CAP_DOCTORS_COMPANION = 1 << 6
+CAP_TIME_LORD_DOCTOR = 1 << 7
+
+# the "Partner" keyword family, i.e. what Scryfall's is:partner matches
+PARTNER_KEYWORD_CAPS = CAP_PARTNER | CAP_PARTNER_WITH | CAP_PARTNER_VARIANT
+
+# any ability that allows a second commander
+PAIRING_CAPS = (
+    CAP_PARTNER
+    | CAP_PARTNER_WITH
+    | CAP_PARTNER_VARIANT
+    | CAP_FRIENDS_FOREVER
+    | CAP_CHOOSE_A_BACKGROUND
+    | CAP_BACKGROUND
+    | CAP_DOCTORS_COMPANION
+    | CAP_TIME_LORD_DOCTOR
+)
+
+
+def partner_suggest_kind(caps: int) -> str | None:
+    """
+    Which cards can join a commander with these capabilities as second commander,
+    as a suggest kind (and card index flag); None if it cannot have a second one.
+    """
+    if caps & PARTNER_KEYWORD_CAPS:
+        return "partner"
+    if caps & CAP_FRIENDS_FOREVER:
+        return "friends_forever"
+    if caps & CAP_CHOOSE_A_BACKGROUND:
+        return "background"
+    if caps & CAP_BACKGROUND:
+        return "choose_a_background"
+    if caps & CAP_DOCTORS_COMPANION:
+        return "time_lord_doctor"
+    if caps & CAP_TIME_LORD_DOCTOR:
+        return "doctors_companion"
+    return None
+
+
+_PARTNER_LINE = re.compile(r"^partner(?:\s*\(.*)?$")
+_PARTNER_VARIANT_LINE = re.compile(r"^partner\s*[—-]\s*([^(]+)")
+
+
+def _ability_lines(card: dict) -> list[str]:
+    texts = [card.get("oracle_text") or ""]
+    for face in card.get("card_faces") or []:
+        if isinstance(face, dict):
+            texts.append(face.get("oracle_text") or "")
+    lines = []
+    for text in texts:
+        for line in text.replace("’", "'").lower().splitlines():
+            line = line.strip()
+            if line:
+                lines.append(line)
+    return lines
+
+
+def partner_variant(card: dict) -> str | None:
+    for line in _ability_lines(card):
+        if line.startswith("partner with"):
+            continue
+        m = _PARTNER_VARIANT_LINE.match(line)
+        if m:
+            return m.group(1).strip()
+    return None
+
+
+def card_capabilities(card: dict) -> int:
+    """
+    Bitset of the commander-pairing abilities of a card (CAP_* flags).
+    Card records that carry a precomputed "capabilities" value are returned as-is.
+    """
+    precomputed = card.get("capabilities")
+    if isinstance(precomputed, int):
+        return precomputed
+
+    caps = 0
+    keywords = {str(k).lower() for k in (card.get("keywords") or [])}
+    if "partner with" in keywords:
+        caps |= CAP_PARTNER_WITH
+    if "friends forever" in keywords:
+        caps |= CAP_FRIENDS_FOREVER
+    if "doctor's companion" in keywords:
+        caps |= CAP_DOCTORS_COMPANION
+
+    for line in _ability_lines(card):
+        if line.startswith("partner with"):
+            caps |= CAP_PARTNER_WITH
+        elif _PARTNER_LINE.match(line):
+            caps |= CAP_PARTNER
+        elif _PARTNER_VARIANT_LINE.match(line):
+            caps |= CAP_PARTNER_VARIANT
+        elif line.startswith("friends forever"):
+            caps |= CAP_FRIENDS_FOREVER
+        elif line.startswith("choose a background"):
+            caps |= CAP_CHOOSE_A_BACKGROUND
+        elif line.startswith("doctor's companion"):
+            caps |= CAP_DOCTORS_COMPANION
+
+    tl = type_line(card)
+    if is_background(card):
+        caps |= CAP_BACKGROUND
+    if "legendary" in tl and "creature" in tl and "time lord doctor" in tl:
+        caps |= CAP_TIME_LORD_DOCTOR
+    return caps
+
+
+def validate_commander_pair(c1: dict, c2: dict | None) -> str | None:
+    """
+    Pure commander pairing check. Returns None if legal, else a German error message.
+    """
+    caps1 = card_capabilities(c1)
+    if c2 is None:
+        if caps1 & CAP_BACKGROUND:
+            return "Ein Background kann nicht alleine Commander sein. Wähle zuerst eine Kreatur mit 'Choose a Background'."
+        return None
+
+    caps2 = card_capabilities(c2)
+    both = (caps1, caps2)
+
+    # Background pairing
+    if (caps1 | caps2) & CAP_BACKGROUND:
+        if caps1 & caps2 & CAP_BACKGROUND:
+            return "Zwei Backgrounds zusammen sind nicht erlaubt. Wähle eine Kreatur mit 'Choose a Background' + genau einen Background."
+        non_bg_caps = caps2 if caps1 & CAP_BACKGROUND else caps1
+        if not non_bg_caps & CAP_CHOOSE_A_BACKGROUND:
+            return "Backgrounds funktionieren nur zusammen mit einem Commander, der 'Choose a Background' hat."
+        return None
+
+    # Partner with pairing (must match exactly)
+    p1 = partner_with_target_name(c1) if caps1 & CAP_PARTNER_WITH else None
+    p2 = partner_with_target_name(c2) if caps2 & CAP_PARTNER_WITH else None
+    if p1 or p2:
+        if not (p1 and p2):
+            return "Diese Kombination ist nicht gültig: 'Partner with' funktioniert nur mit der jeweils angegebenen Partnerkarte."
+        if p1.lower() != (c2.get("name") or "").lower() or p2.lower() != (c1.get("name") or "").lower():
+            return "Diese Kombination ist nicht gültig: 'Partner with' erlaubt nur das spezifisch genannte Paar."
+        return None
+
+    # Friends forever (must be both)
+    ff1, ff2 = (bool(c & CAP_FRIENDS_FOREVER) for c in both)
+    if ff1 != ff2:
+        return "Diese Kombination ist nicht gültig: 'Friends forever' kann nur mit einer anderen 'Friends forever'-Karte kombiniert werden."
+    if ff1 and ff2:
+        return None
+
+    # Doctor's companion + Time Lord Doctor
+    if (caps1 | caps2) & CAP_DOCTORS_COMPANION:
+        companion_caps, doctor_caps = (caps1, caps2) if caps1 & CAP_DOCTORS_COMPANION else (caps2, caps1)
+        if doctor_caps & CAP_TIME_LORD_DOCTOR and not doctor_caps & PAIRING_CAPS & ~CAP_TIME_LORD_DOCTOR:
+            return None
+        return "Diese Kombination ist nicht gültig: 'Doctor's companion' funktioniert nur zusammen mit einem Time Lord Doctor."
+
+    # Partner—<Variante> (only the same variant)
+    if (caps1 | caps2) & CAP_PARTNER_VARIANT:
+        v1, v2 = partner_variant(c1), partner_variant(c2)
+        if v1 and v2 and v1 == v2:
+            return None
+        return "Diese Kombination ist nicht gültig: 'Partner—…' funktioniert nur mit einer Karte derselben Partner-Variante."
+
+    # Generic partner (both must have plain Partner)
+    if not (caps1 & CAP_PARTNER and caps2 & CAP_PARTNER):
+        return "Diese Kombination ist nicht Commander-legal: Beide Karten müssen kompatible Partner-Commander sein (oder 'Choose a Background' + Background)."
+
+    return None
@@ -0,0 +1,135 @@
+import asyncio
+import importlib.util
+import io
+from pathlib import Path
+
+from backend.repositories.image_cache_repository import ImageCache
+from backend.services import scryfall_service
+from backend.services.card_rules import get_image_url
+from backend.services.scryfall_service import SingleFlight
+from backend.config import IMAGE_PROXY_WIDTHS
+
+
+IMAGE_VARIANTS = ("small", "normal", "large", "png", "art_crop", "border_crop")
+
+# Disk cache (injected in the FastAPI lifespan). Without it, card images are linked directly.
+_image_cache: ImageCache | None = None
+
+_flight = SingleFlight()
+
+
+def set_image_cache(cache: ImageCache | None) -> None:
+    global _image_cache
+    _image_cache = cache
+
+
+def pillow_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def media_type(variant: str) -> str:
+    return "image/png" if variant == "png" else "image/jpeg"
+
+
+def normalize_width(width: int | None) -> int | None:
+    """Snaps a requested width to the next configured size (bounded cache key space)."""
+    if not width or width <= 0 or not IMAGE_PROXY_WIDTHS:
+        return None
+    for allowed in sorted(IMAGE_PROXY_WIDTHS):
+        if width <= allowed:
+            return allowed
+    return max(IMAGE_PROXY_WIDTHS)
+
+
+def proxied_url(card: dict | None, variant: str, width: int | None = None) -> str | None:
+    """
+    Local /img URL for a card image, or the Scryfall CDN URL when the proxy is not active.
+    The card is remembered so the proxy can resolve its image without another search.
+    """
+    if not card:
+        return None
+    direct = get_image_url(card, variant)
+    if not direct:
+        return None
+    card_id = str(card.get("id") or "").strip()
+    if not card_id or _image_cache is None:
+        return direct
+    scryfall_service.remember_card(card)
+    url = f"/img/{card_id}/{variant}"
+    width = normalize_width(width)
+    if width:
+        url += f"?w={width}"
+    return url
+
+
+def _downscale(original: Path, width: int, variant: str) -> bytes | None:
+    """Resized copy of the original file, or None when it is already narrow enough."""
+    from PIL import Image
+
+    with Image.open(original) as img:
+        if img.width <= width:
+            return None
+        height = max(1, round(img.height * width / img.width))
+        resized = img.resize((width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        if variant == "png":
+            resized.save(out, "PNG", optimize=True)
+        else:
+            resized.convert("RGB").save(out, "JPEG", quality=82, optimize=True)
+        return out.getvalue()
+
+
+async def _store(key: str, data: bytes) -> tuple[Path, str]:
+    etag = await asyncio.to_thread(_image_cache.put, key, data)
+    return _image_cache.path_for(key), etag
+
+
+async def _load_original(card_id: str, variant: str) -> tuple[Path, str] | None:
+    key = f"{card_id}_{variant}"
+    hit = await asyncio.to_thread(_image_cache.lookup, key)
+    if hit is not None:
+        return hit
+
+    card = await scryfall_service.get_card_by_id(card_id)
+    url = get_image_url(card, variant) if card else None
+    if not url:
+        return None
+    data = await scryfall_service.download_image(url)
+    if not data:
+        return None
+    return await _store(key, data)
+
+
+async def _load(card_id: str, variant: str, width: int | None) -> tuple[Path, str] | None:
+    if not width:
+        return await _load_original(card_id, variant)
+
+    key = f"{card_id}_{variant}_w{width}"
+    hit = await asyncio.to_thread(_image_cache.lookup, key)
+    if hit is not None:
+        return hit
+
+    original = await _load_original(card_id, variant)
+    if original is None:
+        return None
+    try:
+        data = await asyncio.to_thread(_downscale, original[0], width, variant)
+    except Exception:
+        return original
+    if data is None:
+        return original
+    return await _store(key, data)
+
+
+async def load_image(card_id: str, variant: str, width: int | None = None) -> tuple[Path, str] | None:
+    """
+    Returns (file path, strong ETag) of the cached image, downloading the original
+    once; all disk work runs in worker threads. Downscaled widths are only
+    produced when Pillow is installed; otherwise the original is served.
+    """
+    if _image_cache is None:
+        return None
+    width = normalize_width(width)
+    if width and not pillow_available():
+        width = None
+    return await _flight.do(f"{card_id}:{variant}:{width or ''}", lambda: _load(card_id, variant, width))
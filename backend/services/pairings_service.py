@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from itertools import combinations
 from random import shuffle
 
@@ -155,11 +157,21 @@ def first_round_with_hosts(players: list[str], num_pods: int, hosts: list[str])
     return pods
 
 
+class RoundsCancelled(Exception):
+    """build_rounds() was stopped through its cancel event."""
+
+
+def _check_cancel(cancel: threading.Event | None) -> None:
+    if cancel is not None and cancel.is_set():
+        raise RoundsCancelled()
+
+
 def build_rounds(
     players: list[str],
     num_pods: int,
     max_rounds: int,
     fixed_first_round: list[list[str]] | None = None,
+    cancel: threading.Event | None = None,
 ) -> list[list[list[str]]]:
     n = len(players)
     sizes = pod_sizes(n, num_pods)
@@ -198,6 +210,7 @@ def build_rounds(
     q.append((start_key, len(rounds_idx), rounds_idx[:]))
 
     while q:
+        _check_cancel(cancel)
         key, depth, path = q.popleft()
         counts = counts_from_key(key, n)
 
@@ -228,6 +241,7 @@ def build_rounds(
     if best_depth_solution is None:
         counts = start_counts
         while len(rounds_idx) < max_rounds:
+            _check_cancel(cancel)
             best = None
             for pods in partitions:
                 newc = apply_partition(counts, pods)
@@ -241,6 +255,7 @@ def build_rounds(
         counts = counts_from_key(key, n)
 
         while len(rounds_idx) < max_rounds:
+            _check_cancel(cancel)
             best = None
             for pods in partitions:
                 newc = apply_partition(counts, pods)
@@ -259,6 +274,65 @@ def build_rounds(
     return rounds_named
 
 
+class RoundsPrecomputer:
+    """
+    Runs build_rounds() speculatively in a worker thread.
+
+    The schedule is keyed by (players, num_pods, max_rounds); take() only hands out a
+    result whose key matches the requested inputs, otherwise the caller computes fresh.
+    Cancelling a task cannot stop its thread, so every run also gets a cancel event
+    that the builder checks between search steps; invalidate() sets it.
+    """
+
+    def __init__(self, builder=build_rounds):
+        self._builder = builder
+        self._key: tuple | None = None
+        self._task: asyncio.Task | None = None
+        self._cancel: threading.Event | None = None
+
+    @staticmethod
+    def _make_key(players: list[str], num_pods: int, max_rounds: int) -> tuple:
+        return (tuple(players), int(num_pods), int(max_rounds))
+
+    def schedule(self, players: list[str], num_pods: int, max_rounds: int) -> None:
+        key = self._make_key(players, num_pods, max_rounds)
+        if key == self._key and self._task is not None:
+            return
+
+        self.invalidate()
+        self._key = key
+        self._cancel = cancel = threading.Event()
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self._builder, list(players), int(num_pods), int(max_rounds), cancel=cancel)
+        )
+        # retrieve exceptions of abandoned tasks so asyncio does not log them
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._task = task
+
+    def invalidate(self) -> None:
+        if self._cancel is not None:
+            self._cancel.set()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._key = None
+        self._cancel = None
+
+    async def take(self, players: list[str], num_pods: int, max_rounds: int) -> list[list[list[str]]] | None:
+        key = self._make_key(players, num_pods, max_rounds)
+        if self._task is None or key != self._key:
+            return None
+
+        task = self._task
+        self._task = None
+        self._key = None
+        self._cancel = None
+        try:
+            return await task
+        except Exception:
+            return None
+
+
 def apply_round_to_raffle(raffle_list: list[dict], state: dict, round_no: int) -> None:
     rounds = state.get("rounds") or []
     phase = state.get("phase") or "ready"
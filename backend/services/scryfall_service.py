@@ -1,23 +1,538 @@
+import asyncio
+import heapq
+import importlib.util
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable
 from urllib.parse import quote_plus
 
 import httpx
 
-from backend.config import SCRYFALL_BASE, SCRYFALL_HEADERS, SCRYFALL_TIMEOUT
+from backend.repositories.card_cache_repository import CardCache, trim_card
+from backend.services.cache_service import TTLCache
+from backend.services.card_index_service import CardIndex
+from backend.config import (
+    SCRYFALL_BASE,
+    SCRYFALL_BREAKER_FAILURES,
+    SCRYFALL_BREAKER_RESET_SECONDS,
+    SCRYFALL_CONNECT_TIMEOUT,
+    SCRYFALL_HEADERS,
+    SCRYFALL_HTTP2,
+    SCRYFALL_KEEPALIVE_EXPIRY,
+    SCRYFALL_MAX_CONNECTIONS,
+    SCRYFALL_MAX_KEEPALIVE_CONNECTIONS,
+    SCRYFALL_RATE_BURST,
+    SCRYFALL_RATE_PER_SECOND,
+    SCRYFALL_RESPONSE_CACHE_MAX_BYTES,
+    SCRYFALL_RESPONSE_CACHE_MAX_ENTRIES,
+    SCRYFALL_RESPONSE_FRESH_SECONDS,
+    SCRYFALL_RESPONSE_STALE_SECONDS,
+    SCRYFALL_TIMEOUT,
+)
 
 
-async def get_card_by_id(card_id: str) -> dict | None:
-    card_id = (card_id or "").strip()
-    if not card_id:
+# One pooled client for the whole application lifetime (opened/closed in the FastAPI lifespan).
+_client: httpx.AsyncClient | None = None
+
+# Optional persistent card cache (injected in the FastAPI lifespan).
+_card_cache: CardCache | None = None
+
+# Optional offline bulk-data index; consulted before cache and network.
+_card_index: CardIndex | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight task.
+    Waiters are shielded, so a cancelled caller never cancels work that others
+    still wait for; once the last waiter is gone, the shared task is cancelled.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.coalesced += 1
+            return await self._wait(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+
+        def _forget(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is t:
+                self._inflight.pop(key, None)
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(_forget)
+        return await self._wait(task)
+
+    async def _wait(self, task: asyncio.Task):
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters.pop(task, 1) - 1
+            if remaining > 0:
+                self._waiters[task] = remaining
+            elif not task.done():
+                task.cancel()
+                self.abandoned += 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "inflight": len(self._inflight),
+        }
+
+
+# Priority lanes for outgoing requests; lower value is served first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_BULK = 2
+
+_LANE_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_BULK: "bulk",
+}
+
+_priority: ContextVar[int] = ContextVar("scryfall_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def scryfall_priority(priority: int):
+    """
+    Runs the enclosed Scryfall calls (and tasks spawned inside) in the given lane.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all outgoing requests. When the bucket is empty,
+    callers queue by (priority, arrival) and are released one token at a time.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._queue: list[list] = []
+        self._seq = itertools.count()
+        self.acquired = {name: 0 for name in _LANE_NAMES.values()}
+        self.waited = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        lane = _LANE_NAMES.get(priority, "bulk")
+        self._refill()
+        if not self._queue and self._tokens >= 1:
+            self._tokens -= 1
+            self.acquired[lane] += 1
+            return
+
+        started = time.monotonic()
+        entry = [priority, next(self._seq), lane]
+        heapq.heappush(self._queue, entry)
+        try:
+            while True:
+                self._refill()
+                if self._queue[0] is entry and self._tokens >= 1:
+                    heapq.heappop(self._queue)
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep(max(0.001, (1 - self._tokens) / self.rate))
+        except BaseException:
+            if entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            raise
+
+        waited = time.monotonic() - started
+        self.acquired[lane] += 1
+        self.waited += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict:
+        depth = {name: 0 for name in _LANE_NAMES.values()}
+        for _priority_value, _seq, lane in self._queue:
+            depth[lane] += 1
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "queue_depth": depth,
+            "acquired": dict(self.acquired),
+            "waited": self.waited,
+            "wait_avg_ms": round(1000 * self.wait_total / self.waited, 1) if self.waited else 0.0,
+            "wait_max_ms": round(1000 * self.wait_max, 1),
+        }
+
+
+class ScryfallUnavailable(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures (timeouts,
+    transport errors, 429/5xx). After `reset_timeout` seconds one probe request
+    is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        # request ended without a verdict (e.g. cancelled): let another probe through
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class ResponseCache:
+    """
+    Successful JSON responses by URL (a TTLCache namespace). Entries are fresh for
+    `fresh_ttl` seconds and may be served stale (while revalidating, or when
+    Scryfall is failing) until `stale_ttl`.
+    """
+
+    def __init__(self, fresh_ttl: float, stale_ttl: float, max_entries: int, max_bytes: int | None = None):
+        self.fresh_ttl = float(fresh_ttl)
+        self.entries = TTLCache("scryfall:responses", max_entries, max(float(stale_ttl), self.fresh_ttl), max_bytes)
+        self.stale_hits = 0
+
+    def lookup(self, url: str) -> tuple[dict | None, bool]:
+        """Returns (payload, is_fresh); payload is None if missing or too old."""
+        item = self.entries.get(url)
+        if item is None:
+            return None, False
+        stored_at, payload = item
+        fresh = time.monotonic() - stored_at <= self.fresh_ttl
+        if not fresh:
+            self.stale_hits += 1
+        return payload, fresh
+
+    def store(self, url: str, payload: dict) -> None:
+        self.entries.set(url, (time.monotonic(), payload))
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {**self.entries.stats(), "stale_hits": self.stale_hits}
+
+
+_flight = SingleFlight()
+_limiter = RateLimiter(SCRYFALL_RATE_PER_SECOND, SCRYFALL_RATE_BURST)
+_breaker = CircuitBreaker(SCRYFALL_BREAKER_FAILURES, SCRYFALL_BREAKER_RESET_SECONDS)
+_responses = ResponseCache(
+    SCRYFALL_RESPONSE_FRESH_SECONDS,
+    SCRYFALL_RESPONSE_STALE_SECONDS,
+    SCRYFALL_RESPONSE_CACHE_MAX_ENTRIES,
+    SCRYFALL_RESPONSE_CACHE_MAX_BYTES,
+)
+_refresh_tasks: set[asyncio.Task] = set()
+_http_requests = 0
+
+
+def set_rate_limiter(limiter: RateLimiter) -> None:
+    global _limiter
+    _limiter = limiter
+
+
+def set_circuit_breaker(breaker: CircuitBreaker) -> None:
+    global _breaker
+    _breaker = breaker
+
+
+def set_response_cache(cache: ResponseCache) -> None:
+    global _responses
+    _responses = cache
+
+
+def get_response_cache() -> ResponseCache:
+    return _responses
+
+
+def scryfall_metrics() -> dict:
+    return {
+        "http_requests": _http_requests,
+        "singleflight": _flight.stats(),
+        "rate_limiter": _limiter.stats(),
+        "circuit_breaker": _breaker.stats(),
+        "response_cache": _responses.stats(),
+        "card_cache": _card_cache.stats() if _card_cache is not None else None,
+    }
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers=SCRYFALL_HEADERS,
+        timeout=httpx.Timeout(SCRYFALL_TIMEOUT, connect=SCRYFALL_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=SCRYFALL_MAX_CONNECTIONS,
+            max_keepalive_connections=SCRYFALL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=SCRYFALL_KEEPALIVE_EXPIRY,
+        ),
+        http2=bool(SCRYFALL_HTTP2 and _http2_available()),
+    )
+
+
+def set_client(client: httpx.AsyncClient | None) -> None:
+    global _client
+    _client = client
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client. Created lazily, so calls outside the lifespan
+    (scripts, tests) still work.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def set_card_cache(cache: CardCache | None) -> None:
+    global _card_cache
+    _card_cache = cache
+
+
+def get_card_cache() -> CardCache | None:
+    return _card_cache
+
+
+def set_card_index(index: CardIndex | None) -> None:
+    global _card_index
+    _card_index = index
+
+
+def remember_card(card: dict | None) -> dict | None:
+    if not card:
         return None
-    url = f"{SCRYFALL_BASE}/cards/{quote_plus(card_id)}"
+    if _card_cache is None:
+        return trim_card(card)
+    return _card_cache.put(card)
+
+
+def search_url(
+    query: str,
+    unique: str = "cards",
+    order: str | None = None,
+    direction: str | None = None,
+    page: int | None = None,
+) -> str:
+    url = f"{SCRYFALL_BASE}/cards/search?q={quote_plus(query)}&unique={unique}"
+    if order:
+        url += f"&order={order}"
+    if direction:
+        url += f"&dir={direction}"
+    if page is not None:
+        url += f"&page={int(page)}"
+    return url
+
+
+async def _get(url: str, headers: dict | None = None) -> httpx.Response:
+    global _http_requests
+    if not _breaker.allow():
+        raise ScryfallUnavailable(url)
+    try:
+        await _limiter.acquire(_priority.get())
+        _http_requests += 1
+        r = await get_client().get(url, headers=headers)
+    except httpx.TransportError:
+        _breaker.record_failure()
+        raise
+    except BaseException:
+        _breaker.release()
+        raise
+    if r.status_code == 429 or r.status_code >= 500:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success()
+    return r
+
+
+def _is_empty_search(url: str, r: httpx.Response) -> bool:
+    """Scryfall answers a search without matches with 404 and a not_found error object."""
+    if r.status_code != 404 or not url.startswith(f"{SCRYFALL_BASE}/cards/search?"):
+        return False
     try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-            r = await client.get(url)
+        body = r.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and body.get("object") == "error" and body.get("code") == "not_found"
+
+
+async def _fetch_json(url: str, headers: dict | None = None) -> dict | None:
+    try:
+        r = await _get(url, headers=headers)
+        if _is_empty_search(url, r):
+            return {"object": "list", "total_cards": 0, "has_more": False, "data": []}
+        if r.status_code != 200:
+            return None
+        return r.json()
+    except Exception:
+        return None
+
+
+async def _fetch_and_store(url: str, headers: dict | None) -> dict | None:
+    payload = await _fetch_json(url, headers=headers)
+    if payload is not None:
+        _responses.store(url, payload)
+    return payload
+
+
+def _revalidate(url: str, headers: dict | None) -> None:
+    with scryfall_priority(PRIORITY_BACKGROUND):
+        task = asyncio.ensure_future(_flight.do(f"url:{url}", lambda: _fetch_and_store(url, headers)))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def get_json(url: str, headers: dict | None = None) -> dict | None:
+    """
+    GET via the shared client. Returns the JSON payload for HTTP 200, otherwise None;
+    a search without matches is an empty list payload, so None always means "no answer".
+    Concurrent requests for the same URL share one HTTP round trip. Stale responses
+    are served immediately and refreshed in the background; they also stand in
+    when Scryfall fails.
+    """
+    cached, fresh = _responses.lookup(url)
+    if cached is not None:
+        if not fresh:
+            _revalidate(url, headers)
+        return cached
+
+    return await _flight.do(f"url:{url}", lambda: _fetch_and_store(url, headers))
+
+
+async def download_image(url: str) -> bytes | None:
+    """
+    Downloads a card image from Scryfall's image CDN. The CDN is not subject to
+    the API rate limit, so neither the limiter nor the circuit breaker applies.
+    """
+    async def fetch() -> bytes | None:
+        try:
+            r = await get_client().get(url, headers={"Accept": "image/*"})
             if r.status_code != 200:
                 return None
-            return r.json()
-    except Exception:
+            return r.content
+        except Exception:
+            return None
+
+    return await _flight.do(f"img:{url}", fetch)
+
+
+async def search_cards(
+    query: str,
+    unique: str = "cards",
+    order: str | None = None,
+    direction: str | None = None,
+    page: int | None = None,
+    headers: dict | None = None,
+) -> dict | None:
+    query = (query or "").strip()
+    if not query:
         return None
+    return await get_json(search_url(query, unique=unique, order=order, direction=direction, page=page), headers=headers)
+
+
+async def get_card_by_id(card_id: str) -> dict | None:
+    card_id = (card_id or "").strip()
+    if not card_id:
+        return None
+    if _card_index is not None:
+        indexed = _card_index.get_by_id(card_id)
+        if indexed is not None:
+            return indexed
+    if _card_cache is not None:
+        cached = await asyncio.to_thread(_card_cache.get_by_id, card_id)
+        if cached is not None:
+            return cached
+
+    async def fetch() -> dict | None:
+        return remember_card(await _fetch_json(f"{SCRYFALL_BASE}/cards/{quote_plus(card_id)}"))
+
+    return await _flight.do(f"card:{card_id}", fetch)
 
 
 async def random_commander(
@@ -30,19 +545,20 @@ async def random_commander(
     url = f"{SCRYFALL_BASE}/cards/random?q={quote_plus(scry_q)}"
 
     try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-            for _ in range(max_tries):
-                r = await client.get(url)
-                if r.status_code != 200:
-                    continue
-                card = r.json()
-                cid = (card.get("id") or "").strip()
-                name = (card.get("name") or "").strip()
-                if not cid or not name:
-                    continue
-                if cid in exclude_card_ids:
-                    continue
-                return card
+        for _ in range(max_tries):
+            r = await _get(url)
+            if r.status_code != 200:
+                continue
+            card = r.json()
+            cid = (card.get("id") or "").strip()
+            name = (card.get("name") or "").strip()
+            if not cid or not name:
+                continue
+            if cid in exclude_card_ids:
+                continue
+            if _card_cache is not None:
+                _card_cache.put(card)
+            return card
     except Exception:
         return None
 
@@ -53,16 +569,19 @@ async def named_exact(name: str) -> dict | None:
     name = (name or "").strip()
     if not name:
         return None
+    if _card_index is not None:
+        indexed = _card_index.get_by_name(name)
+        if indexed is not None:
+            return indexed
+    if _card_cache is not None:
+        cached = await asyncio.to_thread(_card_cache.get_by_name, name)
+        if cached is not None:
+            return cached
 
-    url = f"{SCRYFALL_BASE}/cards/named?exact={quote_plus(name)}"
-    try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-            r = await client.get(url)
-            if r.status_code != 200:
-                return None
-            return r.json()
-    except Exception:
-        return None
+    async def fetch() -> dict | None:
+        return remember_card(await _fetch_json(f"{SCRYFALL_BASE}/cards/named?exact={quote_plus(name)}"))
+
+    return await _flight.do(f"named:{name.lower()}", fetch)
 
 
 async def is_partner_exact_name(name: str, query_template: str = '!"{name}" is:partner') -> bool:
@@ -71,15 +590,10 @@ async def is_partner_exact_name(name: str, query_template: str = '!"{name}" is:p
         return False
 
     tpl = (query_template or '!"{name}" is:partner').strip()
-    scry_q = tpl.replace("{name}", name)
-    url = f"{SCRYFALL_BASE}/cards/search?q={quote_plus(scry_q)}&unique=cards"
+    payload = await search_cards(tpl.replace("{name}", name), unique="cards")
+    if payload is None:
+        return False
     try:
-        async with httpx.AsyncClient(timeout=SCRYFALL_TIMEOUT, headers=SCRYFALL_HEADERS) as client:
-            r = await client.get(url)
-            if r.status_code != 200:
-                return False
-            payload = r.json()
-            total = int(payload.get("total_cards") or 0)
-            return total > 0
-    except Exception:
+        return int(payload.get("total_cards") or 0) > 0
+    except (TypeError, ValueError):
         return False
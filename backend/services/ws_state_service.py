@@ -1,27 +1,99 @@
+import asyncio
 import hashlib
+import itertools
 import json
-from typing import Callable
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Awaitable, Callable, Iterable
 
 from fastapi import WebSocket
 
+from backend.config import (
+    WS_HANDSHAKE_CONCURRENCY,
+    WS_HEARTBEAT_INTERVAL_SECONDS,
+    WS_IDLE_TIMEOUT_SECONDS,
+    WS_HANDSHAKE_WAIT_SECONDS,
+    WS_RECONNECT_BASE_MS,
+    WS_RECONNECT_JITTER_MS,
+    WS_SEND_QUEUE_SIZE,
+    WS_SEND_TIMEOUT_SECONDS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def reconnect_hint(base_ms: int = WS_RECONNECT_BASE_MS, jitter_ms: int = WS_RECONNECT_JITTER_MS) -> str:
+    """Close-frame reason telling the client how long to wait before reconnecting."""
+    return json.dumps({"retry_ms": int(base_ms + random.uniform(0, max(0, jitter_ms)))})
+
+
+class _Connection:
+    __slots__ = ("ws", "group", "queue", "writer", "connected_at", "last_seen", "messages_sent", "bytes_sent")
+
+    def __init__(self, ws: WebSocket, group: str, queue_size: int):
+        self.ws = ws
+        self.group = group
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)  # (text, size in bytes)
+        self.writer: asyncio.Task | None = None
+        self.connected_at = time.time()
+        self.last_seen = time.monotonic()
+        self.messages_sent = 0
+        self.bytes_sent = 0
+
 
 class WSManager:
-    def __init__(self):
+    """
+    Socket groups with one bounded send queue and writer task per connection.
+    Broadcasts only enqueue (the payload is encoded once), so a slow client
+    never delays the others. A send that exceeds send_timeout, or a queue that
+    overflows, disconnects that client; it resyncs through hello on reconnect.
+    Close frames carry a jittered reconnect delay (see reconnect_hint).
+    heartbeat() pings quiet clients and reaps sockets that stayed silent for
+    idle_timeout (half-open connections never fail a send on their own).
+    """
+
+    def __init__(
+        self,
+        queue_size: int = WS_SEND_QUEUE_SIZE,
+        send_timeout: float = WS_SEND_TIMEOUT_SECONDS,
+        heartbeat_interval: float = WS_HEARTBEAT_INTERVAL_SECONDS,
+        idle_timeout: float = WS_IDLE_TIMEOUT_SECONDS,
+    ):
         self.groups: dict[str, set[WebSocket]] = {
             "ccp": set(),
             "home": set(),
         }
+        self.queue_size = max(1, int(queue_size))
+        self.send_timeout = float(send_timeout)
+        self.heartbeat_interval = float(heartbeat_interval)
+        self.idle_timeout = max(float(idle_timeout), self.heartbeat_interval)
+        self._conns: dict[WebSocket, _Connection] = {}
+        self.dropped_slow = 0
+        self.send_timeouts = 0
+        self.pings_sent = 0
+        self.reaped_idle = 0
 
     def connect_existing(self, ws: WebSocket, group: str):
         if group not in self.groups:
             self.groups[group] = set()
         self.groups[group].add(ws)
+        conn = _Connection(ws, group, self.queue_size)
+        conn.writer = asyncio.ensure_future(self._write(conn))
+        self._conns[ws] = conn
 
     def disconnect(self, ws: WebSocket, group: str):
         if group in self.groups:
             self.groups[group].discard(ws)
             if group.startswith("deck:") and len(self.groups[group]) == 0:
                 self.groups.pop(group, None)
+        conn = self._conns.pop(ws, None)
+        if conn is not None and conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
 
     def active_deck_ids(self) -> set[int]:
         ids = set()
@@ -33,89 +105,475 @@ class WSManager:
                     pass
         return ids
 
+    def touch(self, ws: WebSocket) -> None:
+        """Marks the socket alive; called for every frame the client sends."""
+        conn = self._conns.get(ws)
+        if conn is not None:
+            conn.last_seen = time.monotonic()
+
+    def send(self, ws: WebSocket, message: dict | str) -> bool:
+        """Queues one message (dict -> JSON text) for a single socket."""
+        conn = self._conns.get(ws)
+        if conn is None:
+            return False
+        text = message if isinstance(message, str) else json.dumps(message, ensure_ascii=False)
+        return self._enqueue(conn, text, len(text.encode("utf-8")))
+
     async def broadcast_group(self, group: str, payload: dict):
-        conns = list(self.groups.get(group, set()))
+        conns = [self._conns[ws] for ws in self.groups.get(group, set()) if ws in self._conns]
         if not conns:
             return
-        dead = []
-        for ws in conns:
+        text = json.dumps(payload, ensure_ascii=False)
+        size = len(text.encode("utf-8"))
+        for conn in conns:
+            self._enqueue(conn, text, size)
+
+    def heartbeat(self) -> tuple[int, int]:
+        """
+        One liveness pass: sockets silent for idle_timeout are closed (1001),
+        sockets silent for a heartbeat interval get a "ping" the client answers
+        with "pong". Returns (pinged, reaped).
+        """
+        now = time.monotonic()
+        pinged = reaped = 0
+        for conn in list(self._conns.values()):
+            idle = now - conn.last_seen
+            if idle >= self.idle_timeout:
+                self.reaped_idle += 1
+                reaped += 1
+                self._drop(conn, code=1001)
+            elif idle >= self.heartbeat_interval and self._enqueue(conn, "ping", 4):
+                self.pings_sent += 1
+                pinged += 1
+        return pinged, reaped
+
+    async def run_heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.heartbeat()
+
+    def _enqueue(self, conn: _Connection, text: str, size: int) -> bool:
+        try:
+            conn.queue.put_nowait((text, size))
+            return True
+        except asyncio.QueueFull:
+            self.dropped_slow += 1
+            self._drop(conn, code=1013)
+            return False
+
+    async def drain(self, ws: WebSocket) -> bool:
+        """Waits until everything queued for the socket has been written (bounded by send_timeout)."""
+        conn = self._conns.get(ws)
+        if conn is None:
+            return False
+        try:
+            await asyncio.wait_for(conn.queue.join(), timeout=self.send_timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _drop(self, conn: _Connection, code: int) -> None:
+        self.disconnect(conn.ws, conn.group)
+        asyncio.ensure_future(self._close(conn.ws, code))
+
+    async def _close(self, ws: WebSocket, code: int) -> None:
+        try:
+            await asyncio.wait_for(ws.close(code=code, reason=reconnect_hint()), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    async def _write(self, conn: _Connection) -> None:
+        while True:
+            text, size = await conn.queue.get()
             try:
-                await ws.send_json(payload)
+                await asyncio.wait_for(conn.ws.send_text(text), timeout=self.send_timeout)
+                conn.messages_sent += 1
+                conn.bytes_sent += size
+            except asyncio.TimeoutError:
+                self.send_timeouts += 1
+                self._drop(conn, code=1011)
+                return
+            except asyncio.CancelledError:
+                raise
             except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.groups.get(group, set()).discard(ws)
-
-
-def global_signature(
-    start_file_exists: bool,
-    raffle_list: list[dict],
-    pairings_loader: Callable[[], dict | None],
-    settings_loader: Callable[[], dict] | None = None,
-) -> str:
-    deck_ids = {e.get("deck_id") for e in raffle_list if "deck_id" in e}
-    confirmed = 0
-    total = 0
-    for e in raffle_list:
-        if "deck_id" in e:
-            total += 1
-            if e.get("received_confirmed") is True:
-                confirmed += 1
-
-    pair = pairings_loader() or {}
-    obj = {
-        "start_file_exists": start_file_exists,
-        "deck_count": len(deck_ids),
-        "total_decks": total,
-        "confirmed_count": confirmed,
-        "pairings_phase": pair.get("phase"),
-        "active_round": pair.get("active_round"),
-        "pairings_hosts": pair.get("hosts"),
-        "round_reports": pair.get("round_reports") or {},
-        "best_deck_votes": pair.get("best_deck_votes") or {},
-        "deck_creator_guess_votes": pair.get("deck_creator_guess_votes") or {},
-        "voting_results": pair.get("voting_results") or {},
-        "settings": settings_loader() if settings_loader else {},
-    }
-    return hashlib.sha1(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
-
-
-def deck_signature(
-    deck_id: int,
-    start_file_exists: bool,
-    raffle_list: list[dict],
-    pairings_loader: Callable[[], dict | None] | None = None,
-    settings_loader: Callable[[], dict] | None = None,
-) -> str:
-    entry = None
-    for e in raffle_list:
-        if e.get("deck_id") == deck_id:
-            entry = e
-            break
-
-    registered = entry is not None
-    deck_owner = entry.get("deckOwner") if entry else None
-    received_confirmed = entry.get("received_confirmed") if entry else None
-    pair = pairings_loader() if pairings_loader else {}
-    pair = pair if isinstance(pair, dict) else {}
-
-    pairing_round = entry.get("pairing_round") if entry else None
-    pairing_table = entry.get("pairing_table") if entry else None
-    round_reports = pair.get("round_reports") if isinstance(pair.get("round_reports"), dict) else {}
-    round_bucket = round_reports.get(str(pairing_round)) if pairing_round is not None else None
-    table_report = round_bucket.get(str(pairing_table)) if isinstance(round_bucket, dict) and pairing_table is not None else None
-
-    obj = {
-        "deck_id": deck_id,
-        "start_file_exists": start_file_exists,
-        "registered": registered,
-        "deckOwner": deck_owner,
-        "received_confirmed": received_confirmed,
-        "pairing_round": pairing_round,
-        "pairing_table": pairing_table,
-        "pairing_phase": entry.get("pairing_phase") if entry else None,
-        "table_report": table_report or {},
-        "voting_results": pair.get("voting_results") or {},
-        "settings": settings_loader() if settings_loader else {},
-    }
-    return hashlib.sha1(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+                self._drop(conn, code=1011)
+                return
+            finally:
+                conn.queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._conns),
+            "groups": {name: len(members) for name, members in sorted(self.groups.items())},
+            "queued": sum(conn.queue.qsize() for conn in self._conns.values()),
+            "dropped_slow": self.dropped_slow,
+            "send_timeouts": self.send_timeouts,
+            "pings_sent": self.pings_sent,
+            "reaped_idle": self.reaped_idle,
+        }
+
+    def connection_stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "group": conn.group,
+                "connected_since": datetime.fromtimestamp(conn.connected_at, timezone.utc).isoformat(timespec="seconds"),
+                "idle_seconds": round(now - conn.last_seen, 1),
+                "messages_sent": conn.messages_sent,
+                "bytes_sent": conn.bytes_sent,
+                "queue_depth": conn.queue.qsize(),
+            }
+            for conn in sorted(self._conns.values(), key=lambda c: c.connected_at)
+        ]
+
+
+class StateRevisions:
+    """
+    Monotonic revision numbers per scope ("global" and each deck), bumped by the
+    write paths that change the scope. All numbers come from one sequence, so a
+    bump of "all decks" is a single counter and deck_revision() stays O(1).
+    The epoch changes on every process start; revisions are only comparable
+    within one epoch.
+    """
+
+    def __init__(self, epoch: str | None = None):
+        self.epoch = epoch or f"{int(time.time()):x}-{os.getpid():x}"
+        self._seq = itertools.count(1)
+        self.global_revision = 0
+        self._all_decks = 0
+        self._decks: dict[int, int] = {}
+
+    def bump(self, deck_ids: Iterable[int] | None = None) -> int:
+        """
+        Bumps the global scope and the given decks; deck_ids=None means every deck.
+        Returns the new global revision.
+        """
+        rev = next(self._seq)
+        self.global_revision = rev
+        if deck_ids is None:
+            self._all_decks = rev
+        else:
+            for deck_id in deck_ids:
+                self._decks[int(deck_id)] = rev
+        return rev
+
+    def deck_revision(self, deck_id: int) -> int:
+        return max(self._all_decks, self._decks.get(deck_id, 0))
+
+    def stats(self) -> dict:
+        return {
+            "epoch": self.epoch,
+            "global": self.global_revision,
+            "all_decks": self._all_decks,
+            "decks": dict(sorted(self._decks.items())),
+        }
+
+
+class NotificationScheduler:
+    """
+    Coalesces state-change notifications. request() marks the state dirty and
+    flushes at most once per window; request(immediate=True) flushes right away
+    (organizer actions). Flushes never overlap, and each one reads the state once,
+    so a burst of writes costs one snapshot and one broadcast.
+    """
+
+    def __init__(self, flush: Callable[[], Awaitable[None]], window_seconds: float):
+        self._flush = flush
+        self.window_seconds = max(0.0, float(window_seconds))
+        self._timer: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.requests = 0
+        self.flushes = 0
+
+    async def request(self, immediate: bool = False) -> None:
+        self.requests += 1
+        if immediate or self.window_seconds <= 0:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        await self.flush()
+
+    async def flush(self) -> None:
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        async with self._lock:
+            self.flushes += 1
+            try:
+                await self._flush()
+            except Exception:
+                logger.exception("notification flush failed")
+
+    async def close(self) -> None:
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": round(self.window_seconds * 1000),
+            "requests": self.requests,
+            "flushes": self.flushes,
+            "pending": self._timer is not None and not self._timer.done(),
+        }
+
+
+class HandshakeGate:
+    """
+    Admission control for /ws: at most `limit` handshakes (hello built and
+    written) run at once. A client that gets no slot within wait_seconds is
+    turned away with 1013 and a jittered retry hint, so a reconnect storm after
+    a Wi-Fi blip is spread out instead of queueing up on the server.
+    """
+
+    def __init__(self, limit: int = WS_HANDSHAKE_CONCURRENCY, wait_seconds: float = WS_HANDSHAKE_WAIT_SECONDS):
+        self.limit = max(1, int(limit))
+        self.wait_seconds = max(0.0, float(wait_seconds))
+        self._slots = asyncio.Semaphore(self.limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self) -> bool:
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.wait_seconds)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+SUGGEST_MAX_QUERY_CHARS = 100
+
+
+class SuggestSession:
+    """
+    Suggest lookups of one socket: at most one in flight per kind. A newer query
+    cancels the superseded lookup, and results are tagged with the client's
+    sequence number so the page can drop anything older than its last request.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[dict], Awaitable[None]],
+        handlers: dict[str, Callable[[str], Awaitable[list[dict]]]],
+    ):
+        self._send = send
+        self._handlers = handlers
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._latest: dict[str, int] = {}
+        self.cancelled = 0
+
+    def submit(self, kind: str, q: str, seq: int) -> bool:
+        handler = self._handlers.get(kind)
+        if handler is None or seq <= self._latest.get(kind, -1):
+            return False
+        self._latest[kind] = seq
+        previous = self._tasks.pop(kind, None)
+        if previous is not None and not previous.done():
+            previous.cancel()
+            self.cancelled += 1
+        self._tasks[kind] = asyncio.ensure_future(self._run(kind, q[:SUGGEST_MAX_QUERY_CHARS], seq, handler))
+        return True
+
+    def handle_message(self, data: dict) -> bool:
+        """Accepts {"type": "suggest", "kind", "q", "seq"}; returns False for anything else."""
+        if not isinstance(data, dict) or data.get("type") != "suggest":
+            return False
+        try:
+            seq = int(data.get("seq"))
+        except (TypeError, ValueError):
+            return False
+        return self.submit(str(data.get("kind") or ""), str(data.get("q") or "").strip(), seq)
+
+    async def _run(self, kind: str, q: str, seq: int, handler) -> None:
+        try:
+            items = await handler(q)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("suggest %s failed: %s", kind, e)
+            items = []
+        if self._latest.get(kind) != seq:
+            return
+        try:
+            await self._send({"type": "suggest_result", "kind": kind, "seq": seq, "q": q, "items": items})
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class StateSnapshot:
+    """
+    One read of raffle list, pairings and settings, shared by every view of a
+    notification. Settings are hashed once and decks are indexed by id, so
+    building N deck views does not re-read or re-encode the shared state.
+    Views are built once per scope and snapshot; callers must not mutate them.
+    """
+
+    __slots__ = ("start_file_exists", "raffle_list", "pairings", "settings_json", "settings_hash", "deck_index", "_views")
+
+    def __init__(
+        self,
+        start_file_exists: bool,
+        raffle_list: list[dict],
+        pairings: dict | None,
+        settings: dict | None = None,
+    ):
+        deck_index: dict[int, dict] = {}
+        for e in raffle_list:
+            if "deck_id" in e:
+                deck_index.setdefault(e.get("deck_id"), e)
+        self.start_file_exists = bool(start_file_exists)
+        self.raffle_list = tuple(raffle_list)
+        self.pairings = pairings if isinstance(pairings, dict) else {}
+        self.settings_json = json.dumps(settings or {}, sort_keys=True, ensure_ascii=False)
+        self.settings_hash = hashlib.sha1(self.settings_json.encode("utf-8")).hexdigest()[:12]
+        self.deck_index = MappingProxyType(deck_index)
+        self._views: dict[int | None, dict] = {}
+
+    def _phase(self) -> tuple[str | None, int, bool]:
+        pair = self.pairings
+        try:
+            active_round = int(pair.get("active_round") or 0)
+        except (TypeError, ValueError):
+            active_round = 0
+        results = pair.get("voting_results")
+        published = bool(results.get("published")) if isinstance(results, dict) else False
+        return pair.get("phase") or None, active_round, published
+
+    def _table_report(self, entry: dict | None) -> dict | None:
+        if not entry or entry.get("pairing_round") is None or entry.get("pairing_table") is None:
+            return None
+        round_reports = self.pairings.get("round_reports")
+        round_bucket = round_reports.get(str(entry.get("pairing_round"))) if isinstance(round_reports, dict) else None
+        return round_bucket.get(str(entry.get("pairing_table"))) if isinstance(round_bucket, dict) else None
+
+    def global_view(self) -> dict:
+        """
+        The global state the CCP and home pages render, as plain values.
+        Clients patch themselves from the keys that changed (see view_changes).
+        """
+        view = self._views.get(None)
+        if view is None:
+            view = self._views[None] = self._build_global_view()
+        return view
+
+    def deck_view(self, deck_id: int) -> dict:
+        """The state one deck page renders, as plain values."""
+        view = self._views.get(deck_id)
+        if view is None:
+            view = self._views[deck_id] = self._build_deck_view(deck_id)
+        return view
+
+    def _build_global_view(self) -> dict:
+        pair = self.pairings
+        phase, active_round, published = self._phase()
+        decks = [e for e in self.raffle_list if e.get("deck_id") is not None]
+        confirmed = sum(1 for e in decks if e.get("received_confirmed") is True)
+
+        owners = sorted({(e.get("deckOwner") or "").strip() for e in decks if (e.get("deckOwner") or "").strip()})
+        voting_done: dict[str, bool] = {}
+        if phase == "voting":
+            top3_votes = pair.get("best_deck_votes") or {}
+            guess_votes = pair.get("deck_creator_guess_votes") or {}
+            for owner in owners:
+                owner_entry = next(e for e in decks if (e.get("deckOwner") or "").strip() == owner)
+                key = str(owner_entry.get("deck_id"))
+                voting_done[owner] = bool(top3_votes.get(key)) and bool(guess_votes.get(key))
+
+        if not self.start_file_exists:
+            names = sorted({e.get("deckersteller") for e in self.raffle_list if e.get("deckersteller")})
+            status_items = [[name, False] for name in names]
+        elif phase == "voting":
+            status_items = [[owner, voting_done[owner]] for owner in owners]
+        else:
+            status_items = sorted(
+                [[e.get("deckOwner") or "(noch kein Owner)", bool(e.get("received_confirmed"))] for e in decks],
+                key=lambda item: item[0].lower(),
+            )
+
+        tables: dict[str, list | None] = {}
+        if phase == "playing" and active_round > 0:
+            rounds = pair.get("rounds") or []
+            reports = (pair.get("round_reports") or {}).get(str(active_round)) or {}
+            active_tables = (rounds[active_round - 1] or []) if len(rounds) >= active_round else []
+            for idx in range(1, len(active_tables) + 1):
+                report = reports.get(str(idx))
+                raw_places = (report or {}).get("raw_placements") or {}
+                tables[str(idx)] = [
+                    [int(place), player] for place in ("1", "2", "3", "4") for player in (raw_places.get(place) or [])
+                ] if report else None
+
+        return {
+            "start_file_exists": self.start_file_exists,
+            "phase": phase,
+            "active_round": active_round,
+            "voting_published": published,
+            "all_confirmed": bool(decks) and confirmed == len(decks),
+            "deck_count": len(decks),
+            "confirmed_count": confirmed,
+            "voting_done": sum(1 for done in voting_done.values() if done),
+            "voting_total": len(owners) if phase == "voting" else 0,
+            "status_items": status_items,
+            "tables": tables,
+            "settings": self.settings_hash,
+        }
+
+    def _build_deck_view(self, deck_id: int) -> dict:
+        entry = self.deck_index.get(deck_id)
+        phase, active_round, published = self._phase()
+        table_report = self._table_report(entry) or {}
+        return {
+            "start_file_exists": self.start_file_exists,
+            "phase": phase,
+            "active_round": active_round,
+            "voting_published": published,
+            "registered": entry is not None,
+            "deckOwner": entry.get("deckOwner") if entry else None,
+            "received_confirmed": entry.get("received_confirmed") if entry else None,
+            "pairing_round": entry.get("pairing_round") if entry else None,
+            "pairing_table": entry.get("pairing_table") if entry else None,
+            "pairing_phase": entry.get("pairing_phase") if entry else None,
+            "table_report": {
+                "has_report": bool(table_report),
+                "resolved_places": table_report.get("resolved_places") or {},
+            },
+            "settings": self.settings_hash,
+        }
+
+
+def view_changes(old: dict | None, new: dict) -> dict:
+    """Keys of `new` whose value differs from `old` (every key when there is no old view)."""
+    if not old:
+        return dict(new)
+    return {key: value for key, value in new.items() if old.get(key) != value}
@@ -26,17 +26,148 @@
     return `${proto}://${location.host}/ws?${params}`;
   }
 
+  // --- WS-Deltas: Zähler, Tischmeldungen und Haupt-Button in-place aktualisieren ---
+  const CCP_PATCHABLE_KEYS = new Set(["deck_count", "confirmed_count", "voting_done", "voting_total", "status_items", "tables"]);
+
+  function escapeHtml(s){
+    return String(s ?? "").replace(/[&<>"']/g, (c) => ({
+      "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;",
+    }[c]));
+  }
+
+  function ccpStatusText(view){
+    if(!view.start_file_exists) return `Es sind ${view.deck_count} unterschiedliche Decks registriert.`;
+    if(view.phase === "voting"){
+      if(view.voting_total > 0 && view.voting_done === view.voting_total) return "Alle Teilnehmer haben gevotet.";
+      return `${view.voting_done} von ${view.voting_total} der Teilnehmer haben gevotet.`;
+    }
+    if(view.phase === "pre_voting" || view.all_confirmed) return null; // fester Text, ändert sich nicht
+    return `${view.confirmed_count} von ${view.deck_count} der Decks wurden ausgeteilt.`;
+  }
+
+  function renderStatusItems(view){
+    return (view.status_items || []).map(([name, ok]) => {
+      const icon = view.start_file_exists
+        ? `<span class="recv-icon ${ok ? "is-ok" : "is-pending"}">${ok ? "✓" : "?"}</span>`
+        : "";
+      return `<div class="tooltip-item">${icon}${escapeHtml(name)}</div>`;
+    }).join("");
+  }
+
+  function renderTableTitle(tableNo, placements){
+    const status = placements
+      ? `· <span style="color: var(--success); font-weight:700;">Ergebnis zurückgemeldet</span>`
+      : "· kein Ergebnis";
+    let html = `<div>Tisch ${escapeHtml(tableNo)} ${status}</div>`;
+    if(placements && placements.length){
+      const items = placements.map(([place, player]) => `<div class="tooltip-item">${escapeHtml(place)}. ${escapeHtml(player)}</div>`).join("");
+      html += `<span class="info-wrap round-report-info-wrap">
+        <button type="button" class="info-btn" aria-label="Platzierungen anzeigen">i</button>
+        <div class="info-tooltip">${items}</div>
+      </span>`;
+    }
+    return html;
+  }
+
+  // Liefert false, wenn die Änderung nicht in-place übernommen werden kann.
+  function applyControlsDelta(view, changes){
+    if(Object.keys(changes).some((key) => !CCP_PATCHABLE_KEYS.has(key))) return false;
+
+    if(["deck_count", "confirmed_count", "voting_done", "voting_total", "status_items"].some((key) => key in changes)){
+      const textEl = document.getElementById("ccpStatusText");
+      const tooltipEl = document.getElementById("ccpStatusTooltip");
+      if(textEl){
+        const text = ccpStatusText(view);
+        if(text !== null) textEl.textContent = text;
+        if(tooltipEl) tooltipEl.innerHTML = renderStatusItems(view);
+      }else if(view.phase !== "playing"){
+        return false; // Statuszeile fehlt (z. B. noch keine Decks) -> Seite neu aufbauen
+      }
+    }
+
+    if("tables" in changes){
+      for(const [tableNo, placements] of Object.entries(changes.tables || {})){
+        const row = document.querySelector(`.round-report-row[data-table="${CSS.escape(tableNo)}"]`);
+        if(!row) return false;
+        const titleEl = row.querySelector(".round-report-title-wrap");
+        if(titleEl) titleEl.innerHTML = renderTableTitle(tableNo, placements);
+        const resetBtn = row.querySelector('form button[type="submit"]');
+        if(resetBtn) resetBtn.disabled = !placements;
+      }
+    }
+
+    const primaryBtn = document.getElementById("primaryActionBtn");
+    if(primaryBtn){
+      const kind = primaryBtn.dataset.kind;
+      if(kind === "next_round"){
+        const tables = Object.values(view.tables || {});
+        primaryBtn.disabled = !(tables.length > 0 && tables.every(Boolean));
+      }else if(kind === "publish_results"){
+        primaryBtn.disabled = !(view.voting_total > 0 && view.voting_done === view.voting_total);
+      }else if(kind === "start_raffle"){
+        primaryBtn.disabled = view.start_file_exists || view.deck_count < Number(primaryBtn.dataset.minDecks || 0);
+      }
+    }
+    return true;
+  }
+
+  let seen = null; // { epoch, revision } des zuletzt verarbeiteten Stands
+  let view = null; // globaler Stand (hello.view + Deltas); überlebt Reconnects
+
+  function diffView(oldView, newView){
+    const changes = {};
+    for(const [key, value] of Object.entries(newView || {})){
+      if(JSON.stringify(oldView?.[key]) !== JSON.stringify(value)) changes[key] = value;
+    }
+    return changes;
+  }
+
+  // Reconnect-Verzögerung: Hinweis des Servers im Close-Frame ({retry_ms}) oder 1–3 s Zufall,
+  // damit nach einem WLAN-Aussetzer nicht alle Geräte gleichzeitig zurückkommen.
+  function reconnectDelay(ev){
+    try{
+      const hint = JSON.parse(ev?.reason || "null");
+      if(hint && Number(hint.retry_ms) > 0) return Number(hint.retry_ms);
+    }catch(_){ }
+    return 1000 + Math.random() * 2000;
+  }
+
   function connectWS(){
-    const ws = new WebSocket(wsUrl("channel=ccp"));
+    // Resume: ist der zuletzt verarbeitete Stand noch aktuell, spart der Server die View
+    const since = (seen && view) ? `&since=${encodeURIComponent(`${seen.epoch}:${seen.revision}`)}` : "";
+    const ws = new WebSocket(wsUrl("channel=ccp" + since));
     let pingTimer = null;
 
     ws.onmessage = (ev) => {
       if (ev.data === "pong") return;
+      // Server-Heartbeat: ohne Antwort wird die Verbindung nach einer Weile abgeräumt
+      if (ev.data === "ping"){
+        ws.send("pong");
+        return;
+      }
 
       try{
         const msg = JSON.parse(ev.data);
-        if(msg.type === "state_changed" && msg.scope === "global"){
-          location.reload();
+        if(msg.type === "hello"){
+          if(msg.resumed) return;
+          seen = { epoch: msg.epoch, revision: msg.revision };
+          // Reconnect: verpasste Änderungen aus dem Vergleich mit dem letzten bekannten Stand
+          const changes = view ? diffView(view, msg.view) : {};
+          view = msg.view || null;
+          if(Object.keys(changes).length && !applyControlsDelta(view, changes)) location.reload();
+          return;
+        }
+        if(msg.type === "state_delta" && msg.scope === "global"){
+          // schon bekannter Stand (z. B. direkt nach dem hello) -> nichts tun
+          if(seen && msg.epoch === seen.epoch && msg.revision <= seen.revision) return;
+          seen = { epoch: msg.epoch, revision: msg.revision };
+          const changes = msg.changes || {};
+          if(!view){
+            location.reload();
+            return;
+          }
+          Object.assign(view, changes);
+          if(!applyControlsDelta(view, changes)) location.reload();
         }
       }catch(_){ }
     };
@@ -47,9 +178,9 @@
       }, 25000);
     };
 
-    ws.onclose = () => {
+    ws.onclose = (ev) => {
       if (pingTimer) clearInterval(pingTimer);
-      setTimeout(connectWS, 1000);
+      setTimeout(connectWS, reconnectDelay(ev));
     };
 
     ws.onerror = () => {
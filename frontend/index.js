@@ -186,14 +186,18 @@ async function ensureCardPreviewLoaded(){
     }catch(_){}
   }
 
+  // Suggest-Art für Commander 2 ("partner", "background", "doctors_companion", …), null = kein Partner möglich
+  let commander2Kind = "partner";
+
   async function checkPartnerCapable(name){
     try{
       const r = await fetch(`/api/commander_partner_capable?name=${encodeURIComponent(name)}`, { cache:"no-store" });
-      if(!r.ok) return false;
+      if(!r.ok) return null;
       const data = await r.json();
-      return !!(data && data.partner_capable);
+      if(!(data && data.partner_capable)) return null;
+      return data.partner_kind || "partner";
     }catch(_){
-      return false;
+      return null;
     }
   }
 
@@ -241,7 +245,52 @@ async function ensureCardPreviewLoaded(){
     boxEl.style.display = "block";
   }
 
-  function attachSuggest({ inputEl, boxEl, spinnerEl, endpointUrlBuilder, onPicked }){
+  // --- Suggest über die bestehende WS-Verbindung ---
+  // Der Server bricht überholte Anfragen ab; Antworten tragen die seq der Anfrage.
+  const WS_SUGGEST_TIMEOUT_MS = 4000;
+  let liveWs = null;
+  let suggestSeq = 0;
+  const suggestWaiters = new Map(); // kind -> { seq, resolve }
+
+  // null ohne offene WS; sonst Promise mit Items, null (überholt) oder undefined (Timeout -> HTTP).
+  function suggestViaWs(kind, q){
+    if(!liveWs || liveWs.readyState !== 1) return null;
+    const seq = ++suggestSeq;
+    const previous = suggestWaiters.get(kind);
+    if(previous) previous.resolve(null);
+
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => {
+        if(suggestWaiters.get(kind)?.seq === seq) suggestWaiters.delete(kind);
+        resolve(undefined);
+      }, WS_SUGGEST_TIMEOUT_MS);
+      suggestWaiters.set(kind, {
+        seq,
+        resolve: (items) => { clearTimeout(timer); resolve(items); },
+      });
+      try{
+        liveWs.send(JSON.stringify({ type: "suggest", kind, q, seq }));
+      }catch(_){
+        suggestWaiters.delete(kind);
+        clearTimeout(timer);
+        resolve(undefined);
+      }
+    });
+  }
+
+  function handleSuggestResult(msg){
+    const waiter = suggestWaiters.get(msg.kind);
+    if(!waiter || waiter.seq !== msg.seq) return; // veraltete Antwort
+    suggestWaiters.delete(msg.kind);
+    waiter.resolve(Array.isArray(msg.items) ? msg.items : []);
+  }
+
+  function failPendingSuggests(){
+    for(const waiter of suggestWaiters.values()) waiter.resolve(undefined);
+    suggestWaiters.clear();
+  }
+
+  function attachSuggest({ inputEl, boxEl, spinnerEl, endpointUrlBuilder, onPicked, wsKind }){
     if(!inputEl || !boxEl) return;
 
     let timer = null;
@@ -249,6 +298,20 @@ async function ensureCardPreviewLoaded(){
     let inFlight = false;
 
     async function fetchSuggest(q){
+      const kind = typeof wsKind === "function" ? wsKind() : wsKind;
+      const viaWs = kind ? suggestViaWs(kind, q) : null;
+      if(viaWs){
+        setSpinner(spinnerEl, true);
+        const items = await viaWs;
+        if(items === null) return; // durch neuere Eingabe überholt
+        if(items !== undefined){
+          setSpinner(spinnerEl, false);
+          if(q === lastQuery) renderBox(boxEl, items);
+          return;
+        }
+        // Timeout/Verbindungsabbruch -> HTTP-Fallback
+      }
+
       if(inFlight) return;
       inFlight = true;
       setSpinner(spinnerEl, true);
@@ -1482,39 +1545,121 @@ async function ensureCardPreviewLoaded(){
     return `${proto}://${location.host}/ws?${params}`;
   }
 
+  // --- WS-Deltas: nur neu laden, wenn sich die Seitenstruktur ändert ---
+  let wsSeen = null; // { epoch, revision } des zuletzt verarbeiteten Stands
+  let wsView = null; // hello.view + Deltas; überlebt Reconnects
+
+  function diffView(oldView, newView){
+    const changes = {};
+    for(const [key, value] of Object.entries(newView || {})){
+      if(JSON.stringify(oldView?.[key]) !== JSON.stringify(value)) changes[key] = value;
+    }
+    return changes;
+  }
+
+  function applyViewDelta(changes){
+    return (currentDeckId === 0) ? applyHomeDelta(changes) : applyDeckDelta(changes);
+  }
+
+  // Startseite (deck_id=0) hängt nur von Raffle-Start, Phase/Runde und Settings ab.
+  const HOME_RELOAD_KEYS = ["start_file_exists", "phase", "active_round", "all_confirmed", "settings"];
+
+  function applyHomeDelta(changes){
+    return !HOME_RELOAD_KEYS.some((key) => key in changes);
+  }
+
+  // Liefert false, wenn die Änderung nicht in-place übernommen werden kann.
+  function applyDeckDelta(changes){
+    for(const key of Object.keys(changes)){
+      if(key === "table_report"){
+        const chips = Array.from(document.querySelectorAll('.pairing-matchup-grid .report-player-chip--matchup[data-player]'));
+        if(!document.getElementById('playingStatusMessage')) return false;
+        const report = changes.table_report || {};
+        updatePlayingStatusMessage(null, !!report.has_report);
+        updatePairingPlacementBadges(chips, { has_report: !!report.has_report, report: { resolved_places: report.resolved_places || {} } });
+        if(openReportModalBtn) openReportModalBtn.disabled = !!report.has_report;
+        if(reportModal?.classList.contains('show')) loadReportData().catch(() => {});
+      }else if(key === "voting_published"){
+        if(!bestDeckVotingRootEl) return false;
+        loadBestDeckVotingData().catch(() => location.reload());
+      }else{
+        return false;
+      }
+    }
+    return true;
+  }
+
+  // Reconnect-Verzögerung: Hinweis des Servers im Close-Frame ({retry_ms}) oder 1–3 s Zufall,
+  // damit nach einem WLAN-Aussetzer nicht alle Geräte gleichzeitig zurückkommen.
+  function reconnectDelay(ev){
+    try{
+      const hint = JSON.parse(ev?.reason || "null");
+      if(hint && Number(hint.retry_ms) > 0) return Number(hint.retry_ms);
+    }catch(_){ }
+    return 1000 + Math.random() * 2000;
+  }
+
   function connectWS(){
-    const params = (currentDeckId !== 0)
+    let params = (currentDeckId !== 0)
       ? `deck_id=${encodeURIComponent(currentDeckId)}`
       : "channel=home";
+    // Resume: ist der zuletzt verarbeitete Stand noch aktuell, spart der Server die View
+    if(wsSeen && wsView) params += `&since=${encodeURIComponent(`${wsSeen.epoch}:${wsSeen.revision}`)}`;
 
     const ws = new WebSocket(wsUrl(params));
     let pingTimer = null;
 
     ws.onmessage = (ev) => {
       if (ev.data === "pong") return;
+      // Server-Heartbeat: ohne Antwort wird die Verbindung nach einer Weile abgeräumt
+      if (ev.data === "ping"){
+        ws.send("pong");
+        return;
+      }
 
       let msg;
       try{ msg = JSON.parse(ev.data); }catch(_){ return; }
 
-      if(currentDeckId === 0 && msg.type === "state_changed" && msg.scope === "global"){
-        location.reload();
+      if(msg.type === "suggest_result"){
+        handleSuggestResult(msg);
         return;
       }
 
-      if(currentDeckId !== 0 && msg.type === "state_changed" && msg.scope === "deck" && msg.deck_id === currentDeckId){
-        location.reload();
+      if(msg.type === "hello"){
+        if(msg.resumed) return;
+        wsSeen = { epoch: msg.epoch, revision: msg.revision };
+        // Reconnect: verpasste Änderungen aus dem Vergleich mit dem letzten bekannten Stand
+        const changes = wsView ? diffView(wsView, msg.view) : {};
+        wsView = msg.view || null;
+        if(Object.keys(changes).length && !applyViewDelta(changes)) location.reload();
+        return;
       }
+
+      if(msg.type !== "state_delta") return;
+      if(currentDeckId === 0 ? msg.scope !== "global" : (msg.scope !== "deck" || msg.deck_id !== currentDeckId)) return;
+      // schon bekannter Stand (z. B. direkt nach dem hello) -> nichts tun
+      if(wsSeen && msg.epoch === wsSeen.epoch && msg.revision <= wsSeen.revision) return;
+      wsSeen = { epoch: msg.epoch, revision: msg.revision };
+
+      const changes = msg.changes || {};
+      if(wsView) Object.assign(wsView, changes);
+      if(!applyViewDelta(changes)) location.reload();
     };
 
     ws.onopen = () => {
+      liveWs = ws;
       pingTimer = setInterval(() => {
         if(ws.readyState === 1) ws.send("ping");
       }, 25000);
     };
 
-    ws.onclose = () => {
+    ws.onclose = (ev) => {
       if (pingTimer) clearInterval(pingTimer);
-      setTimeout(connectWS, 1000);
+      if (liveWs === ws){
+        liveWs = null;
+        failPendingSuggests();
+      }
+      setTimeout(connectWS, reconnectDelay(ev));
     };
 
     ws.onerror = () => {
@@ -1620,6 +1765,7 @@ async function ensureCardPreviewLoaded(){
     boxEl: commander1Box,
     spinnerEl: commander1Spinner,
     endpointUrlBuilder: (q) => `/api/commander_suggest?q=${encodeURIComponent(q)}`,
+    wsKind: "commander",
     onPicked: async (name) => {
       commander1ConfirmedName = name;
 
@@ -1628,18 +1774,21 @@ async function ensureCardPreviewLoaded(){
       await cardPreview.setCommander1(name);
 
       // Partnerfähigkeit prüfen -> Slot2 Placeholder einblenden/ausblenden
-      const partnerCapable = await checkPartnerCapable(name);
+      const partnerKind = await checkPartnerCapable(name);
+      const partnerCapable = partnerKind !== null;
+      commander2Kind = partnerKind || "partner";
       setCommander2Enabled(partnerCapable);
       cardPreview.setPartnerSlotEnabled(partnerCapable);
     }
   });
 
-  // Commander 2 suggest (only is:partner)
+  // Commander 2 suggest (passend zu Commander 1: Partner, Background, Doctor's companion, …)
   attachSuggest({
     inputEl: commander2Input,
     boxEl: commander2Box,
     spinnerEl: commander2Spinner,
-    endpointUrlBuilder: (q) => `/api/partner_suggest?q=${encodeURIComponent(q)}`,
+    endpointUrlBuilder: (q) => `/api/partner_suggest?q=${encodeURIComponent(q)}&kind=${encodeURIComponent(commander2Kind)}`,
+    wsKind: () => commander2Kind,
     onPicked: async (name) => {
       await ensureCardPreviewLoaded();
       await cardPreview.setCommander2(name);
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+from urllib.parse import parse_qs
+
+import httpx
+
+from backend.services import scryfall_service
+from backend.services.background_art_service import BackgroundArtPool
+
+
+def _cards(page: int) -> list[dict]:
+    return [
+        {"id": f"p{page}c{i}", "name": f"Card {page}-{i}", "image_uris": {"art_crop": f"https://img/{page}/{i}.jpg"}}
+        for i in range(5)
+    ]
+
+
+def _handler(requests: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = parse_qs(request.url.query.decode())
+        page = int(params.get("page", ["1"])[0])
+        requests.append((params["q"][0], page))
+        return httpx.Response(200, json={"total_cards": 15, "data": _cards(page)})
+    return handler
+
+
+class BackgroundArtPoolTests(unittest.TestCase):
+    def tearDown(self):
+        asyncio.run(scryfall_service.close_client())
+        scryfall_service._responses.clear()
+
+    def test_refilled_pool_serves_without_network(self):
+        requests = []
+
+        async def run():
+            scryfall_service.set_client(httpx.AsyncClient(transport=httpx.MockTransport(_handler(requests))))
+            pool = BackgroundArtPool(size=6, low_water=0, pages_per_refill=3, picks_per_page=2)
+            pool.schedule("t:land")
+            await pool._refill_task
+            sent = len(requests)
+            urls = [pool.take("t:land") for _ in range(3)]
+            await pool.close()
+            return pool, sent, urls
+
+        pool, sent, urls = asyncio.run(run())
+        self.assertEqual(len(requests), sent)
+        self.assertTrue(all(u and u.startswith("https://img/") for u in urls))
+        self.assertEqual(len(set(urls)), 3)
+        self.assertEqual(pool.stats()["hits"], 3)
+
+    def test_changed_query_discards_the_pool(self):
+        requests = []
+
+        async def run():
+            scryfall_service.set_client(httpx.AsyncClient(transport=httpx.MockTransport(_handler(requests))))
+            pool = BackgroundArtPool(size=4, low_water=1, pages_per_refill=1, picks_per_page=4)
+            first = await pool.resolve("t:land")
+            other = pool.take("t:forest")
+            await pool._refill_task
+            refilled = pool.take("t:forest")
+            await pool.close()
+            return first, other, refilled
+
+        first, other, refilled = asyncio.run(run())
+        self.assertIsNotNone(first)
+        self.assertIsNone(other)
+        self.assertIsNotNone(refilled)
+        self.assertIn(("t:forest", 1), requests)
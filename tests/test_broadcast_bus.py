@@ -0,0 +1,243 @@
+import asyncio
+import json
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend.redis_standin import RedisStandin
+from backend.services.broadcast_bus import BroadcastBus, RedisBus, UnixSocketBus, create_bus
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+class BroadcastBusTests(unittest.TestCase):
+    def test_create_bus_from_url(self):
+        self.assertEqual(type(create_bus("")), BroadcastBus)
+        unix = create_bus("unix:///tmp/kizzm-bus")
+        self.assertIsInstance(unix, UnixSocketBus)
+        self.assertEqual(unix.directory, Path("/tmp/kizzm-bus"))
+        redis = create_bus("redis://:secret@cache:6380/2?channel=event")
+        self.assertIsInstance(redis, RedisBus)
+        self.assertEqual((redis.host, redis.port, redis.db, redis.password, redis.channel), ("cache", 6380, 2, "secret", "event"))
+        with self.assertRaises(ValueError):
+            create_bus("amqp://broker")
+
+    def test_unix_bus_delivers_to_other_workers_only_and_drops_stale_sockets(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                directory = Path(tmp) / "bus"
+                received = {"a": [], "b": []}
+                a, b = UnixSocketBus(directory), UnixSocketBus(directory)
+
+                async def on_a(message):
+                    received["a"].append(message)
+
+                async def on_b(message):
+                    received["b"].append(message)
+
+                await a.start(on_a)
+                await b.start(on_b)
+                (directory / "dead-worker.sock").touch()
+
+                a.publish({"type": "state_changed", "deck_ids": [3]})
+                await _wait_for(lambda: received["b"])
+                await asyncio.sleep(0.05)
+                stale = a.stale_peers
+                await a.close()
+                await b.close()
+                return received, stale, sorted(p.name for p in directory.iterdir())
+
+        received, stale, leftover = asyncio.run(run())
+        self.assertEqual([m["deck_ids"] for m in received["b"]], [[3]])
+        self.assertEqual(received["a"], [])
+        self.assertEqual(stale, 1)
+        self.assertEqual(leftover, [])
+
+    def _full_peer(self, directory: Path) -> socket.socket:
+        """A bound peer socket nobody reads, filled until its queue refuses more datagrams."""
+        peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        peer.bind(str(directory / "busy-worker.sock"))
+        filler = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        filler.setblocking(False)
+        try:
+            while True:
+                filler.sendto(b"x" * 512, str(directory / "busy-worker.sock"))
+        except BlockingIOError:
+            pass
+        finally:
+            filler.close()
+        return peer
+
+    @staticmethod
+    def _drain(peer: socket.socket) -> list[dict]:
+        peer.setblocking(False)
+        messages = []
+        try:
+            while True:
+                data = peer.recv(65536)
+                if data != b"x" * 512:
+                    messages.append(json.loads(data))
+        except BlockingIOError:
+            pass
+        return messages
+
+    def test_unix_bus_retries_a_peer_whose_buffer_is_full(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                directory = Path(tmp)
+                bus = UnixSocketBus(directory, send_timeout=1.0)
+                await bus.start(lambda message: asyncio.sleep(0))
+                peer = self._full_peer(directory)
+
+                bus.publish({"type": "state_changed", "deck_ids": [5]})
+                await _wait_for(lambda: bus.peer_full > 0)
+                delivered = self._drain(peer)
+                await _wait_for(lambda: bus.stats()["published"] == 1)
+                delivered += self._drain(peer)
+                stats = bus.stats()
+                await bus.close()
+                peer.close()
+                return delivered, stats
+
+        delivered, stats = asyncio.run(run())
+        self.assertEqual([m["deck_ids"] for m in delivered], [[5]])
+        self.assertGreaterEqual(stats["peer_full"], 1)
+        self.assertEqual((stats["published"], stats["errors"]), (1, 0))
+
+    def test_message_lost_to_a_full_peer_makes_the_next_one_a_resync(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                directory = Path(tmp)
+                bus = UnixSocketBus(directory, send_timeout=0.05)
+                await bus.start(lambda message: asyncio.sleep(0))
+                peer = self._full_peer(directory)
+
+                bus.publish({"type": "state_changed", "deck_ids": [5]})
+                await _wait_for(lambda: bus.stats()["errors"] == 1)
+                self._drain(peer)
+                bus.publish({"type": "state_changed", "deck_ids": [6]})
+                await _wait_for(lambda: bus.stats()["published"] == 1)
+                delivered = self._drain(peer)
+                await bus.close()
+                peer.close()
+                return delivered
+
+        [message] = asyncio.run(run())
+        self.assertEqual(message["deck_ids"], [6])
+        self.assertTrue(message["resync"])
+
+    def test_redis_bus_against_standin(self):
+        async def run():
+            server = RedisStandin()
+            await server.start()
+            received = {"a": [], "b": []}
+            a = RedisBus("127.0.0.1", server.port, reconnect_seconds=0.05)
+            b = RedisBus("127.0.0.1", server.port, reconnect_seconds=0.05)
+
+            async def on_a(message):
+                received["a"].append(message)
+
+            async def on_b(message):
+                received["b"].append(message)
+
+            await a.start(on_a)
+            await b.start(on_b)
+            self.assertTrue(await a.wait_subscribed(2.0))
+            self.assertTrue(await b.wait_subscribed(2.0))
+
+            a.publish({"type": "state_changed", "deck_ids": None, "immediate": True})
+            b.publish({"type": "state_changed", "deck_ids": [1, 2]})
+            await _wait_for(lambda: received["a"] and received["b"])
+            await asyncio.sleep(0.05)
+            stats = a.stats()
+            await a.close()
+            await b.close()
+            await server.close()
+            return received, stats, server.published
+
+        received, stats, published = asyncio.run(run())
+        self.assertEqual([m["deck_ids"] for m in received["b"]], [None])
+        self.assertEqual([m["deck_ids"] for m in received["a"]], [[1, 2]])
+        self.assertEqual((stats["published"], stats["received"], stats["errors"]), (1, 1, 0))
+        self.assertEqual(published, 2)
+
+    def test_redis_bus_resubscribes_after_server_restart(self):
+        async def run():
+            server = RedisStandin()
+            await server.start()
+            port = server.port
+            received = []
+            sub = RedisBus("127.0.0.1", port, reconnect_seconds=0.05)
+            pub = RedisBus("127.0.0.1", port, reconnect_seconds=0.05)
+
+            async def on_message(message):
+                received.append(message)
+
+            async def ignore(message):
+                pass
+
+            await sub.start(on_message)
+            await pub.start(ignore)
+            self.assertTrue(await sub.wait_subscribed(2.0))
+            await server.close()
+            await _wait_for(lambda: not sub.stats()["subscribed"])
+
+            server = RedisStandin(port=port)
+            await server.start()
+            self.assertTrue(await sub.wait_subscribed(2.0))
+            pub.publish({"type": "state_changed", "deck_ids": [7]})
+            await _wait_for(lambda: received)
+            reconnects = sub.reconnects
+            await sub.close()
+            await pub.close()
+            await server.close()
+            return received, reconnects
+
+        received, reconnects = asyncio.run(run())
+        self.assertEqual([m["deck_ids"] for m in received], [[7]])
+        self.assertGreaterEqual(reconnects, 1)
+
+    def test_stalled_redis_never_blocks_publish(self):
+        async def run():
+            async def stall(reader, writer):
+                await asyncio.sleep(10)
+
+            server = await asyncio.start_server(stall, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            bus = RedisBus("127.0.0.1", port, reconnect_seconds=10, send_timeout=0.05, queue_size=2)
+
+            async def ignore(message):
+                pass
+
+            await bus.start(ignore)
+            started = asyncio.get_running_loop().time()
+            queued = [bus.publish({"type": "state_changed", "n": n}) for n in range(4)]
+            elapsed = asyncio.get_running_loop().time() - started
+            await _wait_for(lambda: bus.stats()["errors"] >= 1, timeout=1.0)
+            stats = bus.stats()
+            await bus.close()
+            server.close()
+            return queued, elapsed, stats
+
+        queued, elapsed, stats = asyncio.run(run())
+        self.assertLess(elapsed, 0.01)
+        self.assertEqual(queued.count(False), stats["dropped"])
+        self.assertGreaterEqual(stats["dropped"], 1)
+        self.assertGreaterEqual(stats["errors"], 1)
+        self.assertEqual(stats["published"], 0)
+
+    def test_publish_before_start_is_a_no_op(self):
+        self.assertFalse(RedisBus("127.0.0.1", 1).publish({"type": "state_changed"}))
+        self.assertFalse(BroadcastBus().publish({"type": "state_changed"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
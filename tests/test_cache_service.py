@@ -0,0 +1,70 @@
+import time
+import unittest
+
+from backend.services.cache_service import CacheRegistry, TTLCache, estimate_size
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_hit_miss_and_lru_eviction_by_entry_count(self):
+        cache = TTLCache("t", max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # a is now most recent
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 1, 1))
+
+    def test_byte_budget_evicts_oldest_entries(self):
+        cache = TTLCache("t", max_entries=100, ttl_seconds=60, max_bytes=25)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+        cache.set("c", "z" * 10)
+
+        self.assertNotIn("a", cache)
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.stats()["bytes"], 25)
+
+        cache.set("huge", "h" * 100)
+        self.assertNotIn("huge", cache)
+
+    def test_entries_expire_lazily_and_on_purge(self):
+        cache = TTLCache("t", max_entries=10, ttl_seconds=60)
+        cache.set("short", "v", ttl_seconds=0.01)
+        cache.set("also_short", "v", ttl_seconds=0.01)
+        cache.set("long", "v")
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()["expirations"], 2)
+
+    def test_cached_none_is_distinguishable_from_a_miss(self):
+        cache = TTLCache("t", max_entries=10, ttl_seconds=60)
+        missing = object()
+        cache.set("negative", None)
+        self.assertIsNone(cache.get("negative", missing))
+        self.assertIs(cache.get("other", missing), missing)
+
+    def test_estimate_size(self):
+        self.assertEqual(estimate_size(b"abc"), 3)
+        self.assertEqual(estimate_size("ä"), 2)
+        self.assertGreater(estimate_size([{"name": "Atraxa"}]), 10)
+
+
+class CacheRegistryTests(unittest.TestCase):
+    def test_namespaces_are_isolated(self):
+        registry = CacheRegistry()
+        commanders = registry.namespace("suggest:commander", max_entries=1, ttl_seconds=60)
+        partners = registry.namespace("suggest:partner", max_entries=1, ttl_seconds=60)
+        commanders.set("tym", ["Tymna"])
+        partners.set("tym", ["Tymna"])
+        partners.set("thr", ["Thrasios"])
+
+        self.assertEqual(commanders.get("tym"), ["Tymna"])
+        self.assertIs(registry.namespace("suggest:commander", 5, 5), commanders)
+        self.assertEqual(set(registry.stats()), {"suggest:commander", "suggest:partner"})
+        self.assertEqual(registry.stats()["suggest:partner"]["evictions"], 1)
@@ -0,0 +1,105 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from backend.repositories.card_cache_repository import CardCache
+
+
+CARD = {
+    "object": "card",
+    "id": "d0d33d52-3d28-4635-b985-51e126289259",
+    "oracle_id": "oracle-1",
+    "name": "Atraxa, Praetors' Voice",
+    "type_line": "Legendary Creature — Phyrexian Angel Horror",
+    "oracle_text": "Flying, vigilance, deathtouch, lifelink",
+    "image_uris": {"art_crop": "https://cards.scryfall.io/art_crop/a.jpg"},
+    "prices": {"eur": "12.00"},
+}
+
+
+class CardCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "cards.sqlite3"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_put_stores_only_used_fields_and_is_found_by_id_and_name(self):
+        cache = CardCache(self.path, ttl_seconds=3600)
+        cache.put(CARD)
+
+        by_id = cache.get_by_id(CARD["id"])
+        by_name = cache.get_by_name("atraxa, praetors' voice")
+        cache.close()
+
+        self.assertEqual(by_id, by_name)
+        self.assertEqual(by_id["name"], CARD["name"])
+        self.assertNotIn("prices", by_id)
+        self.assertNotIn("object", by_id)
+
+    def test_entries_survive_reopening_the_file(self):
+        first = CardCache(self.path, ttl_seconds=3600)
+        first.put(CARD)
+        first.close()
+
+        second = CardCache(self.path, ttl_seconds=3600)
+        self.assertIsNotNone(second.get_by_id(CARD["id"]))
+        second.close()
+
+    def test_expired_entries_are_ignored_and_purged(self):
+        cache = CardCache(self.path, ttl_seconds=-1)
+        cache.put(CARD)
+
+        self.assertIsNone(cache.get_by_id(CARD["id"]))
+        self.assertEqual(cache.purge_expired(), 1)
+        cache.close()
+
+    def test_puts_are_buffered_until_flush_and_committed_in_one_batch(self):
+        cache = CardCache(self.path, ttl_seconds=3600)
+        cache.put(CARD)
+        cache.put({**CARD, "id": "other-id", "name": "Tymna the Weaver"})
+
+        reader = CardCache(self.path, ttl_seconds=3600)
+        self.assertIsNone(reader.get_by_id(CARD["id"]))
+        self.assertEqual(cache.get_by_name("tymna the weaver")["id"], "other-id")
+        self.assertEqual(cache.pending(), 2)
+
+        self.assertEqual(cache.flush(), 2)
+        self.assertEqual(cache.pending(), 0)
+        self.assertIsNotNone(reader.get_by_id(CARD["id"]))
+        journal_mode = reader._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        reader.close()
+        cache.close()
+        self.assertEqual(journal_mode, "wal")
+
+    def test_failed_flush_keeps_the_batch_without_overwriting_newer_puts(self):
+        cache = CardCache(self.path, ttl_seconds=3600)
+        cache.put(CARD)
+        cache.put({**CARD, "id": "other-id", "name": "Tymna the Weaver"})
+        newer = {**CARD, "oracle_text": "Flying"}
+
+        class FailingConnection:
+            def executemany(self, *_args):
+                cache.put(newer)  # lands while the batch is being written
+                raise sqlite3.OperationalError("database is locked")
+
+        with mock.patch.object(cache, "_connection", return_value=FailingConnection()):
+            self.assertEqual(cache.flush(), 0)
+
+        self.assertEqual(cache.pending(), 2)
+        self.assertEqual(cache.get_by_id(CARD["id"])["oracle_text"], "Flying")
+        self.assertEqual(cache.stats(), {"pending": 2, "flushed": 0, "flush_errors": 1})
+
+        self.assertEqual(cache.flush(), 2)
+        cache.close()
+        reader = CardCache(self.path, ttl_seconds=3600)
+        self.assertEqual(reader.get_by_id(CARD["id"])["oracle_text"], "Flying")
+        self.assertIsNotNone(reader.get_by_name("tymna the weaver"))
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import random
+import string
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from backend.services.card_index_service import CardIndex, normalize_name
+
+
+CARDS = [
+    {
+        "id": "atraxa",
+        "name": "Atraxa, Praetors' Voice",
+        "type_line": "Legendary Creature — Phyrexian Angel Horror",
+        "oracle_text": "Flying, vigilance, deathtouch, lifelink",
+        "games": ["paper", "mtgo"],
+    },
+    {
+        "id": "thrasios",
+        "name": "Thrasios, Triton Hero",
+        "type_line": "Legendary Creature — Merfolk Wizard",
+        "oracle_text": "{4}: Scry 1.\nPartner (You can have two commanders if both have partner.)",
+        "keywords": ["Partner"],
+        "games": ["paper"],
+    },
+    {
+        "id": "raised",
+        "name": "Raised by Giants",
+        "type_line": "Legendary Enchantment — Background",
+        "oracle_text": "Commander creatures you own have base power and toughness 10/10.",
+        "games": ["paper"],
+    },
+    {
+        "id": "arena-only",
+        "name": "Atraxa, Grand Unifier (Alchemy)",
+        "type_line": "Legendary Creature — Phyrexian Angel",
+        "games": ["arena"],
+    },
+    {
+        "id": "bolt",
+        "name": "Lightning Bolt",
+        "type_line": "Instant",
+        "oracle_text": "Lightning Bolt deals 3 damage to any target.",
+        "games": ["paper"],
+    },
+]
+
+
+class CardIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = CardIndex()
+        self.index.load_cards(CARDS)
+
+    def test_normalize_name_drops_punctuation_and_case(self):
+        self.assertEqual(normalize_name("Atraxa, Praetors' Voice"), "atraxa praetors voice")
+
+    def test_name_search_matches_substrings_like_scryfall(self):
+        self.assertEqual([c["id"] for c in self.index.search_name("atra")], ["atraxa"])
+        self.assertEqual([c["id"] for c in self.index.search_name("raxa")], ["atraxa"])
+        self.assertEqual([c["id"] for c in self.index.search_name("voice atr")], ["atraxa"])
+        self.assertEqual([c["id"] for c in self.index.search_name("i", limit=2)], ["atraxa", "bolt"])
+        self.assertEqual(self.index.search_name("raxa zzz"), [])
+
+    def test_flags_filter_commander_and_partner(self):
+        commanders = [c["id"] for c in self.index.search_name("r", flag="commander")]
+        self.assertIn("raised", commanders)
+        self.assertNotIn("bolt", [c["id"] for c in self.index.search_name("light", flag="commander")])
+        self.assertEqual([c["id"] for c in self.index.search_name("thra", flag="partner")], ["thrasios"])
+        self.assertTrue(self.index.flags("raised")["background"])
+
+    def test_partner_flag_follows_the_partner_keyword_only(self):
+        index = CardIndex()
+        index.load_cards(CARDS + [{
+            "id": "wilson",
+            "name": "Wilson, Refined Grizzly",
+            "type_line": "Legendary Creature — Bear Warrior",
+            "oracle_text": "Choose a Background (You can have a Background as a second commander.)",
+            "games": ["paper"],
+        }])
+        self.assertFalse(index.flags("wilson")["partner"])
+        self.assertFalse(index.flags("raised")["partner"])
+        self.assertTrue(index.flags("thrasios")["partner"])
+        self.assertEqual([c["id"] for c in index.search_name("r", flag="background")], ["raised"])
+        self.assertEqual([c["id"] for c in index.search_name("wil", flag="choose_a_background")], ["wilson"])
+
+    def test_non_paper_cards_are_skipped(self):
+        self.assertIsNone(self.index.get_by_id("arena-only"))
+
+    def test_load_reads_bulk_file_and_supports_exact_lookups(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "oracle-cards.json"
+            path.write_text(json.dumps(CARDS), encoding="utf-8")
+            index = CardIndex()
+            count = index.load(path)
+
+        self.assertEqual(count, 4)
+        self.assertEqual(index.get_by_name("thrasios, triton hero")["id"], "thrasios")
+        self.assertEqual(index.get_by_id("atraxa")["name"], "Atraxa, Praetors' Voice")
+
+
+class CardIndexBenchmarkTests(unittest.TestCase):
+    """Suggest lookups scan the flagged member list; keep them sub-millisecond at Oracle Cards size."""
+
+    CARD_COUNT = 33_000  # roughly Scryfall's Oracle Cards bulk file
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(29)
+
+        def word() -> str:
+            return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))).title()
+
+        cls.index = CardIndex()
+        cls.index.load_cards([
+            {
+                "id": f"card-{i}",
+                "name": " ".join(word() for _ in range(rng.randint(1, 3))),
+                # about one card in ten is a legendary creature, as in the real file
+                "type_line": "Legendary Creature — Elf" if i % 10 == 0 else "Sorcery",
+                "games": ["paper"],
+            }
+            for i in range(cls.CARD_COUNT)
+        ])
+
+    def _best_ms(self, q: str, flag: str | None) -> float:
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            self.index.search_name(q, flag=flag, limit=20)
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    def test_commander_search_scans_the_full_list_in_under_a_millisecond(self):
+        self.assertEqual(len(self.index), self.CARD_COUNT)
+        # no match: the worst case, every commander name is checked
+        self.assertLess(self._best_ms("qzxj", flag="commander"), 1.0)
+
+    def test_limited_search_stops_early_even_without_a_flag(self):
+        self.assertLess(self._best_ms("a", flag=None), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+from backend.services.card_rules import (
+    CAP_BACKGROUND,
+    CAP_CHOOSE_A_BACKGROUND,
+    CAP_DOCTORS_COMPANION,
+    CAP_PARTNER,
+    CAP_PARTNER_WITH,
+    CAP_TIME_LORD_DOCTOR,
+    PAIRING_CAPS,
+    card_capabilities,
+    partner_suggest_kind,
+    validate_commander_pair,
+)
+
+
+def card(name, type_line="Legendary Creature — Human", oracle_text="", **extra):
+    return {"name": name, "type_line": type_line, "oracle_text": oracle_text, **extra}
+
+
+THRASIOS = card("Thrasios, Triton Hero", oracle_text="{4}: Scry 1.\nPartner (You can have two commanders if both have partner.)")
+TYMNA = card("Tymna the Weaver", oracle_text="Lifelink\nPartner (You can have two commanders if both have partner.)")
+PIR = card("Pir, Imaginative Rascal", oracle_text="Partner with Toothy, Imaginative Friend (When this creature enters, target player may put Toothy into their hand from their library, then shuffle.)")
+TOOTHY = card("Toothy, Imaginative Friend", oracle_text="Partner with Pir, Imaginative Rascal (When this creature enters, target player may put Pir into their hand from their library, then shuffle.)")
+WILSON = card("Wilson, Refined Grizzly", oracle_text="Choose a Background (You can have a Background as a second commander.)\nReach, trample, ward {2}")
+RAISED = card("Raised by Giants", type_line="Legendary Enchantment — Background")
+ATRAXA = card("Atraxa, Praetors' Voice", oracle_text="Flying, vigilance, deathtouch, lifelink")
+DOCTOR = card("The Tenth Doctor", type_line="Legendary Creature — Time Lord Doctor", oracle_text="Allons-y! — Whenever you cast a spell, ...")
+ROSE = card("Rose Tyler", oracle_text="Doctor’s companion (You can have two commanders if the other is the Doctor.)")
+WILL = card("Will the Wise", oracle_text="Friends forever (You can have two commanders if both have friends forever.)")
+DUSTIN = card("Dustin, Gadget Genius", oracle_text="Friends forever (You can have two commanders if both have friends forever.)")
+
+
+class CardCapabilitiesTests(unittest.TestCase):
+    def test_capabilities_bitset(self):
+        self.assertEqual(card_capabilities(THRASIOS), CAP_PARTNER)
+        self.assertEqual(card_capabilities(PIR), CAP_PARTNER_WITH)
+        self.assertEqual(card_capabilities(WILSON), CAP_CHOOSE_A_BACKGROUND)
+        self.assertEqual(card_capabilities(RAISED), CAP_BACKGROUND)
+        self.assertEqual(card_capabilities(ROSE), CAP_DOCTORS_COMPANION)
+        self.assertEqual(card_capabilities(DOCTOR), CAP_TIME_LORD_DOCTOR)
+        self.assertEqual(card_capabilities(ATRAXA), 0)
+
+    def test_precomputed_capabilities_are_used(self):
+        self.assertEqual(card_capabilities({**ATRAXA, "capabilities": CAP_PARTNER}), CAP_PARTNER)
+
+    def test_time_lord_doctor_is_partner_capable(self):
+        self.assertTrue(card_capabilities(DOCTOR) & PAIRING_CAPS)
+        self.assertTrue(card_capabilities(ROSE) & PAIRING_CAPS)
+        self.assertFalse(card_capabilities(ATRAXA) & PAIRING_CAPS)
+
+    def test_abilities_on_card_faces_are_detected(self):
+        mdfc = {"name": "A // B", "type_line": "Legendary Creature — Elf // Sorcery", "card_faces": [
+            {"oracle_text": "Partner (You can have two commanders if both have partner.)"},
+            {"oracle_text": "Draw a card."},
+        ]}
+        self.assertEqual(card_capabilities(mdfc), CAP_PARTNER)
+
+    def test_partner_suggest_kind_names_the_cards_that_complete_the_pair(self):
+        kinds = {c["name"]: partner_suggest_kind(card_capabilities(c)) for c in (THRASIOS, PIR, WILSON, RAISED, WILL, ROSE, DOCTOR, ATRAXA)}
+        self.assertEqual(kinds, {
+            THRASIOS["name"]: "partner",
+            PIR["name"]: "partner",
+            WILSON["name"]: "background",
+            RAISED["name"]: "choose_a_background",
+            WILL["name"]: "friends_forever",
+            ROSE["name"]: "time_lord_doctor",
+            DOCTOR["name"]: "doctors_companion",
+            ATRAXA["name"]: None,
+        })
+
+
+class ValidateCommanderPairTests(unittest.TestCase):
+    def test_legal_pairs(self):
+        self.assertIsNone(validate_commander_pair(ATRAXA, None))
+        self.assertIsNone(validate_commander_pair(THRASIOS, TYMNA))
+        self.assertIsNone(validate_commander_pair(PIR, TOOTHY))
+        self.assertIsNone(validate_commander_pair(RAISED, WILSON))
+        self.assertIsNone(validate_commander_pair(WILL, DUSTIN))
+        self.assertIsNone(validate_commander_pair(ROSE, DOCTOR))
+        self.assertIsNone(validate_commander_pair(DOCTOR, ROSE))
+
+    def test_illegal_pairs(self):
+        self.assertIsNotNone(validate_commander_pair(RAISED, None))
+        self.assertIsNotNone(validate_commander_pair(RAISED, RAISED))
+        self.assertIsNotNone(validate_commander_pair(ATRAXA, RAISED))
+        self.assertIsNotNone(validate_commander_pair(PIR, THRASIOS))
+        self.assertIsNotNone(validate_commander_pair(WILL, THRASIOS))
+        self.assertIsNotNone(validate_commander_pair(ROSE, ATRAXA))
+        self.assertIsNotNone(validate_commander_pair(DOCTOR, DOCTOR))
+        self.assertIsNotNone(validate_commander_pair(ROSE, {**DOCTOR, "oracle_text": "Partner (You can have two commanders if both have partner.)"}))
+        self.assertIsNotNone(validate_commander_pair(THRASIOS, ATRAXA))
+
+
+if __name__ == "__main__":
+    unittest.main()
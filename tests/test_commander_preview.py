@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+
+import httpx
+
+from backend import main
+from backend.services import scryfall_service
+
+
+CARD = {
+    "id": "atraxa",
+    "name": "Atraxa, Praetors' Voice",
+    "image_uris": {"border_crop": "https://cards.scryfall.io/border_crop/atraxa.jpg"},
+}
+NOT_FOUND = {"object": "error", "code": "not_found", "status": 404, "details": "Your query didn't match any cards."}
+
+
+class CommanderPreviewTests(unittest.TestCase):
+    def setUp(self):
+        self._breaker = scryfall_service._breaker
+        scryfall_service.set_circuit_breaker(scryfall_service.CircuitBreaker(failure_threshold=10, reset_timeout=60))
+        main._preview_cache.clear()
+        scryfall_service._responses.clear()
+
+    def tearDown(self):
+        scryfall_service.set_circuit_breaker(self._breaker)
+        asyncio.run(scryfall_service.close_client())
+        main._preview_cache.clear()
+        scryfall_service._responses.clear()
+
+    def _lookup_twice(self, outage: httpx.Response | None, card_exists: bool = True):
+        """First lookup during `outage` (None = Scryfall up), second one with Scryfall up."""
+        calls = []
+        state = {"outage": outage}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            if state["outage"] is not None:
+                return state["outage"]
+            if not card_exists:
+                return httpx.Response(404, json=NOT_FOUND)
+            return httpx.Response(200, json={"object": "list", "total_cards": 1, "data": [CARD]})
+
+        async def run():
+            scryfall_service.set_client(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+            first = await main._commander_preview_url(CARD["name"])
+            state["outage"] = None
+            second = await main._commander_preview_url(CARD["name"])
+            return first, second
+
+        first, second = asyncio.run(run())
+        return first, second, calls
+
+    def test_failed_lookup_is_not_memoized(self):
+        first, second, calls = self._lookup_twice(httpx.Response(503))
+
+        self.assertIsNone(first)
+        self.assertEqual(second, CARD["image_uris"]["border_crop"])
+        self.assertEqual(len(calls), 3)
+
+    def test_open_breaker_is_not_memoized(self):
+        for _ in range(10):
+            scryfall_service._breaker.record_failure()
+
+        async def run():
+            return await main._commander_preview_url(CARD["name"])
+
+        self.assertIsNone(asyncio.run(run()))
+        self.assertEqual(len(main._preview_cache), 0)
+
+    def test_empty_search_result_is_memoized(self):
+        first, second, calls = self._lookup_twice(None, card_exists=False)
+
+        self.assertIsNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(len(calls), 2)  # default + fallback query, once
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from backend.repositories.image_cache_repository import ImageCache
+
+
+class ImageCacheTests(unittest.TestCase):
+    def test_put_and_get_return_a_stable_strong_etag(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ImageCache(Path(tmp), max_bytes=1024)
+            etag = cache.put("abc_art_crop", b"image-bytes")
+            data, again = cache.get("abc_art_crop")
+
+            self.assertEqual(data, b"image-bytes")
+            self.assertEqual(etag, again)
+            self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+            self.assertIsNone(cache.get("missing"))
+
+    def test_least_recently_used_files_are_evicted_over_the_cap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ImageCache(Path(tmp), max_bytes=25)
+            cache.put("a", b"x" * 10)
+            cache.put("b", b"y" * 10)
+            old = time.time() - 60
+            os.utime(Path(tmp) / "a", (old, old))
+            os.utime(Path(tmp) / "b", (old - 60, old - 60))
+            cache.get("b")  # refreshes b, so a becomes the oldest
+            cache.put("c", b"z" * 10)
+
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("c"))
+            self.assertLessEqual(cache.size_bytes(), 25)
+
+    def test_keys_cannot_escape_the_cache_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ImageCache(Path(tmp) / "img", max_bytes=1024)
+            cache.put("../evil", b"data")
+            self.assertEqual([p.name for p in (Path(tmp) / "img").iterdir()], [".._evil"])
+
+    def test_lookup_returns_the_file_path_and_size_is_tracked_without_rescans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ImageCache(Path(tmp), max_bytes=1024).put("old", b"o" * 7)
+            cache = ImageCache(Path(tmp), max_bytes=1024)
+            etag = cache.put("abc_art_crop", b"image-bytes")
+            path, again = cache.lookup("abc_art_crop")
+
+            self.assertEqual(path, Path(tmp) / "abc_art_crop")
+            self.assertEqual(again, etag)
+            self.assertEqual(cache.size_bytes(), 7 + len(b"image-bytes"))
+            cache.put("abc_art_crop", b"tiny")
+            self.assertEqual(cache.size_bytes(), 7 + 4)
+            self.assertIsNone(cache.lookup("missing"))
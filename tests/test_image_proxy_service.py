@@ -0,0 +1,66 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+
+from backend.repositories.image_cache_repository import ImageCache
+from backend.services import image_proxy_service, scryfall_service
+
+
+CARD = {
+    "id": "0000579f-7b35-4ed3-b44c-db2a538066fe",
+    "name": "Atraxa",
+    "image_uris": {"art_crop": "https://cards.scryfall.io/art_crop/atraxa.jpg"},
+}
+
+
+class ImageProxyTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        image_proxy_service.set_image_cache(ImageCache(Path(self._tmp.name), max_bytes=1 << 20))
+
+    def tearDown(self):
+        image_proxy_service.set_image_cache(None)
+        asyncio.run(scryfall_service.close_client())
+        self._tmp.cleanup()
+
+    def test_proxied_url_points_at_local_route(self):
+        self.assertEqual(
+            image_proxy_service.proxied_url(CARD, "art_crop"),
+            f"/img/{CARD['id']}/art_crop",
+        )
+        self.assertIsNone(image_proxy_service.proxied_url(CARD, "large"))
+
+    def test_proxied_url_links_cdn_directly_without_cache(self):
+        image_proxy_service.set_image_cache(None)
+        self.assertEqual(image_proxy_service.proxied_url(CARD, "art_crop"), CARD["image_uris"]["art_crop"])
+
+    def test_normalize_width_snaps_to_configured_sizes(self):
+        self.assertIsNone(image_proxy_service.normalize_width(None))
+        self.assertEqual(image_proxy_service.normalize_width(100), 320)
+        self.assertEqual(image_proxy_service.normalize_width(5000), 960)
+
+    def test_image_is_downloaded_once_for_concurrent_requests(self):
+        downloads = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "cards.scryfall.io":
+                downloads.append(request.url.path)
+                await asyncio.sleep(0.01)
+                return httpx.Response(200, content=b"jpeg-bytes")
+            return httpx.Response(200, json=CARD)
+
+        async def run():
+            scryfall_service.set_client(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+            first = await asyncio.gather(*(
+                image_proxy_service.load_image(CARD["id"], "art_crop") for _ in range(4)
+            ))
+            later = await image_proxy_service.load_image(CARD["id"], "art_crop")
+            return first, later
+
+        first, later = asyncio.run(run())
+        self.assertEqual(downloads, ["/art_crop/atraxa.jpg"])
+        self.assertTrue(all(result == later for result in first))
+        self.assertEqual(later[0].read_bytes(), b"jpeg-bytes")
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend.repositories import json_store
+from backend.repositories.json_store import StateLock, atomic_write_json
+
+
+class JsonStoreTests(unittest.TestCase):
+    def test_atomic_write_leaves_no_temp_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "raffle.json"
+            atomic_write_json(path, [{"deck_id": 1}])
+            atomic_write_json(path, [{"deck_id": 2}])
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), [{"deck_id": 2}])
+            self.assertEqual([p.name for p in Path(tmp).iterdir()], ["raffle.json"])
+
+    @unittest.skipUnless(hasattr(os, "fchmod"), "POSIX file modes")
+    def test_atomic_write_keeps_the_file_mode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "raffle.json"
+            atomic_write_json(path, [])
+            self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o666 & ~json_store._UMASK)
+
+            os.chmod(path, 0o640)
+            atomic_write_json(path, [{"deck_id": 1}])
+            self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o640)
+
+    def test_state_lock_serializes_separate_lock_instances(self):
+        # two StateLocks on one file behave like two worker processes (flock is per open file)
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                worker_a, worker_b = StateLock(Path(tmp) / "state.lock"), StateLock(Path(tmp) / "state.lock")
+                events = []
+
+                async def section(lock, name):
+                    async with lock:
+                        events.append(f"{name}:in")
+                        await asyncio.sleep(0.03)
+                        events.append(f"{name}:out")
+
+                await asyncio.gather(section(worker_a, "a"), section(worker_b, "b"), section(worker_a, "a2"))
+                return events
+
+        events = asyncio.run(run())
+        pairs = [events[i:i + 2] for i in range(0, len(events), 2)]
+        self.assertTrue(all(p[0].split(":")[0] == p[1].split(":")[0] for p in pairs), events)
+
+    def test_cancelled_waiter_releases_nothing_it_does_not_hold(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                holder, waiter = StateLock(Path(tmp) / "state.lock"), StateLock(Path(tmp) / "state.lock")
+                async with holder:
+                    task = asyncio.create_task(waiter.__aenter__())
+                    await asyncio.sleep(0.03)
+                    task.cancel()
+                    with self.assertRaises(asyncio.CancelledError):
+                        await task
+                async with waiter:
+                    return True
+
+        self.assertTrue(asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    unittest.main()
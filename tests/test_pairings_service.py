@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import unittest
+
+from backend.services.pairings_service import RoundsCancelled, RoundsPrecomputer, build_rounds
+
+
+class RoundsPrecomputerTests(unittest.TestCase):
+    def test_take_returns_precomputed_schedule_for_matching_inputs(self):
+        players = ["Alice", "Bob", "Carol", "Dave", "Eve", "Frank"]
+
+        async def run():
+            pre = RoundsPrecomputer()
+            pre.schedule(players, 2, 3)
+            return await pre.take(players, 2, 3)
+
+        rounds = asyncio.run(run())
+        self.assertEqual(rounds, build_rounds(players, 2, max_rounds=3))
+
+    def test_take_returns_none_when_inputs_differ(self):
+        players = ["Alice", "Bob", "Carol", "Dave"]
+
+        async def run():
+            pre = RoundsPrecomputer()
+            pre.schedule(players, 2, 3)
+            mismatch = await pre.take(players, 1, 3)
+            match = await pre.take(players, 2, 3)
+            return mismatch, match
+
+        mismatch, match = asyncio.run(run())
+        self.assertIsNone(mismatch)
+        self.assertIsNotNone(match)
+
+    def test_reschedule_with_new_inputs_replaces_pending_result(self):
+        calls = []
+
+        def builder(players, num_pods, max_rounds, cancel=None):
+            calls.append(num_pods)
+            return [[players]]
+
+        async def run():
+            pre = RoundsPrecomputer(builder=builder)
+            pre.schedule(["A", "B", "C"], 1, 3)
+            pre.schedule(["A", "B", "C"], 1, 3)
+            pre.schedule(["A", "B", "C"], 2, 3)
+            stale = await pre.take(["A", "B", "C"], 1, 3)
+            fresh = await pre.take(["A", "B", "C"], 2, 3)
+            return stale, fresh
+
+        stale, fresh = asyncio.run(run())
+        self.assertIsNone(stale)
+        self.assertEqual(fresh, [[["A", "B", "C"]]])
+        self.assertLessEqual(calls.count(1), 1)
+
+    def test_invalidate_stops_the_running_worker_thread(self):
+        started = threading.Event()
+        stopped = threading.Event()
+
+        def builder(players, num_pods, max_rounds, cancel=None):
+            if num_pods != 1:
+                return [[players]]
+            started.set()
+            cancel.wait(5)
+            stopped.set()
+            raise RoundsCancelled()
+
+        async def run():
+            pre = RoundsPrecomputer(builder=builder)
+            pre.schedule(["A", "B", "C"], 1, 3)
+            await asyncio.to_thread(started.wait, 5)
+            pre.schedule(["A", "B", "C"], 2, 3)
+            return await asyncio.to_thread(stopped.wait, 5)
+
+        self.assertTrue(asyncio.run(run()))
+
+    def test_build_rounds_stops_when_cancelled(self):
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(RoundsCancelled):
+            build_rounds(["A", "B", "C", "D", "E", "F"], 2, max_rounds=3, cancel=cancel)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import unittest
+
+from backend import main
+from backend.services import scryfall_service
+
+
+CARDS = [
+    {
+        "id": "wilson",
+        "name": "Wilson, Refined Grizzly",
+        "type_line": "Legendary Creature — Bear Warrior",
+        "oracle_text": "Choose a Background (You can have a Background as a second commander.)",
+        "games": ["paper"],
+    },
+    {
+        "id": "raised",
+        "name": "Raised by Giants",
+        "type_line": "Legendary Enchantment — Background",
+        "oracle_text": "Commander creatures you own have base power and toughness 10/10.",
+        "games": ["paper"],
+    },
+    {
+        "id": "thrasios",
+        "name": "Thrasios, Triton Hero",
+        "type_line": "Legendary Creature — Merfolk Wizard",
+        "oracle_text": "Partner (You can have two commanders if both have partner.)",
+        "games": ["paper"],
+    },
+    {
+        "id": "atraxa",
+        "name": "Atraxa, Praetors' Voice",
+        "type_line": "Legendary Creature — Phyrexian Angel Horror",
+        "oracle_text": "Flying, vigilance, deathtouch, lifelink",
+        "games": ["paper"],
+    },
+]
+
+
+def _json(response) -> dict | list:
+    return json.loads(response.body)
+
+
+class PartnerSuggestTests(unittest.TestCase):
+    def setUp(self):
+        main.card_index.load_cards(CARDS)
+        scryfall_service.set_card_index(main.card_index)
+        main.caches.clear()
+
+    def tearDown(self):
+        main.card_index.load_cards([])
+        scryfall_service.set_card_index(None)
+        main.caches.clear()
+
+    def test_choose_a_background_commander_gets_background_suggestions(self):
+        async def run():
+            capable = await main.commander_partner_capable("Wilson, Refined Grizzly")
+            suggest = await main.partner_suggest("rai", kind="background")
+            return _json(capable), _json(suggest)
+
+        capable, suggest = asyncio.run(run())
+        self.assertEqual(capable, {"partner_capable": True, "partner_kind": "background"})
+        self.assertEqual([item["id"] for item in suggest], ["raised"])
+
+    def test_partner_kind_follows_the_commander(self):
+        async def run():
+            return [
+                _json(await main.commander_partner_capable(name))["partner_kind"]
+                for name in ("Thrasios, Triton Hero", "Raised by Giants", "Atraxa, Praetors' Voice")
+            ]
+
+        self.assertEqual(asyncio.run(run()), ["partner", "choose_a_background", None])
+
+    def test_partner_suggest_stays_is_partner_by_default(self):
+        async def run():
+            return _json(await main.partner_suggest("thr")), _json(await main.partner_suggest("rai"))
+
+        partners, backgrounds = asyncio.run(run())
+        self.assertEqual([item["id"] for item in partners], ["thrasios"])
+        self.assertEqual(backgrounds, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import httpx
+
+from backend.repositories.card_cache_repository import CardCache
+from backend.services import scryfall_service
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class ScryfallClientTests(unittest.TestCase):
+    def tearDown(self):
+        asyncio.run(scryfall_service.close_client())
+        scryfall_service.set_card_cache(None)
+        scryfall_service._responses.clear()
+
+    def test_calls_share_the_injected_client(self):
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(str(request.url))
+            return httpx.Response(200, json={"id": "abc", "name": "Atraxa"})
+
+        async def run():
+            client = _mock_client(handler)
+            scryfall_service.set_client(client)
+            card = await scryfall_service.get_card_by_id("abc")
+            named = await scryfall_service.named_exact("Atraxa")
+            return client, card, named
+
+        client, card, named = asyncio.run(run())
+        self.assertIs(scryfall_service.get_client(), client)
+        self.assertEqual(card["name"], "Atraxa")
+        self.assertEqual(named["id"], "abc")
+        self.assertEqual(len(seen), 2)
+
+    def test_search_cards_returns_none_for_non_200(self):
+        async def run():
+            scryfall_service.set_client(_mock_client(lambda request: httpx.Response(404, json={})))
+            return await scryfall_service.search_cards("name:zzz")
+
+        self.assertIsNone(asyncio.run(run()))
+
+    def test_search_without_matches_is_an_empty_list(self):
+        not_found = {"object": "error", "code": "not_found", "status": 404}
+
+        async def run():
+            scryfall_service.set_client(_mock_client(lambda request: httpx.Response(404, json=not_found)))
+            return await scryfall_service.search_cards("name:zzz")
+
+        payload = asyncio.run(run())
+        self.assertEqual((payload["total_cards"], payload["data"]), (0, []))
+
+    def test_search_url_keeps_parameter_order(self):
+        url = scryfall_service.search_url("t:basic", unique="prints", order="released", direction="desc", page=2)
+        self.assertTrue(url.endswith("/cards/search?q=t%3Abasic&unique=prints&order=released&dir=desc&page=2"))
+
+    def test_card_cache_answers_repeated_id_lookups(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            return httpx.Response(200, json={"id": "abc", "name": "Atraxa", "prices": {}})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CardCache(Path(tmp) / "cards.sqlite3", ttl_seconds=3600)
+            scryfall_service.set_card_cache(cache)
+
+            async def run():
+                scryfall_service.set_client(_mock_client(handler))
+                first = await scryfall_service.get_card_by_id("abc")
+                second = await scryfall_service.get_card_by_id("abc")
+                by_name = await scryfall_service.named_exact("atraxa")
+                return first, second, by_name
+
+            first, second, by_name = asyncio.run(run())
+            cache.close()
+
+        self.assertEqual(calls, ["/cards/abc"])
+        self.assertEqual(first, second)
+        self.assertEqual(by_name["id"], "abc")
+        self.assertNotIn("prices", first)
+
+
+class SingleFlightTests(unittest.TestCase):
+    def tearDown(self):
+        asyncio.run(scryfall_service.close_client())
+        scryfall_service._responses.clear()
+
+    def test_concurrent_identical_lookups_share_one_request(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"id": "abc", "name": "Atraxa"})
+
+        async def run():
+            scryfall_service.set_client(_mock_client(handler))
+            return await asyncio.gather(*(scryfall_service.get_card_by_id("abc") for _ in range(5)))
+
+        before = scryfall_service.scryfall_metrics()["singleflight"]["coalesced"]
+        results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r["name"] == "Atraxa" for r in results))
+        self.assertEqual(scryfall_service.scryfall_metrics()["singleflight"]["coalesced"] - before, 4)
+
+    def test_cancelled_waiter_does_not_cancel_shared_fetch(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={"id": "x", "name": "Tymna"})
+
+        async def run():
+            scryfall_service.set_client(_mock_client(handler))
+            first = asyncio.create_task(scryfall_service.named_exact("Tymna"))
+            second = asyncio.create_task(scryfall_service.named_exact("tymna"))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(run())["name"], "Tymna")
+
+    def test_shared_fetch_is_cancelled_once_every_waiter_is_gone(self):
+        flight = scryfall_service.SingleFlight()
+        state = {}
+
+        async def slow():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        async def run():
+            first = asyncio.create_task(flight.do("k", slow))
+            second = asyncio.create_task(flight.do("k", slow))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.sleep(0.01)
+            state["after_first"] = state.get("cancelled", False)
+            second.cancel()
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        self.assertFalse(state["after_first"])
+        self.assertTrue(state.get("cancelled"))
+        self.assertEqual(flight.stats()["abandoned"], 1)
+        self.assertEqual(flight.stats()["inflight"], 0)
+
+
+class RateLimiterTests(unittest.TestCase):
+    def test_burst_is_served_without_waiting(self):
+        limiter = scryfall_service.RateLimiter(rate=1000, burst=3)
+
+        async def run():
+            for _ in range(3):
+                await limiter.acquire()
+
+        asyncio.run(run())
+        stats = limiter.stats()
+        self.assertEqual(stats["acquired"]["interactive"], 3)
+        self.assertEqual(stats["waited"], 0)
+
+    def test_interactive_lane_overtakes_queued_bulk_requests(self):
+        limiter = scryfall_service.RateLimiter(rate=50, burst=1)
+        order = []
+
+        async def take(priority, label):
+            await limiter.acquire(priority)
+            order.append(label)
+
+        async def run():
+            await limiter.acquire()
+            bulk = [
+                asyncio.create_task(take(scryfall_service.PRIORITY_BULK, f"bulk{i}"))
+                for i in range(2)
+            ]
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.stats()["queue_depth"]["bulk"], 2)
+            interactive = asyncio.create_task(take(scryfall_service.PRIORITY_INTERACTIVE, "interactive"))
+            await asyncio.gather(*bulk, interactive)
+
+        asyncio.run(run())
+        self.assertEqual(order[0], "interactive")
+        self.assertEqual(limiter.stats()["waited"], 3)
+
+    def test_priority_context_reaches_the_limiter(self):
+        seen = []
+
+        class RecordingLimiter(scryfall_service.RateLimiter):
+            async def acquire(self, priority=scryfall_service.PRIORITY_INTERACTIVE):
+                seen.append(priority)
+
+        async def run():
+            scryfall_service.set_client(_mock_client(lambda request: httpx.Response(200, json={"data": []})))
+            with scryfall_service.scryfall_priority(scryfall_service.PRIORITY_BULK):
+                await scryfall_service.search_cards("t:background")
+            await scryfall_service.search_cards("t:legend")
+            await scryfall_service.close_client()
+
+        original = scryfall_service._limiter
+        scryfall_service.set_rate_limiter(RecordingLimiter(rate=1, burst=1))
+        try:
+            asyncio.run(run())
+        finally:
+            scryfall_service.set_rate_limiter(original)
+        self.assertEqual(seen, [scryfall_service.PRIORITY_BULK, scryfall_service.PRIORITY_INTERACTIVE])
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_after_threshold_and_probes_after_reset(self):
+        breaker = scryfall_service.CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_open_circuit_skips_the_network(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            raise httpx.ConnectTimeout("timeout", request=request)
+
+        async def run():
+            scryfall_service.set_client(_mock_client(handler))
+            results = [await scryfall_service.get_card_by_id(f"id{i}") for i in range(4)]
+            await scryfall_service.close_client()
+            return results
+
+        original = scryfall_service._breaker
+        scryfall_service.set_circuit_breaker(scryfall_service.CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        try:
+            results = asyncio.run(run())
+            self.assertEqual(scryfall_service._breaker.stats()["short_circuited"], 2)
+        finally:
+            scryfall_service.set_circuit_breaker(original)
+        self.assertEqual(results, [None] * 4)
+        self.assertEqual(len(calls), 2)
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._original = scryfall_service._responses
+
+    def tearDown(self):
+        asyncio.run(scryfall_service.close_client())
+        scryfall_service.set_response_cache(self._original)
+
+    def test_stale_entry_is_served_and_refreshed_in_background(self):
+        versions = iter(["old", "new"])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"data": [{"name": next(versions)}]})
+
+        async def run():
+            scryfall_service.set_client(_mock_client(handler))
+            first = await scryfall_service.search_cards("t:legend")
+            await asyncio.sleep(0.02)
+            stale = await scryfall_service.search_cards("t:legend")
+            await asyncio.gather(*scryfall_service._refresh_tasks)
+            refreshed = await scryfall_service.search_cards("t:legend")
+            return first, stale, refreshed
+
+        scryfall_service.set_response_cache(
+            scryfall_service.ResponseCache(fresh_ttl=0.01, stale_ttl=60, max_entries=10)
+        )
+        first, stale, refreshed = asyncio.run(run())
+        self.assertEqual(first["data"][0]["name"], "old")
+        self.assertEqual(stale["data"][0]["name"], "old")
+        self.assertEqual(refreshed["data"][0]["name"], "new")
+        self.assertEqual(scryfall_service._responses.stats()["stale_hits"], 1)
+
+    def test_failed_responses_are_not_cached(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            return httpx.Response(404, json={})
+
+        async def run():
+            scryfall_service.set_client(_mock_client(handler))
+            await scryfall_service.search_cards("name:zzz")
+            await scryfall_service.search_cards("name:zzz")
+
+        scryfall_service.set_response_cache(
+            scryfall_service.ResponseCache(fresh_ttl=60, stale_ttl=60, max_entries=10)
+        )
+        asyncio.run(run())
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
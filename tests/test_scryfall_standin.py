@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend import scryfall_standin
+from backend.services import card_rules, scryfall_service
+
+
+def _names(cards: list[dict], query: str) -> list[str]:
+    predicate = scryfall_standin.parse_query(query)
+    return sorted(c["name"] for c in cards if predicate(c))
+
+
+class QueryParserTests(unittest.TestCase):
+    def setUp(self):
+        self.cards = scryfall_standin.load_fixtures(scryfall_standin.DEFAULT_FIXTURES_PATH)
+
+    def test_app_query_templates(self):
+        self.assertEqual(_names(self.cards, "game:paper is:commander name:tym"), ["Tymna the Weaver"])
+        self.assertEqual(_names(self.cards, '!"Atraxa, Praetors\' Voice" is:partner'), [])
+        self.assertEqual(_names(self.cards, '!"Kraum, Ludevic\'s Opus" is:partner'), ["Kraum, Ludevic's Opus"])
+        self.assertEqual(len(_names(self.cards, "t:basic t:snow e:SLD")), 5)
+
+    def test_negation_and_quoted_values(self):
+        commanders = _names(self.cards, "game:paper is:commander -t:background")
+        self.assertNotIn("Raised by Giants", commanders)
+        self.assertIn("Teferi, Temporal Archmage", commanders)
+        self.assertEqual(_names(self.cards, 'o:"experience counter"'), ["Meren of Clan Nel Toth"])
+
+
+class StandinAppTests(unittest.TestCase):
+    def test_search_named_random_and_id_routes(self):
+        client = TestClient(scryfall_standin.create_standin_app(seed=7))
+
+        search = client.get("/cards/search", params={"q": "is:partner name:t"}).json()
+        self.assertEqual(search["object"], "list")
+        self.assertEqual(search["total_cards"], len(search["data"]))
+
+        card = client.get("/cards/named", params={"exact": "tymna the weaver"}).json()
+        self.assertEqual(client.get(f"/cards/{card['id']}").json()["name"], "Tymna the Weaver")
+        self.assertTrue(card["image_uris"]["art_crop"].endswith("/art_crop.gif"))
+
+        rnd = client.get("/cards/random", params={"q": "t:background"}).json()
+        self.assertIn("Background", rnd["type_line"])
+        self.assertEqual(client.get("/cards/search", params={"q": "name:zzz"}).status_code, 404)
+
+    def test_error_injection(self):
+        client = TestClient(scryfall_standin.create_standin_app(error_rate=1.0, seed=1))
+        self.assertEqual(client.get("/cards/named", params={"exact": "Sol Ring"}).status_code, 503)
+        self.assertEqual(client.get("/_standin/stats").json()["injected_errors"], 1)
+
+    def test_scryfall_service_runs_against_the_standin(self):
+        async def run():
+            transport = httpx.ASGITransport(app=scryfall_standin.create_standin_app(seed=3))
+            scryfall_service.set_client(httpx.AsyncClient(transport=transport))
+            try:
+                tymna, kraum = await asyncio.gather(
+                    scryfall_service.named_exact("Tymna the Weaver"),
+                    scryfall_service.named_exact("Kraum, Ludevic's Opus"),
+                )
+                background = await scryfall_service.random_commander(query_template="t:background")
+            finally:
+                await scryfall_service.close_client()
+            return tymna, kraum, background
+
+        tymna, kraum, background = asyncio.run(run())
+        self.assertIsNone(card_rules.validate_commander_pair(tymna, kraum))
+        self.assertIn("Background", background["type_line"])
@@ -1,39 +1,39 @@
+import asyncio
+import json
 import unittest
 
-from backend.services.ws_state_service import deck_signature, global_signature
+from backend.services.ws_state_service import (
+    HandshakeGate,
+    NotificationScheduler,
+    StateRevisions,
+    StateSnapshot,
+    SuggestSession,
+    WSManager,
+    reconnect_hint,
+    view_changes,
+)
 
 
-class WSStateServiceTests(unittest.TestCase):
-    def test_global_signature_changes_when_voting_results_are_published(self):
+class StateSnapshotTests(unittest.TestCase):
+    def test_global_view_changes_when_voting_results_are_published(self):
+        raffle_list = [{"deck_id": 1, "received_confirmed": True}]
         pairings = {
             "phase": "voting",
             "active_round": 3,
             "voting_results": {"published": False, "data": None},
         }
+        before = StateSnapshot(True, raffle_list, pairings).global_view()
 
-        before = global_signature(
-            start_file_exists=True,
-            raffle_list=[{"deck_id": 1, "received_confirmed": True}],
-            pairings_loader=lambda: pairings,
-            settings_loader=lambda: {},
-        )
-
-        pairings["voting_results"] = {
+        published = dict(pairings, voting_results={
             "published": True,
             "published_at": "2026-01-01T00:00:00+00:00",
             "data": {"rows": [{"owner": "Alice", "total_points": 8}]},
-        }
-
-        after = global_signature(
-            start_file_exists=True,
-            raffle_list=[{"deck_id": 1, "received_confirmed": True}],
-            pairings_loader=lambda: pairings,
-            settings_loader=lambda: {},
-        )
+        })
+        after = StateSnapshot(True, raffle_list, published).global_view()
 
-        self.assertNotEqual(before, after)
+        self.assertEqual(view_changes(before, after), {"voting_published": True})
 
-    def test_deck_signature_changes_when_table_report_changes(self):
+    def test_deck_view_changes_when_table_report_changes(self):
         raffle_list = [{
             "deck_id": 1,
             "deckOwner": "Alice",
@@ -42,61 +42,351 @@ class WSStateServiceTests(unittest.TestCase):
             "pairing_table": 4,
             "pairing_phase": "playing",
         }]
-        pairings = {
-            "round_reports": {
-                "2": {
-                    "4": {"resolved_places": {"Alice": 1}},
-                }
-            },
-            "voting_results": {"published": False},
-        }
+        pairings = {"round_reports": {"2": {"4": {"resolved_places": {"Alice": 1}}}}}
+        before = StateSnapshot(True, raffle_list, pairings).deck_view(1)
 
-        before = deck_signature(
-            deck_id=1,
-            start_file_exists=True,
-            raffle_list=raffle_list,
-            pairings_loader=lambda: pairings,
-            settings_loader=lambda: {},
+        changed = {"round_reports": {"2": {"4": {"resolved_places": {"Alice": 2}}}}}
+        after = StateSnapshot(True, raffle_list, changed).deck_view(1)
+
+        self.assertEqual(
+            view_changes(before, after),
+            {"table_report": {"has_report": True, "resolved_places": {"Alice": 2}}},
         )
 
-        pairings["round_reports"]["2"]["4"] = {"resolved_places": {"Alice": 2}}
+    def test_deck_view_changes_when_voting_results_published(self):
+        raffle_list = [{"deck_id": 1, "pairing_phase": "voting"}]
+        before = StateSnapshot(True, raffle_list, {"voting_results": {"published": False}}).deck_view(1)
+        after = StateSnapshot(True, raffle_list, {"voting_results": {"published": True}}).deck_view(1)
+
+        self.assertEqual(view_changes(before, after), {"voting_published": True})
 
-        after = deck_signature(
-            deck_id=1,
-            start_file_exists=True,
-            raffle_list=raffle_list,
-            pairings_loader=lambda: pairings,
-            settings_loader=lambda: {},
-        )
+    def test_settings_are_part_of_every_view(self):
+        raffle_list = [{"deck_id": 1, "deckOwner": "Alice"}]
+        before = StateSnapshot(True, raffle_list, {}, {"api": {"suggest_limit": 10}})
+        after = StateSnapshot(True, raffle_list, {}, {"api": {"suggest_limit": 20}})
 
-        self.assertNotEqual(before, after)
+        self.assertEqual(set(view_changes(before.global_view(), after.global_view())), {"settings"})
+        self.assertEqual(set(view_changes(before.deck_view(1), after.deck_view(1))), {"settings"})
 
-    def test_deck_signature_changes_when_voting_results_published(self):
-        raffle_list = [{"deck_id": 1, "pairing_phase": "voting"}]
-        pairings = {"voting_results": {"published": False}}
-
-        before = deck_signature(
-            deck_id=1,
-            start_file_exists=True,
-            raffle_list=raffle_list,
-            pairings_loader=lambda: pairings,
-            settings_loader=lambda: {},
-        )
+    def test_snapshot_is_detached_from_later_list_changes(self):
+        raffle_list = [{"deck_id": 1, "deckOwner": "Alice"}]
+        snapshot = StateSnapshot(False, raffle_list, None)
 
-        pairings["voting_results"] = {
-            "published": True,
-            "rows": [{"player": "Alice", "game_points": 9}],
+        raffle_list.append({"deck_id": 2, "deckOwner": "Bob"})
+
+        self.assertEqual(snapshot.global_view()["deck_count"], 1)
+        self.assertNotIn(2, snapshot.deck_index)
+        with self.assertRaises(TypeError):
+            snapshot.deck_index[2] = {}
+
+
+class _FakeSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+        self.close_reason = ""
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.closed_with = code
+        self.close_reason = reason
+
+
+class WSManagerTests(unittest.TestCase):
+    def test_slow_socket_does_not_delay_the_rest_of_the_group(self):
+        async def run():
+            manager = WSManager(queue_size=8, send_timeout=1.0)
+            slow, fast = _FakeSocket(delay=0.5), _FakeSocket()
+            manager.connect_existing(slow, "home")
+            manager.connect_existing(fast, "home")
+            await manager.broadcast_group("home", {"type": "state_delta"})
+            await asyncio.sleep(0.05)
+            result = (list(fast.sent), list(slow.sent))
+            manager.disconnect(slow, "home")
+            manager.disconnect(fast, "home")
+            return result
+
+        fast_sent, slow_sent = asyncio.run(run())
+        self.assertEqual(fast_sent, ['{"type": "state_delta"}'])
+        self.assertEqual(slow_sent, [])
+
+    def test_overflowing_and_timed_out_sockets_are_dropped(self):
+        async def run():
+            manager = WSManager(queue_size=2, send_timeout=0.05)
+            stuck, lagging = _FakeSocket(delay=10), _FakeSocket(delay=10)
+            manager.connect_existing(stuck, "deck:1")
+            manager.connect_existing(lagging, "home")
+            for i in range(4):
+                manager.send(lagging, {"n": i})
+            await asyncio.sleep(0)
+            await manager.broadcast_group("deck:1", {"type": "state_delta"})
+            await asyncio.sleep(0.2)
+            return manager, stuck, lagging
+
+        manager, stuck, lagging = asyncio.run(run())
+        self.assertEqual(lagging.closed_with, 1013)
+        self.assertEqual(stuck.closed_with, 1011)
+        self.assertEqual(manager.stats()["connections"], 0)
+        self.assertEqual(manager.active_deck_ids(), set())
+        self.assertEqual((manager.dropped_slow, manager.send_timeouts), (1, 1))
+        self.assertGreaterEqual(json.loads(lagging.close_reason)["retry_ms"], 1000)
+
+    def test_drain_waits_until_queued_messages_are_written(self):
+        async def run():
+            manager = WSManager(queue_size=8, send_timeout=1.0)
+            ws = _FakeSocket(delay=0.01)
+            manager.connect_existing(ws, "home")
+            manager.send(ws, {"type": "hello"})
+            manager.send(ws, "pong")
+            drained = await manager.drain(ws)
+            sent = list(ws.sent)
+            manager.disconnect(ws, "home")
+            return drained, sent
+
+        drained, sent = asyncio.run(run())
+        self.assertTrue(drained)
+        self.assertEqual(sent, ['{"type": "hello"}', "pong"])
+
+    def test_heartbeat_pings_quiet_sockets_and_reaps_silent_ones(self):
+        async def run():
+            manager = WSManager(heartbeat_interval=10, idle_timeout=30)
+            active, quiet, silent = _FakeSocket(), _FakeSocket(), _FakeSocket()
+            for ws in (active, quiet, silent):
+                manager.connect_existing(ws, "home")
+            manager._conns[quiet].last_seen -= 15
+            manager._conns[silent].last_seen -= 45
+            result = manager.heartbeat()
+            await asyncio.sleep(0.02)
+            manager.touch(quiet)
+            again = manager.heartbeat()
+            for ws in (active, quiet):
+                manager.disconnect(ws, "home")
+            return manager, result, again, active, quiet, silent
+
+        manager, result, again, active, quiet, silent = asyncio.run(run())
+        self.assertEqual(result, (1, 1))
+        self.assertEqual(again, (0, 0))
+        self.assertEqual((active.sent, quiet.sent), ([], ["ping"]))
+        self.assertEqual(silent.closed_with, 1001)
+        self.assertEqual((manager.pings_sent, manager.reaped_idle), (1, 1))
+
+    def test_connection_stats_count_messages_bytes_and_queue_depth(self):
+        async def run():
+            manager = WSManager(queue_size=8, send_timeout=1.0)
+            ws = _FakeSocket()
+            manager.connect_existing(ws, "deck:4")
+            manager.send(ws, "pong")
+            await manager.broadcast_group("deck:4", {"note": "ä"})
+            await manager.drain(ws)
+            stats = manager.connection_stats()
+            manager.disconnect(ws, "deck:4")
+            return stats
+
+        [stats] = asyncio.run(run())
+        self.assertEqual(stats["group"], "deck:4")
+        self.assertEqual(stats["messages_sent"], 2)
+        self.assertEqual(stats["bytes_sent"], 4 + len('{"note": "ä"}'.encode("utf-8")))
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertIn("connected_since", stats)
+
+
+class HandshakeGateTests(unittest.TestCase):
+    def test_handshakes_beyond_the_limit_are_turned_away_after_waiting(self):
+        async def run():
+            gate = HandshakeGate(limit=2, wait_seconds=0.02)
+            first = [await gate.acquire(), await gate.acquire()]
+            refused = await gate.acquire()
+            gate.release()
+            admitted_after_release = await gate.acquire()
+            return gate, first, refused, admitted_after_release
+
+        gate, first, refused, admitted_after_release = asyncio.run(run())
+        self.assertEqual(first, [True, True])
+        self.assertFalse(refused)
+        self.assertTrue(admitted_after_release)
+        self.assertEqual(gate.stats(), {"limit": 2, "in_flight": 2, "waiting": 0, "admitted": 3, "rejected": 1})
+
+    def test_reconnect_hint_is_jittered_within_bounds(self):
+        delays = {json.loads(reconnect_hint(base_ms=500, jitter_ms=1000))["retry_ms"] for _ in range(50)}
+        self.assertTrue(all(500 <= d <= 1500 for d in delays))
+        self.assertGreater(len(delays), 1)
+
+
+class NotificationSchedulerTests(unittest.TestCase):
+    def test_burst_of_requests_is_flushed_once_per_window(self):
+        flushed = []
+
+        async def flush():
+            flushed.append(1)
+
+        async def run():
+            scheduler = NotificationScheduler(flush, window_seconds=0.02)
+            for _ in range(10):
+                await scheduler.request()
+            self.assertEqual(flushed, [])
+            await asyncio.sleep(0.05)
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        self.assertEqual(len(flushed), 1)
+        self.assertEqual((scheduler.requests, scheduler.flushes), (10, 1))
+
+    def test_immediate_request_flushes_now_and_absorbs_pending_window(self):
+        flushed = []
+
+        async def flush():
+            flushed.append(1)
+
+        async def run():
+            scheduler = NotificationScheduler(flush, window_seconds=0.02)
+            await scheduler.request()
+            await scheduler.request(immediate=True)
+            self.assertEqual(len(flushed), 1)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        self.assertEqual(len(flushed), 1)
+
+
+class StateViewTests(unittest.TestCase):
+    def _playing_state(self):
+        raffle_list = [
+            {"deck_id": 1, "deckOwner": "Alice", "received_confirmed": True, "pairing_round": 1, "pairing_table": 1},
+            {"deck_id": 2, "deckOwner": "Bob", "received_confirmed": True, "pairing_round": 1, "pairing_table": 1},
+            {"deck_id": 3, "deckOwner": "Cara", "received_confirmed": True, "pairing_round": 1, "pairing_table": 2},
+        ]
+        pairings = {
+            "phase": "playing",
+            "active_round": 1,
+            "rounds": [[["Alice", "Bob"], ["Cara"]]],
+            "round_reports": {},
         }
+        return raffle_list, pairings
+
+    def test_table_report_only_changes_table_fields(self):
+        raffle_list, pairings = self._playing_state()
+        before = StateSnapshot(True, raffle_list, pairings)
+
+        reported = dict(pairings, round_reports={"1": {"1": {
+            "raw_placements": {"1": ["Bob"], "2": ["Alice"]},
+            "resolved_places": {"Bob": 1, "Alice": 2},
+        }}})
+        after = StateSnapshot(True, raffle_list, reported)
 
-        after = deck_signature(
-            deck_id=1,
-            start_file_exists=True,
-            raffle_list=raffle_list,
-            pairings_loader=lambda: pairings,
-            settings_loader=lambda: {},
+        self.assertEqual(
+            view_changes(before.global_view(), after.global_view()),
+            {"tables": {"1": [[1, "Bob"], [2, "Alice"]], "2": None}},
         )
+        self.assertEqual(
+            view_changes(before.deck_view(1), after.deck_view(1)),
+            {"table_report": {"has_report": True, "resolved_places": {"Bob": 1, "Alice": 2}}},
+        )
+        self.assertEqual(view_changes(before.deck_view(3), after.deck_view(3)), {})
+
+    def test_global_view_counts_votes_per_owner(self):
+        raffle_list, pairings = self._playing_state()
+        voting = {
+            "phase": "voting",
+            "best_deck_votes": {"1": {"1": 2}, "2": {"1": 1}},
+            "deck_creator_guess_votes": {"1": {"Alice": 3}},
+        }
+        view = StateSnapshot(True, raffle_list, voting).global_view()
+
+        self.assertEqual((view["voting_done"], view["voting_total"]), (1, 3))
+        self.assertEqual(view["status_items"], [["Alice", True], ["Bob", False], ["Cara", False]])
+        self.assertEqual(view_changes(None, view), view)
+
+    def test_views_are_built_once_per_snapshot(self):
+        raffle_list, pairings = self._playing_state()
+        snapshot = StateSnapshot(True, raffle_list, pairings)
+
+        self.assertIs(snapshot.global_view(), snapshot.global_view())
+        self.assertIs(snapshot.deck_view(1), snapshot.deck_view(1))
+        self.assertIsNot(snapshot.deck_view(1), snapshot.deck_view(2))
+
+
+class StateRevisionsTests(unittest.TestCase):
+    def test_deck_bump_only_moves_that_deck_and_global(self):
+        revisions = StateRevisions(epoch="test")
+        revisions.bump(deck_ids=[3])
+
+        self.assertEqual(revisions.global_revision, 1)
+        self.assertEqual(revisions.deck_revision(3), 1)
+        self.assertEqual(revisions.deck_revision(4), 0)
+
+        revisions.bump(deck_ids=())
+        self.assertEqual(revisions.global_revision, 2)
+        self.assertEqual(revisions.deck_revision(3), 1)
+
+    def test_bump_without_deck_ids_moves_every_deck_monotonically(self):
+        revisions = StateRevisions(epoch="test")
+        revisions.bump(deck_ids=[1])
+        revisions.bump(deck_ids=[2])
+        revisions.bump()
+
+        self.assertEqual(revisions.deck_revision(1), 3)
+        self.assertEqual(revisions.deck_revision(2), 3)
+        self.assertEqual(revisions.deck_revision(99), 3)
+
+        revisions.bump(deck_ids=[1])
+        self.assertEqual(revisions.deck_revision(1), 4)
+        self.assertEqual(revisions.deck_revision(2), 3)
+
+
+class SuggestSessionTests(unittest.TestCase):
+    def test_newer_query_cancels_superseded_lookup(self):
+        sent = []
+        cancelled = []
+
+        async def lookup(q):
+            try:
+                await asyncio.sleep(0.05 if q == "atr" else 0)
+            except asyncio.CancelledError:
+                cancelled.append(q)
+                raise
+            return [{"name": q}]
+
+        async def send(payload):
+            sent.append(payload)
+
+        async def run():
+            session = SuggestSession(send, {"commander": lookup})
+            session.handle_message({"type": "suggest", "kind": "commander", "q": "atr", "seq": 1})
+            await asyncio.sleep(0)
+            session.handle_message({"type": "suggest", "kind": "commander", "q": "atra", "seq": 2})
+            await asyncio.sleep(0.01)
+            await session.close()
+            return session
+
+        session = asyncio.run(run())
+        self.assertEqual(cancelled, ["atr"])
+        self.assertEqual(session.cancelled, 1)
+        self.assertEqual(sent, [{"type": "suggest_result", "kind": "commander", "seq": 2, "q": "atra", "items": [{"name": "atra"}]}])
+
+    def test_out_of_order_and_unknown_messages_are_ignored(self):
+        async def lookup(q):
+            return []
+
+        async def send(payload):
+            pass
+
+        async def run():
+            session = SuggestSession(send, {"partner": lookup})
+            results = [
+                session.handle_message({"type": "suggest", "kind": "partner", "q": "ty", "seq": 5}),
+                session.handle_message({"type": "suggest", "kind": "partner", "q": "t", "seq": 4}),
+                session.handle_message({"type": "suggest", "kind": "background", "q": "x", "seq": 6}),
+                session.handle_message({"type": "suggest", "kind": "partner", "q": "x", "seq": "abc"}),
+                session.handle_message({"type": "other"}),
+            ]
+            await session.close()
+            return results
 
-        self.assertNotEqual(before, after)
+        self.assertEqual(asyncio.run(run()), [True, False, False, False, False])
 
 
 if __name__ == "__main__":